@@ -9,8 +9,12 @@ https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'TrabalheJa.settings')
+django.setup(set_prefix=False)
 
-application = get_asgi_application()
+# Como get_asgi_application(), mas sem um thread por conexão do feed SSE
+from core.handlers import ASGIHandlerComFeed  # noqa: E402
+
+application = ASGIHandlerComFeed()
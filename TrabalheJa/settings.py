@@ -37,12 +37,17 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    'whitenoise.runserver_nostatic',
     'django.contrib.staticfiles',
     'django.contrib.humanize',
 ]
 
+# O WhiteNoise responde os arquivos estáticos antes do profiling: assets não
+# passam por instrumentação de SQL, template e cache nem viram métrica
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.ProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -120,18 +125,136 @@ USE_TZ = True
 
 TEMPLATES[0]['DIRS'] = [BASE_DIR / 'core' / 'templates']
 
-STATICFILES_DIRS = [BASE_DIR / 'static']
-
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'
 LOGOUT_REDIRECT_URL = '/'
 
 STATIC_URL = 'static/'
 
+# Os arquivos estáticos ficam em core/static (achados pelo AppDirectoriesFinder);
+# o collectstatic junta tudo aqui para o WhiteNoise servir
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Em produção (DEBUG=False) o collectstatic gera nomes com hash do conteúdo e
+# versões .gz/.br pré-comprimidas (brotli se o pacote Brotli estiver instalado).
+# O WhiteNoise serve esses arquivos com Cache-Control immutable de 1 ano.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+        else 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
 import os
 
 # Caminho na URL para acessar arquivos de mídia
 MEDIA_URL = '/media/'
 
 # Pasta física no seu computador onde as fotos serão salvas
-MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
\ No newline at end of file
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+
+# Profiling de requisições (core.middleware.ProfilingMiddleware)
+# Requisições acima destes limites são registradas no logger 'core.profiling'
+PROFILING_SLOW_QUERY_COUNT = 50
+PROFILING_SLOW_LATENCY_MS = 1000
+# IPs autorizados a coletar /metrics/ sem login (ex.: Prometheus local)
+PROFILING_METRICS_ALLOWED_IPS = ['127.0.0.1']
+
+
+# Expiração e arquivo de vagas (manage.py expirar_vagas, agendado via cron)
+# Vagas ativas há mais que isso são encerradas automaticamente
+VAGA_DIAS_EXPIRACAO = 60
+# Candidaturas de vagas encerradas mais antigas que isso vão para o arquivo
+CANDIDATURA_DIAS_RETENCAO = 180
+
+
+# Cache de página inteira para visitantes anônimos (core.decorators.cache_anonimo)
+# Fica no cache 'paginas' (em CACHES, mais abaixo), compartilhado pelos
+# workers para que invalidação e trava de regeneração valham para todos
+PAGINA_CACHE_SEGUNDOS = 300
+PAGINA_CACHE_ALIAS = 'paginas'
+
+
+# Notificações de vagas ao banco de talentos (manage.py processar_notificacoes)
+# Em desenvolvimento os e-mails saem no console; para testar contra um SMTP
+# local use EMAIL_BACKEND smtp com EMAIL_HOST='localhost' e EMAIL_PORT=1025
+# (ex.: python -m aiosmtpd -n -l localhost:1025)
+if DEBUG:
+    EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+DEFAULT_FROM_EMAIL = 'TrabalheJá <nao-responda@trabalheja.com.br>'
+# Endereço público usado nos links dos e-mails
+SITE_URL = 'http://127.0.0.1:8000'
+# Score mínimo de match para o candidato ser avisado da vaga
+NOTIFICACAO_SCORE_MINIMO = 40
+# No máximo um e-mail por candidato nesse intervalo; o resto vira resumo
+NOTIFICACAO_INTERVALO_HORAS = 24
+NOTIFICACAO_MAX_VAGAS_POR_EMAIL = 10
+
+
+# Índice de candidatos similares (manage.py indexar_candidatos; requer NumPy)
+SIMILARIDADE_DIR = BASE_DIR / 'indices' / 'candidatos'
+# Matriz de vetores das vagas ativas (manage.py vagas_similares --reconstruir);
+# a atualização incremental só vetoriza as vagas alteradas, com o IDF dela
+VAGAS_SIMILARES_DIR = BASE_DIR / 'indices' / 'vagas'
+
+
+# Sessões em cache com gravação no banco (cached_db): a leitura da sessão e
+# do usuário logado (core.backends.ModelBackendComCache) sai do cache
+# 'sessoes', sem query em django_session/auth_user a cada requisição.
+# O cache em arquivo é compartilhado pelos workers da mesma máquina; com
+# várias máquinas troque por Redis/Memcached. Sessões expiradas saem do
+# banco com manage.py limpar_sessoes (cron).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'sessoes': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'sessoes',
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    },
+    # Páginas públicas cacheadas (PAGINA_CACHE_ALIAS), na mesma pasta compartilhada
+    'paginas': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'paginas',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+}
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessoes'
+AUTHENTICATION_BACKENDS = ['core.backends.ModelBackendComCache']
+# Validade do usuário (com profile) guardado no cache; gravações invalidam antes
+USUARIO_CACHE_SEGUNDOS = 300
+
+
+# Limite de taxa nos POSTs de login, cadastro e candidatura (core.decorators.limitar_taxa)
+# Por rota e escopo: (capacidade do balde, segundos para reabastecê-lo inteiro).
+# 'ip' usa REMOTE_ADDR (atrás de proxy, repasse o IP real nele); 'conta' é o
+# e-mail digitado ou o usuário logado. Acima do limite a resposta é 429.
+LIMITES_REQUISICOES = {
+    'login': {'ip': (20, 300), 'conta': (5, 300)},
+    'register': {'ip': (5, 3600), 'conta': (3, 3600)},
+    'vaga_apply': {'ip': (60, 3600), 'conta': (30, 3600)},
+}
+# Os baldes ficam no banco (core.models.BaldeLimite), então o limite vale
+# para todos os workers; os parados saem com manage.py limpar_sessoes (cron).
+# Custo: cada POST liberado grava uma UPDATE (a primeira da chave, mais um
+# INSERT), disputando o único escritor do SQLite com o resto da aplicação; um
+# bloqueado (429) só lê o saldo. Com muitos logins simultâneos, prefira o
+# PostgreSQL, onde as UPDATEs de chaves diferentes não se esperam.
+# O teste de carga (manage.py teste_carga) sai todo de um IP: suba o servidor
+# com TRABALHEJA_LIMITES=0 para desligar o limite
+LIMITES_ATIVOS = os.environ.get('TRABALHEJA_LIMITES', '1') != '0'
+
+
+# Feed ao vivo de candidaturas para empresas (SSE em core.views.feed_candidaturas)
+# Sob ASGI (ex.: gunicorn -k uvicorn.workers.UvicornWorker TrabalheJa.asgi)
+# as conexões ficam abertas; eventos gravados por outros workers chegam em
+# até FEED_INTERVALO_SEGUNDOS. Sob WSGI o navegador refaz a consulta a cada
+# FEED_WSGI_RECONEXAO_SEGUNDOS.
+FEED_INTERVALO_SEGUNDOS = 2
+FEED_WSGI_RECONEXAO_SEGUNDOS = 10
@@ -1,11 +1,79 @@
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.urls import reverse
+from django.utils.functional import cached_property
+from django.utils.html import format_html_join
 from .models import (
-    Profile, PerfilCandidato, ExperienciaProfissional, 
+    Profile, PerfilCandidato, ExperienciaProfissional,
     FormacaoAcademica, Competencia, Idioma, Vaga, Candidatura
 )
 
+# Acima deste total estimado o changelist deixa de rodar COUNT(*) na tabela
+CONTAGEM_ESTIMADA_A_PARTIR_DE = getattr(settings, 'ADMIN_CONTAGEM_ESTIMADA_A_PARTIR_DE', 100_000)
+
+# Acima deste número de linhas o inline vira um link para o changelist filtrado
+LIMITE_INLINE = getattr(settings, 'ADMIN_LIMITE_INLINE', 20)
+
+
+def estimar_total(queryset):
+    """Total aproximado da tabela, lido das estatísticas do banco (sem varrer)."""
+    conexao = connections[queryset.db]
+    tabela = conexao.ops.quote_name(queryset.model._meta.db_table)
+    with conexao.cursor() as cursor:
+        if conexao.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [tabela])
+        elif conexao.vendor == 'mysql':
+            cursor.execute(
+                'SELECT TABLE_ROWS FROM information_schema.TABLES '
+                'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s',
+                [queryset.model._meta.db_table]
+            )
+        elif conexao.vendor == 'sqlite':
+            # sqlite_stat1 (gravada pelo ANALYZE do job expirar_vagas): a
+            # primeira coluna de `stat` é o total de linhas da tabela
+            try:
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s', [queryset.model._meta.db_table])
+                totais = [int(stat.split()[0]) for stat, in cursor.fetchall()]
+            except DatabaseError:  # banco nunca analisado: a tabela não existe
+                totais = []
+            return max(totais) if totais else None
+        else:
+            return None
+        linha = cursor.fetchone()
+    return int(linha[0]) if linha and linha[0] is not None else None
+
+
+class PaginatorEstimado(Paginator):
+    """
+    Paginator do admin que usa o total estimado quando o changelist não tem
+    filtros e a tabela é grande; com filtros (indexados) faz o COUNT normal.
+    Estimativas velhas (linhas apagadas depois da última análise) são
+    conferidas com um COUNT limitado, que lê no máximo o limite + 1 linhas:
+    tabela que encolheu abaixo do limite volta ao total exato.
+    """
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            estimado = estimar_total(self.object_list)
+            if estimado is not None and estimado > CONTAGEM_ESTIMADA_A_PARTIR_DE:
+                contado = self.object_list[:CONTAGEM_ESTIMADA_A_PARTIR_DE + 1].count()
+                if contado > CONTAGEM_ESTIMADA_A_PARTIR_DE:
+                    return estimado
+                return contado
+        return super().count
+
+
+class AdminEscalavel(admin.ModelAdmin):
+    paginator = PaginatorEstimado
+    # Evita o segundo COUNT(*) da tabela inteira ("x de y selecionados")
+    show_full_result_count = False
+
+
 # 1. Inlines apontando para User (conforme seu models.py atual)
 class ProfileInline(admin.StackedInline):
     model = Profile
@@ -31,41 +99,104 @@ class IdiomaInline(admin.TabularInline):
     model = Idioma
     extra = 0
 
+INLINES_CURRICULO = (
+    (ExperienciaInline, 'experiencias'),
+    (FormacaoInline, 'formacoes'),
+    (CompetenciaInline, 'competencias'),
+    (IdiomaInline, 'idiomas'),
+)
+
 # 2. Re-registrar o UserAdmin para incluir TUDO em uma página só
 admin.site.unregister(User)
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
-    inlines = [
-        ProfileInline, 
-        PerfilCandidatoInline, 
-        ExperienciaInline, 
-        FormacaoInline, 
-        CompetenciaInline, 
-        IdiomaInline
-    ]
+    paginator = PaginatorEstimado
+    show_full_result_count = False
     list_display = ('username', 'email', 'get_tipo', 'is_staff')
+    list_select_related = ('profile',)
+    readonly_fields = ('curriculo_extenso',)
+
+    def get_fieldsets(self, request, obj=None):
+        fieldsets = super().get_fieldsets(request, obj)
+        if obj is not None and self._inlines_extensos(obj):
+            fieldsets = tuple(fieldsets) + (('Currículo extenso', {'fields': ('curriculo_extenso',)}),)
+        return fieldsets
+
+    def get_inlines(self, request, obj):
+        # Empresas e usuários novos não têm currículo: só o Profile
+        if obj is None or getattr(getattr(obj, 'profile', None), 'tipo', None) != 'candidato':
+            return [ProfileInline]
+
+        extensos = self._inlines_extensos(obj)
+        return [ProfileInline, PerfilCandidatoInline] + [
+            inline for inline, relacao in INLINES_CURRICULO if relacao not in extensos
+        ]
+
+    def _inlines_extensos(self, obj):
+        """Relações do currículo grandes demais para carregar inline (contadas uma vez por objeto)."""
+        if not hasattr(obj, '_inlines_extensos'):
+            obj._inlines_extensos = {
+                relacao: total
+                for _, relacao in INLINES_CURRICULO
+                if (total := getattr(obj, relacao).count()) > LIMITE_INLINE
+            }
+        return obj._inlines_extensos
+
+    def curriculo_extenso(self, obj):
+        extensos = self._inlines_extensos(obj)
+        linhas = []
+        for inline, relacao in INLINES_CURRICULO:
+            if relacao in extensos:
+                opts = inline.model._meta
+                url = reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+                linhas.append((f'{url}?candidato__id__exact={obj.pk}', opts.verbose_name_plural, extensos[relacao]))
+        return format_html_join('<br>', '<a href="{}">{}</a> ({} registros)', linhas)
+    curriculo_extenso.short_description = 'Abrir em listas paginadas'
 
     def get_tipo(self, obj):
         try:
             return obj.profile.tipo
-        except:
+        except Profile.DoesNotExist:
             return "-"
     get_tipo.short_description = 'Tipo de Usuário'
 
 # 3. Manter os registros de Vaga e Candidatura como estavam
 @admin.register(Vaga)
-class VagaAdmin(admin.ModelAdmin):
+class VagaAdmin(AdminEscalavel):
     list_display = ('titulo', 'empresa', 'codigo_vaga', 'modelo_trabalho')
     list_filter = ('modelo_trabalho', 'tipo_contrato')
     search_fields = ('titulo', 'codigo_vaga')
+    # Vaga.__str__ usa empresa.profile
+    list_select_related = ('empresa__profile',)
+    raw_id_fields = ('empresa',)
 
 @admin.register(Candidatura)
-class CandidaturaAdmin(admin.ModelAdmin):
+class CandidaturaAdmin(AdminEscalavel):
     list_display = ('vaga', 'candidato', 'status', 'score', 'criada_em')
     list_filter = ('status',)
     ordering = ('-score',)
+    # Vaga.__str__ usa empresa.profile
+    list_select_related = ('vaga__empresa__profile', 'candidato')
+    raw_id_fields = ('vaga', 'candidato')
+
+# Listas paginadas do currículo, usadas quando o inline ficaria grande demais
+@admin.register(ExperienciaProfissional, FormacaoAcademica, Competencia, Idioma)
+class ItemCurriculoAdmin(AdminEscalavel):
+    list_select_related = ('candidato',)
+    raw_id_fields = ('candidato',)
+    search_fields = ('candidato__username',)
+
+    def get_list_display(self, request):
+        return ('__str__', 'candidato')
 
 # Opcional: registrar individualmente se quiser acesso rápido pela home do admin
-admin.site.register(Profile)
-admin.site.register(PerfilCandidato)
\ No newline at end of file
+@admin.register(Profile)
+class ProfileAdmin(AdminEscalavel):
+    raw_id_fields = ('user',)
+
+@admin.register(PerfilCandidato)
+class PerfilCandidatoAdmin(AdminEscalavel):
+    # PerfilCandidato.__str__ usa user.get_full_name
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+
+def _chave(user_id):
+    return f'usuario:{user_id}'
+
+
+def _cache():
+    return caches[getattr(settings, 'SESSION_CACHE_ALIAS', 'default')]
+
+
+def invalidar_usuario(user_id):
+    """Descarta o usuário guardado; chamado a cada gravação de User/Profile."""
+    _cache().delete(_chave(user_id))
+
+
+class ModelBackendComCache(ModelBackend):
+    """
+    ModelBackend que guarda o usuário logado (já com o profile) no cache
+    das sessões: com a sessão também em cache, a requisição autenticada não
+    consulta django_session, auth_user nem core_profile.
+
+    Um usuário desatualizado no cache não autentica ninguém por engano: o
+    django.contrib.auth confere o hash de sessão contra a senha do objeto
+    devolvido e encerra a sessão se não bater.
+    """
+
+    def get_user(self, user_id):
+        cache = _cache()
+        user = cache.get(_chave(user_id))
+        if user is None:
+            user = (
+                get_user_model()._default_manager
+                .select_related('profile').filter(pk=user_id).first()
+            )
+            if user is None:
+                return None
+            cache.set(_chave(user_id), user, getattr(settings, 'USUARIO_CACHE_SEGUNDOS', 300))
+        return user if self.user_can_authenticate(user) else None
@@ -1,6 +1,8 @@
 from django.shortcuts import redirect
 from django.contrib import messages
+from django.http import HttpResponse
 from functools import wraps
+from .services import cache_paginas_service, limite_service
 
 def apenas_empresa(view_func):
     @wraps(view_func)
@@ -19,3 +21,62 @@ def apenas_empresa(view_func):
         return view_func(request, *args, **kwargs)
 
     return _wrapped_view
+
+
+def cache_anonimo(grupo):
+    """
+    Cache de página inteira para visitantes anônimos (GET/HEAD). Usuários
+    logados e requisições com mensagens pendentes sempre renderizam a view.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if (request.method not in ('GET', 'HEAD')
+                    or request.user.is_authenticated
+                    or 'messages' in request.COOKIES):
+                return view_func(request, *args, **kwargs)
+
+            return cache_paginas_service.servir(
+                request, grupo, lambda: view_func(request, *args, **kwargs)
+            )
+
+        return _wrapped_view
+
+    return decorator
+
+
+def conta_do_campo(campo):
+    """Identifica a conta pelo campo do POST (e-mail/usuário digitado)."""
+    return lambda request: request.POST.get(campo, '').strip().lower()
+
+
+def conta_logada(request):
+    return request.user.pk
+
+
+def limitar_taxa(rota, conta=None):
+    """
+    Limite de taxa por IP e por conta nos POSTs da view (limites em
+    settings.LIMITES_REQUISICOES[rota]). Estourado, responde 429 antes de
+    qualquer trabalho da view: hash de senha, queries, templates.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.method == 'POST':
+                espera = limite_service.verificar(
+                    rota, request.META.get('REMOTE_ADDR'), conta(request) if conta else None
+                )
+                if espera:
+                    resposta = HttpResponse(
+                        'Muitas tentativas. Aguarde um pouco e tente novamente.',
+                        status=429, content_type='text/plain; charset=utf-8'
+                    )
+                    resposta['Retry-After'] = str(espera)
+                    return resposta
+
+            return view_func(request, *args, **kwargs)
+
+        return _wrapped_view
+
+    return decorator
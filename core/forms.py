@@ -1,7 +1,8 @@
 from django import forms
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
-from .models import Profile, Vaga, PerfilCandidato, ExperienciaProfissional, FormacaoAcademica
+from .models import Profile, Vaga, PerfilCandidato, ExperienciaProfissional, FormacaoAcademica, BuscaSalva
+from .services import match_service, perfil_elite_service
 
 class CadastroForm(forms.ModelForm):
     nome_completo = forms.CharField(
@@ -117,6 +118,20 @@ class VagaForm(forms.ModelForm):
             self.add_error('salario_max', "O salário máximo não pode ser menor que o mínimo.")
         return cleaned_data
 
+class ImportacaoVagasForm(forms.Form):
+    arquivo = forms.FileField(
+        label="Arquivo de vagas (CSV, JSON ou JSON Lines)",
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,.json,.jsonl,.ndjson'})
+    )
+
+    def clean_arquivo(self):
+        from .services.importacao_vagas_service import detectar_formato
+
+        arquivo = self.cleaned_data['arquivo']
+        if not detectar_formato(arquivo.name):
+            raise ValidationError('Envie um arquivo .csv, .json ou .jsonl.')
+        return arquivo
+
 class PerfilCandidatoForm(forms.ModelForm):
     class Meta:
         model = PerfilCandidato
@@ -177,4 +192,164 @@ class FormacaoAcademicaForm(forms.ModelForm):
             'instituicao': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Ex: USP, FIAP, Alura'}),
             'data_inicio': forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}),
             'data_fim': forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}),
-        }
\ No newline at end of file
+        }
+
+class BuscaSalvaForm(forms.ModelForm):
+    class Meta:
+        model = BuscaSalva
+        fields = ['nome', 'palavras_chave', 'modelo_trabalho', 'tipo_contrato', 'salario_minimo']
+
+        widgets = {
+            'nome': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Ex: Python remoto PJ'}),
+            'palavras_chave': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Ex: Python Django'}),
+            'modelo_trabalho': forms.Select(attrs={'class': 'form-select'}),
+            'tipo_contrato': forms.Select(attrs={'class': 'form-select'}),
+            'salario_minimo': forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Ex: 8000'}),
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['modelo_trabalho'].choices = [('', 'Qualquer')] + list(Vaga.MODELO_TRABALHO)
+        self.fields['tipo_contrato'].choices = [('', 'Qualquer')] + list(Vaga.TIPO_CONTRATO)
+
+class TestePerfilForm(forms.Form):
+    # Campos ocultos preenchidos pelo quiz (25 perguntas x 4 pontos)
+    execucao = forms.IntegerField(min_value=0, max_value=100)
+    analise = forms.IntegerField(min_value=0, max_value=100)
+    influencia = forms.IntegerField(min_value=0, max_value=100)
+    estrategia = forms.IntegerField(min_value=0, max_value=100)
+    resiliencia = forms.IntegerField(min_value=0, max_value=100)
+
+class FiltroTalentosForm(forms.Form):
+    execucao = forms.IntegerField(label="Execução", required=False, min_value=0, max_value=100)
+    analise = forms.IntegerField(label="Análise", required=False, min_value=0, max_value=100)
+    influencia = forms.IntegerField(label="Influência", required=False, min_value=0, max_value=100)
+    estrategia = forms.IntegerField(label="Estratégia", required=False, min_value=0, max_value=100)
+    resiliencia = forms.IntegerField(label="Resiliência", required=False, min_value=0, max_value=100)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field in self.fields.values():
+            field.widget.attrs.update({'class': 'form-control', 'placeholder': 'mín.'})
+
+
+class FiltroLocalizacaoForm(forms.Form):
+    RAIOS = ((10, '10 km'), (25, '25 km'), (50, '50 km'), (100, '100 km'), (200, '200 km'))
+
+    cidade = forms.CharField(
+        label="Perto de", required=False, max_length=100,
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Ex: Campinas - SP'}),
+    )
+    raio = forms.TypedChoiceField(
+        label="Raio", choices=RAIOS, coerce=int, initial=50, required=False,
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+
+
+class FiltroFunilForm(forms.Form):
+    vaga = forms.ModelChoiceField(
+        label="Vaga", queryset=Vaga.objects.none(), required=False, empty_label="Todas as vagas",
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+    inicio = forms.DateField(
+        label="De", required=False,
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}),
+    )
+    fim = forms.DateField(
+        label="Até", required=False,
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}),
+    )
+
+    def __init__(self, *args, empresa, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['vaga'].queryset = Vaga.objects.filter(empresa=empresa).only('id', 'titulo', 'codigo_vaga')
+        # Vaga.__str__ consulta o perfil da empresa: aqui basta título e código
+        self.fields['vaga'].label_from_instance = lambda vaga: f"{vaga.titulo} ({vaga.codigo_vaga})"
+
+
+def _pares(texto):
+    """'30:15, 100:8' -> [[30.0, 15], [100.0, 8]]"""
+    pares = []
+    for item in texto.split(','):
+        if item.strip():
+            limite, _, pontos = item.partition(':')
+            try:
+                pares.append([float(limite), int(pontos)])
+            except ValueError:
+                raise ValidationError(f'Use pares "limite:pontos" separados por vírgula ("{item.strip()}").')
+    return pares
+
+
+class RegrasPontuacaoForm(forms.Form):
+    PONTOS = (
+        ('modelo_trabalho', 'Mesmo modelo de trabalho'),
+        ('remoto', 'Vaga remota (qualquer cidade)'),
+        ('salario', 'Pretensão dentro do salário máximo'),
+        ('formacao_concluida', 'Formação concluída'),
+        ('formacao_incompleta', 'Formação em andamento'),
+        ('pontos_competencia', 'Por competência exigida'),
+        ('pontos_idioma', 'Por idioma exigido'),
+        ('maximo', 'Score máximo'),
+    )
+
+    distancia = forms.CharField(
+        label="Distância (km:pontos)", required=False,
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': '30:15, 100:8'}),
+    )
+    experiencia = forms.CharField(
+        label="Experiências (quantidade:pontos)", required=False,
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': '4:20, 2:12, 1:5'}),
+    )
+    competencias = forms.CharField(
+        label="Competências exigidas", required=False,
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Python, Django, SQL'}),
+    )
+    idiomas = forms.CharField(
+        label="Idiomas exigidos (idioma:nível mínimo)", required=False,
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Inglês:avancado, Espanhol:basico'}),
+    )
+
+    def __init__(self, *args, regras, **kwargs):
+        super().__init__(*args, **kwargs)
+        for nome, rotulo in self.PONTOS:
+            self.fields[nome] = forms.IntegerField(
+                label=rotulo, min_value=0, initial=regras[nome],
+                widget=forms.NumberInput(attrs={'class': 'form-control'}),
+            )
+        for eixo in perfil_elite_service.EIXOS:
+            self.fields[f'eixo_{eixo}'] = forms.IntegerField(
+                label=f"Teste de perfil: {Profile._meta.get_field(eixo).verbose_name} (pontos na nota 100)",
+                min_value=0, initial=regras['eixos'].get(eixo, 0),
+                widget=forms.NumberInput(attrs={'class': 'form-control'}),
+            )
+        self.fields['distancia'].initial = ', '.join(f'{l:g}:{p}' for l, p in regras['distancia'])
+        self.fields['experiencia'].initial = ', '.join(f'{l:g}:{p}' for l, p in regras['experiencia'])
+        self.fields['competencias'].initial = ', '.join(regras['competencias'])
+        self.fields['idiomas'].initial = ', '.join(f'{i}:{n}' for i, n in regras['idiomas'].items())
+
+    def clean_distancia(self):
+        return _pares(self.cleaned_data['distancia'])
+
+    def clean_experiencia(self):
+        return _pares(self.cleaned_data['experiencia'])
+
+    def clean_competencias(self):
+        return [c.strip() for c in self.cleaned_data['competencias'].split(',') if c.strip()]
+
+    def clean_idiomas(self):
+        idiomas = {}
+        for item in self.cleaned_data['idiomas'].split(','):
+            if item.strip():
+                idioma, _, nivel = item.partition(':')
+                idiomas[idioma.strip()] = match_service.normalizar(nivel)
+        return idiomas
+
+    def clean(self):
+        dados = super().clean()
+        if self.errors:
+            return dados
+        regras = {nome: dados[nome] for nome in match_service.REGRAS_PADRAO if nome in dados}
+        regras['eixos'] = {eixo: dados[f'eixo_{eixo}'] for eixo in perfil_elite_service.EIXOS}
+        # Mesma validação aplicada às regras gravadas
+        self.regras = match_service.validar(regras)
+        return dados
@@ -0,0 +1,21 @@
+from django.core.handlers.asgi import ASGIHandler
+from django.urls import reverse
+
+
+class ASGIHandlerComFeed(ASGIHandler):
+    """
+    ASGIHandler do Django, exceto para o feed SSE de candidaturas
+    (core.views.feed_candidaturas): essas conexões ficam abertas e ociosas
+    por muito tempo e rodam sem o ThreadSensitiveContext por requisição,
+    que prenderia um thread a cada uma. As partes síncronas delas
+    (middlewares, sessão) usam o thread compartilhado do processo.
+    """
+
+    caminho_feed = None
+
+    async def __call__(self, scope, receive, send):
+        if self.caminho_feed is None:
+            self.caminho_feed = reverse('company_applications_feed')
+        if scope['type'] == 'http' and scope['path'] == self.caminho_feed:
+            return await self.handle(scope, receive, send)
+        return await super().__call__(scope, receive, send)
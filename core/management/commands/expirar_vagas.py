@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.services import arquivo_service
+
+
+class Command(BaseCommand):
+    help = (
+        'Job agendado (cron): encerra vagas vencidas (VAGA_DIAS_EXPIRACAO) e move para '
+        'o arquivo as candidaturas e vagas encerradas além da retenção '
+        '(CANDIDATURA_DIAS_RETENCAO), em lotes curtos. Depois atualiza as estatísticas '
+        'das tabelas (total estimado do admin).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=arquivo_service.TAMANHO_LOTE)
+        parser.add_argument('--sem-arquivo', action='store_true',
+                            help='Apenas encerra vagas vencidas, sem mover nada para o arquivo.')
+
+    def handle(self, *args, **opts):
+        etapas = [('vagas encerradas', arquivo_service.expirar_vagas)]
+        if not opts['sem_arquivo']:
+            etapas += [
+                ('candidaturas arquivadas', arquivo_service.arquivar_candidaturas),
+                ('vagas arquivadas', arquivo_service.arquivar_vagas),
+            ]
+
+        for descricao, etapa in etapas:
+            inicio = time.perf_counter()
+            total = etapa(tamanho_lote=opts['lote'])
+            self.stdout.write(f'{total} {descricao} em {time.perf_counter() - inicio:.1f}s')
+
+        inicio = time.perf_counter()
+        arquivo_service.atualizar_estatisticas()
+        self.stdout.write(f'Estatísticas atualizadas em {time.perf_counter() - inicio:.1f}s')
@@ -0,0 +1,59 @@
+import csv
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.importacao_curriculos_service import importar_curriculos, TAMANHO_LOTE
+from core.services.importacao_vagas_service import detectar_formato
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa currículos no formato JSON Resume (array JSON ou JSON Lines), '
+        'criando usuário, perfil e histórico de cada candidato em lotes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo')
+        parser.add_argument('--formato', choices=('json', 'jsonl'),
+                            help='Padrão: deduzido pela extensão do arquivo.')
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE)
+        parser.add_argument('--fora-do-banco-de-talentos', action='store_true',
+                            help='Não marca os candidatos como disponíveis para alocação.')
+        parser.add_argument('--relatorio', help='CSV de saída com os erros por registro (padrão: stderr).')
+
+    def handle(self, *args, **opts):
+        formato = opts['formato'] or detectar_formato(opts['arquivo'])
+        if formato not in ('json', 'jsonl'):
+            raise CommandError('Use um arquivo .json ou .jsonl (ou informe --formato).')
+
+        saida_relatorio = open(opts['relatorio'], 'w', newline='', encoding='utf-8') \
+            if opts['relatorio'] else sys.stderr
+        relatorio = csv.writer(saida_relatorio)
+        relatorio.writerow(['registro', 'erros'])
+
+        def ao_erro(numero, detalhes):
+            relatorio.writerow([numero, json.dumps(detalhes, ensure_ascii=False)])
+
+        inicio = time.perf_counter()
+        try:
+            with open(opts['arquivo'], encoding='utf-8-sig') as texto:
+                resultado = importar_curriculos(
+                    texto, formato,
+                    disponivel_para_alocacao=not opts['fora_do_banco_de_talentos'],
+                    tamanho_lote=opts['lote'],
+                    ao_erro=ao_erro,
+                )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        finally:
+            if opts['relatorio']:
+                saida_relatorio.close()
+
+        duracao = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado["criados"]} candidatos criados de {resultado["total"]} registros '
+            f'({resultado["erros"]} com erro) em {duracao:.1f}s.'
+        ))
@@ -0,0 +1,60 @@
+import csv
+import json
+import sys
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.importacao_vagas_service import detectar_formato, importar_vagas, TAMANHO_LOTE
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa vagas de um arquivo CSV, JSON ou JSON Lines para uma empresa, '
+        'validando com as regras do VagaForm e inserindo em lotes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo')
+        parser.add_argument('--empresa', required=True, help='E-mail do usuário empresa dono das vagas.')
+        parser.add_argument('--formato', choices=('csv', 'json', 'jsonl'),
+                            help='Padrão: deduzido pela extensão do arquivo.')
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE)
+        parser.add_argument('--relatorio', help='CSV de saída com os erros por registro (padrão: stderr).')
+
+    def handle(self, *args, **opts):
+        try:
+            empresa = User.objects.select_related('profile').get(username=opts['empresa'].lower())
+        except User.DoesNotExist:
+            raise CommandError(f'Usuário {opts["empresa"]} não encontrado.')
+        if empresa.profile.tipo != 'empresa':
+            raise CommandError(f'{opts["empresa"]} não é uma empresa.')
+
+        formato = opts['formato'] or detectar_formato(opts['arquivo'])
+        if not formato:
+            raise CommandError('Não foi possível deduzir o formato; use --formato.')
+
+        saida_relatorio = open(opts['relatorio'], 'w', newline='', encoding='utf-8') \
+            if opts['relatorio'] else sys.stderr
+        relatorio = csv.writer(saida_relatorio)
+        relatorio.writerow(['registro', 'erros'])
+
+        def ao_erro(numero, detalhes):
+            relatorio.writerow([numero, json.dumps(detalhes, ensure_ascii=False)])
+
+        inicio = time.perf_counter()
+        try:
+            with open(opts['arquivo'], encoding='utf-8-sig', newline='') as texto:
+                resultado = importar_vagas(texto, formato, empresa, opts['lote'], ao_erro)
+        except (ValueError, csv.Error) as exc:
+            raise CommandError(str(exc))
+        finally:
+            if opts['relatorio']:
+                saida_relatorio.close()
+
+        duracao = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado["criadas"]} vagas criadas de {resultado["total"]} registros '
+            f'({resultado["erros"]} com erro) em {duracao:.1f}s.'
+        ))
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services import similaridade_service
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconstrói o índice de candidatos similares (IDF e vetores de todos os '
+        'currículos) numa versão nova e a ativa sem interromper as consultas. '
+        'Entre reconstruções, edições de currículo atualizam o índice incrementalmente.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=2000)
+
+    def handle(self, *args, **opts):
+        if not similaridade_service.disponivel():
+            raise CommandError('NumPy não está instalado; o índice de similares está desativado.')
+
+        inicio = time.perf_counter()
+        total = similaridade_service.reconstruir(tamanho_lote=opts['lote'])
+        self.stdout.write(f'{total} candidatos indexados em {time.perf_counter() - inicio:.1f}s')
@@ -0,0 +1,39 @@
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.services import limite_service
+
+TAMANHO_LOTE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Job agendado (cron): apaga do banco as sessões expiradas em lotes '
+        'curtos, sem segurar a trava de escrita do SQLite como o DELETE único '
+        'do clearsessions. As cópias no cache expiram sozinhas. Também apaga '
+        'os baldes do limite de taxa parados (já cheios).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE)
+
+    def handle(self, *args, **opts):
+        inicio = time.perf_counter()
+        agora = timezone.now()
+        total = 0
+        while True:
+            chaves = list(
+                Session.objects.filter(expire_date__lt=agora)
+                .values_list('session_key', flat=True)[:opts['lote']]
+            )
+            if not chaves:
+                break
+            total += Session.objects.filter(session_key__in=chaves).delete()[0]
+        baldes = limite_service.limpar()
+        self.stdout.write(
+            f'{total} sessões expiradas e {baldes} baldes de limite apagados '
+            f'em {time.perf_counter() - inicio:.1f}s'
+        )
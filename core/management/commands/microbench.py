@@ -0,0 +1,209 @@
+import io
+import json
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test import Client, RequestFactory, override_settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import PerfilCandidato, Vaga
+from core.services.match_service import calcular_match
+from core import views
+
+PASTA_RESULTADOS = Path(settings.BASE_DIR) / 'benchmarks' / 'resultados'
+
+# Sessão e usuário lidos do banco a cada requisição x servidos do cache
+CONFIGURACOES_SESSAO = {
+    'db': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+        'AUTHENTICATION_BACKENDS': ['django.contrib.auth.backends.ModelBackend'],
+    },
+    'cached_db': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+        'AUTHENTICATION_BACKENDS': ['core.backends.ModelBackendComCache'],
+    },
+}
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconhecido'
+
+
+class Command(BaseCommand):
+    help = (
+        'Micro-benchmarks (tempo e número de queries) de calcular_match, da listagem '
+        'de vagas e da montagem do currículo, em SQLite em memória. Use --comparar '
+        'para apontar regressões entre dois resultados.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--candidatos', type=int, default=1000,
+                            help='Candidatos avaliados por calcular_match.')
+        parser.add_argument('--escalas-vagas', default='1000,10000',
+                            help='Quantidades de vagas para a listagem, separadas por vírgula.')
+        parser.add_argument('--curriculos', type=int, default=100,
+                            help='Currículos montados no benchmark de visualizar_perfil_candidato.')
+        parser.add_argument('--repeticoes', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--saida', help='Arquivo JSON de saída (padrão: benchmarks/resultados/<commit>.json).')
+        parser.add_argument('--comparar', nargs=2, metavar=('ANTES', 'DEPOIS'),
+                            help='Compara dois arquivos de resultado em vez de medir.')
+        parser.add_argument('--limite', type=float, default=0.1,
+                            help='Piora relativa de tempo aceita no modo --comparar (0.1 = 10%%).')
+
+    def handle(self, *args, **opts):
+        if opts['comparar']:
+            return self._comparar(*opts['comparar'], opts['limite'])
+
+        escalas = sorted(int(e) for e in opts['escalas_vagas'].split(','))
+        self.repeticoes = opts['repeticoes']
+        self.factory = RequestFactory()
+        self.resultados = {}
+
+        runner = DiscoverRunner(verbosity=0)
+        bancos = runner.setup_databases()
+        try:
+            self._executar(escalas, opts)
+        finally:
+            runner.teardown_databases(bancos)
+
+        commit = _commit_atual()
+        saida = Path(opts['saida']) if opts['saida'] else PASTA_RESULTADOS / f'{commit}.json'
+        saida.parent.mkdir(parents=True, exist_ok=True)
+        saida.write_text(json.dumps(
+            {'commit': commit, 'resultados': self.resultados}, indent=2, sort_keys=True
+        ))
+        self.stdout.write(self.style.SUCCESS(f'Resultados gravados em {saida}'))
+
+    # ------------------------------------------------------------------
+    # MEDIÇÃO
+    # ------------------------------------------------------------------
+
+    def _medir(self, nome, funcao):
+        tempos = []
+        queries = 0
+        for _ in range(self.repeticoes):
+            with CaptureQueriesContext(connection) as ctx:
+                inicio = time.perf_counter()
+                funcao()
+                tempos.append(time.perf_counter() - inicio)
+            queries = len(ctx)
+
+        self.resultados[nome] = {
+            'tempo_ms_mediana': round(statistics.median(tempos) * 1000, 3),
+            'tempo_ms_min': round(min(tempos) * 1000, 3),
+            'queries': queries,
+        }
+        r = self.resultados[nome]
+        self.stdout.write(
+            f'{nome:<40} {r["tempo_ms_mediana"]:>10.2f} ms (min {r["tempo_ms_min"]:.2f}) '
+            f'{queries:>6} queries'
+        )
+
+    def _popular(self, prefixo, seed, **kwargs):
+        call_command('popular_base', prefixo=prefixo, seed=seed, stdout=io.StringIO(), **kwargs)
+
+    def _request(self, user):
+        request = self.factory.get('/')
+        request.user = user
+        request.session = SessionStore()
+        request._messages = FallbackStorage(request)
+        return request
+
+    def _executar(self, escalas, opts):
+        # Vagas em incrementos até cada escala; candidatos criados uma vez
+        self._popular('bench-c', opts['seed'], candidatos=opts['candidatos'],
+                      empresas=1, vagas_por_empresa=10, candidaturas_por_candidato=0)
+
+        vaga = Vaga.objects.order_by('id').first()
+        candidatos = list(PerfilCandidato.objects.select_related('user')[:opts['candidatos']])
+
+        def match():
+            for perfil in candidatos:
+                calcular_match(vaga, perfil)
+        self._medir(f'calcular_match[{len(candidatos)} candidatos]', match)
+
+        empresa = vaga.empresa
+        user_ids = [p.user_id for p in candidatos[:opts['curriculos']]]
+
+        def curriculos():
+            request = self._request(empresa)
+            for user_id in user_ids:
+                views.visualizar_perfil_candidato(request, user_id)
+        self._medir(f'visualizar_perfil_candidato[{len(user_ids)}]', curriculos)
+
+        total_vagas = Vaga.objects.count()
+        for i, escala in enumerate(escalas):
+            faltam = escala - total_vagas
+            if faltam > 0:
+                self._popular(f'bench-v{i}', opts['seed'] + i, candidatos=0,
+                              empresas=max(1, faltam // 100), vagas_por_empresa=min(100, faltam))
+                total_vagas = Vaga.objects.count()
+
+            consulta = lambda: list(Vaga.objects.select_related('empresa').order_by('-criada_em'))
+            self._medir(f'vaga_list.queryset[{total_vagas} vagas]', consulta)
+
+            vagas = consulta()
+            request = self._request(AnonymousUser())
+            self._medir(
+                f'vaga_list.template[{total_vagas} vagas]',
+                lambda: render_to_string('vagas/list.html', {'vagas': vagas, 'tipo_usuario': None}, request)
+            )
+
+        self._medir_sessoes(candidatos[0].user, total_vagas)
+
+    def _medir_sessoes(self, usuario, total_vagas):
+        url = reverse('vaga_list')
+        for nome, configuracao in CONFIGURACOES_SESSAO.items():
+            with override_settings(**configuracao):
+                client = Client(HTTP_HOST='localhost')
+                client.force_login(usuario)
+                client.get(url)  # aquece os caches
+                self._medir(f'vaga_list.requisicao[{nome}, {total_vagas} vagas]', lambda: client.get(url))
+
+    # ------------------------------------------------------------------
+    # COMPARAÇÃO
+    # ------------------------------------------------------------------
+
+    def _comparar(self, caminho_antes, caminho_depois, limite):
+        antes = json.loads(Path(caminho_antes).read_text())
+        depois = json.loads(Path(caminho_depois).read_text())
+        self.stdout.write(f'Comparando {antes["commit"]} -> {depois["commit"]}')
+
+        regressoes = []
+        for nome, atual in sorted(depois['resultados'].items()):
+            anterior = antes['resultados'].get(nome)
+            if not anterior:
+                self.stdout.write(f'{nome:<40} (novo)')
+                continue
+            variacao = atual['tempo_ms_mediana'] / max(anterior['tempo_ms_mediana'], 1e-9) - 1
+            self.stdout.write(
+                f'{nome:<40} {anterior["tempo_ms_mediana"]:>10.2f} -> {atual["tempo_ms_mediana"]:>10.2f} ms '
+                f'({variacao:+.1%}), queries {anterior["queries"]} -> {atual["queries"]}'
+            )
+            if variacao > limite:
+                regressoes.append(f'{nome}: tempo {variacao:+.1%}')
+            if atual['queries'] > anterior['queries']:
+                regressoes.append(f'{nome}: queries {anterior["queries"]} -> {atual["queries"]}')
+
+        if regressoes:
+            raise CommandError('Regressões encontradas:\n' + '\n'.join(regressoes))
+        self.stdout.write(self.style.SUCCESS('Nenhuma regressão acima do limite.'))
@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.models import Vaga, PerfilCandidato
+from core.services import localizacao_service
+
+
+class Command(BaseCommand):
+    help = (
+        'Job agendado (cron): associa vagas e perfis de candidato ao município '
+        'descrito no texto livre de localização (após carregar a tabela de '
+        'municípios ou corrigir a normalização), em lotes por id.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=2000)
+
+    def _normalizar(self, modelo, campos, resolver, tamanho_lote):
+        atualizados = 0
+        ultimo = 0
+        while True:
+            lote = list(
+                modelo.objects.filter(pk__gt=ultimo).order_by('pk')
+                .only('pk', 'municipio_id', *campos)[:tamanho_lote]
+            )
+            if not lote:
+                return atualizados
+            ultimo = lote[-1].pk
+            alterados = []
+            for obj in lote:
+                municipio_id = resolver(obj)
+                if municipio_id != obj.municipio_id:
+                    obj.municipio_id = municipio_id
+                    alterados.append(obj)
+            # bulk_update não dispara sinais: o texto não mudou, só o município
+            modelo.objects.bulk_update(alterados, ['municipio'])
+            atualizados += len(alterados)
+
+    def handle(self, *args, **opts):
+        # A tabela pode ter mudado desde que este processo guardou resultados
+        localizacao_service.resolver.cache_clear()
+
+        etapas = [
+            ('vagas', Vaga, ['localizacao'],
+             lambda vaga: localizacao_service.resolver(vaga.localizacao)),
+            ('perfis de candidato', PerfilCandidato, ['cidade', 'estado'],
+             lambda perfil: localizacao_service.resolver(perfil.cidade, perfil.estado)),
+        ]
+        for descricao, modelo, campos, resolver in etapas:
+            inicio = time.perf_counter()
+            total = self._normalizar(modelo, campos, resolver, opts['lote'])
+            self.stdout.write(f'{total} {descricao} atualizados em {time.perf_counter() - inicio:.1f}s')
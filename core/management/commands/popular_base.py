@@ -0,0 +1,315 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import (
+    Profile, PerfilCandidato, ExperienciaProfissional, FormacaoAcademica,
+    Competencia, Idioma, Vaga, Candidatura
+)
+from core.services import historico_status_service
+
+# ----------------------------------------------------------------------
+# VOCABULÁRIO PARA DADOS REALISTAS
+# ----------------------------------------------------------------------
+
+NOMES = (
+    'Ana', 'Bruno', 'Camila', 'Diego', 'Eduarda', 'Felipe', 'Gabriela', 'Henrique',
+    'Isabela', 'João', 'Larissa', 'Lucas', 'Mariana', 'Mateus', 'Natália', 'Pedro',
+    'Rafaela', 'Rodrigo', 'Sofia', 'Thiago', 'Vinícius', 'Juliana', 'Carlos', 'Beatriz',
+)
+SOBRENOMES = (
+    'Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira',
+    'Lima', 'Gomes', 'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Almeida', 'Lopes',
+)
+CIDADES = (
+    ('São Paulo', 'SP'), ('Campinas', 'SP'), ('Rio de Janeiro', 'RJ'), ('Niterói', 'RJ'),
+    ('Belo Horizonte', 'MG'), ('Curitiba', 'PR'), ('Porto Alegre', 'RS'), ('Florianópolis', 'SC'),
+    ('Salvador', 'BA'), ('Recife', 'PE'), ('Fortaleza', 'CE'), ('Brasília', 'DF'),
+    ('Goiânia', 'GO'), ('Manaus', 'AM'), ('Belém', 'PA'), ('Vitória', 'ES'),
+)
+CARGOS = (
+    'Desenvolvedor Python', 'Desenvolvedor Full Stack', 'Engenheiro de Dados',
+    'Analista de Suporte', 'Designer UX/UI', 'Analista Financeiro', 'Gerente de Projetos',
+    'Analista de RH', 'Cientista de Dados', 'Desenvolvedor Front-end', 'Analista de Marketing',
+    'Assistente Administrativo', 'Engenheiro DevOps', 'Product Manager', 'Analista Contábil',
+)
+DEPARTAMENTOS = ('Tecnologia', 'Financeiro', 'Recursos Humanos', 'Marketing', 'Operações', 'Produto')
+COMPETENCIAS = (
+    'Python', 'Django', 'JavaScript', 'React', 'SQL', 'Excel', 'Power BI', 'Docker',
+    'AWS', 'Figma', 'Scrum', 'Comunicação', 'Liderança', 'Negociação', 'Java', 'Git',
+)
+IDIOMAS = ('Inglês', 'Espanhol', 'Francês', 'Alemão', 'Italiano')
+CURSOS = (
+    'Ciência da Computação', 'Sistemas de Informação', 'Administração', 'Engenharia de Produção',
+    'Análise e Desenvolvimento de Sistemas', 'Ciências Contábeis', 'Design', 'Psicologia',
+)
+INSTITUICOES = ('USP', 'UNICAMP', 'UFRJ', 'UFMG', 'PUC-Rio', 'FIAP', 'Mackenzie', 'UFPE', 'UnB')
+EMPRESAS = ('Tech', 'Soluções', 'Sistemas', 'Digital', 'Consultoria', 'Logística', 'Varejo', 'Serviços')
+
+SENHA_PADRAO = 'trabalheja123'
+
+
+class Command(BaseCommand):
+    help = (
+        'Popula a base com dados sintéticos (empresas, candidatos, currículos, vagas '
+        'e candidaturas) em lotes com bulk_create, para benchmarks em escala.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--candidatos', type=int, default=1000)
+        parser.add_argument('--empresas', type=int, default=50)
+        parser.add_argument('--vagas-por-empresa', type=int, default=20)
+        parser.add_argument('--candidaturas-por-candidato', type=int, default=5)
+        parser.add_argument('--lote', type=int, default=5000, help='Linhas de usuário por transação.')
+        parser.add_argument('--seed', type=int, default=42, help='Semente do gerador aleatório.')
+        parser.add_argument(
+            '--prefixo', default='seed',
+            help='Prefixo dos e-mails e códigos de vaga, para permitir várias cargas na mesma base.'
+        )
+        parser.add_argument('--senha', default=SENHA_PADRAO, help='Senha de todos os usuários gerados.')
+
+    def handle(self, *args, **opts):
+        self.rng = random.Random(opts['seed'])
+        self.prefixo = opts['prefixo']
+        self.lote = opts['lote']
+
+        if User.objects.filter(username__startswith=f'{self.prefixo}.').exists():
+            raise CommandError(
+                f'Já existem usuários com o prefixo "{self.prefixo}". Use outro --prefixo.'
+            )
+
+        # O hash PBKDF2 é caro: calculamos uma vez e reaproveitamos em todos os usuários
+        self.senha_hash = make_password(opts['senha'])
+        self.total_linhas = 0
+        self.inicio = time.perf_counter()
+
+        empresa_ids = self._criar_empresas(opts['empresas'])
+        vaga_ids = self._criar_vagas(empresa_ids, opts['vagas_por_empresa'])
+        self._criar_candidatos(opts['candidatos'], vaga_ids, opts['candidaturas_por_candidato'])
+
+        duracao = time.perf_counter() - self.inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'Concluído: {self.total_linhas} linhas em {duracao:.1f}s '
+            f'({self.total_linhas / max(duracao, 1e-9):,.0f} linhas/s).'
+        ))
+
+    # ------------------------------------------------------------------
+    # AUXILIARES
+    # ------------------------------------------------------------------
+
+    def _progresso(self, etapa, feitos, total, linhas):
+        self.total_linhas += linhas
+        duracao = time.perf_counter() - self.inicio
+        self.stdout.write(
+            f'[{etapa}] {feitos}/{total} — {self.total_linhas} linhas '
+            f'({self.total_linhas / max(duracao, 1e-9):,.0f} linhas/s)'
+        )
+
+    def _criar_usuarios(self, tipo, inicio, fim):
+        # bulk_create não dispara post_save, então o signal criar_profile não
+        # roda aqui: os Profiles são criados em lote logo em seguida.
+        usuarios = []
+        for i in range(inicio, fim):
+            email = f'{self.prefixo}.{tipo}{i}@exemplo.com.br'
+            usuarios.append(User(
+                username=email, email=email, password=self.senha_hash,
+                first_name=self.rng.choice(NOMES), last_name=self.rng.choice(SOBRENOMES),
+            ))
+        usuarios = User.objects.bulk_create(usuarios)
+
+        # Bancos sem RETURNING no bulk insert não preenchem o pk
+        if usuarios and usuarios[0].pk is None:
+            ids = dict(User.objects.filter(
+                username__in=[u.username for u in usuarios]
+            ).values_list('username', 'id'))
+            for u in usuarios:
+                u.pk = ids[u.username]
+        return usuarios
+
+    def _data(self, anos_atras_max):
+        return date.today() - timedelta(days=self.rng.randint(30, anos_atras_max * 365))
+
+    # ------------------------------------------------------------------
+    # EMPRESAS E VAGAS
+    # ------------------------------------------------------------------
+
+    def _criar_empresas(self, total):
+        ids = []
+        for inicio in range(0, total, self.lote):
+            fim = min(inicio + self.lote, total)
+            with transaction.atomic():
+                usuarios = self._criar_usuarios('empresa', inicio, fim)
+                Profile.objects.bulk_create([
+                    Profile(
+                        user_id=u.pk, tipo='empresa',
+                        nome_completo=f'{u.last_name} {self.rng.choice(EMPRESAS)} Ltda',
+                        cnpj=f'{self.rng.randint(10, 99)}.{self.rng.randint(100, 999)}.'
+                             f'{self.rng.randint(100, 999)}/0001-{self.rng.randint(10, 99)}',
+                    )
+                    for u in usuarios
+                ])
+            ids.extend(u.pk for u in usuarios)
+            self._progresso('empresas', fim, total, len(usuarios) * 2)
+        return ids
+
+    def _nova_vaga(self, empresa_id, codigo):
+        cidade, uf = self.rng.choice(CIDADES)
+        cargo = self.rng.choice(CARGOS)
+        salario_min = Decimal(self.rng.randrange(1500, 15000, 100))
+        skills = ', '.join(self.rng.sample(COMPETENCIAS, 4))
+        return Vaga(
+            empresa_id=empresa_id,
+            titulo=cargo,
+            departamento=self.rng.choice(DEPARTAMENTOS),
+            codigo_vaga=codigo,
+            modelo_trabalho=self.rng.choice(Vaga.MODELO_TRABALHO)[0],
+            localizacao=f'{cidade} - {uf}',
+            tipo_contrato=self.rng.choice(Vaga.TIPO_CONTRATO)[0],
+            carga_horaria=self.rng.choice(('40h semanais', '44h semanais', '30h semanais')),
+            resumo=f'Buscamos {cargo} para atuar no time de {cidade}.',
+            responsabilidades=f'Atuar com {skills} no dia a dia da equipe.',
+            requisitos_obrigatorios=f'Experiência com {skills}.',
+            requisitos_desejaveis=self.rng.choice(COMPETENCIAS),
+            beneficios='Vale-refeição, plano de saúde, Gympass',
+            salario_min=salario_min,
+            salario_max=salario_min + Decimal(self.rng.randrange(0, 6000, 100)),
+        )
+
+    def _criar_vagas(self, empresa_ids, por_empresa):
+        total = len(empresa_ids) * por_empresa
+        ids = []
+        pendentes = []
+        seq = 0
+        for empresa_id in empresa_ids:
+            for _ in range(por_empresa):
+                pendentes.append(self._nova_vaga(empresa_id, f'{self.prefixo.upper()}-{seq:08d}'))
+                seq += 1
+                if len(pendentes) >= self.lote:
+                    ids.extend(self._gravar_vagas(pendentes, len(ids) + len(pendentes), total))
+                    pendentes = []
+        if pendentes:
+            ids.extend(self._gravar_vagas(pendentes, total, total))
+        return ids
+
+    def _gravar_vagas(self, vagas, feitos, total):
+        with transaction.atomic():
+            vagas = Vaga.objects.bulk_create(vagas)
+        if vagas and vagas[0].pk is None:
+            ids = list(Vaga.objects.filter(
+                codigo_vaga__in=[v.codigo_vaga for v in vagas]
+            ).values_list('id', flat=True))
+        else:
+            ids = [v.pk for v in vagas]
+        self._progresso('vagas', feitos, total, len(vagas))
+        return ids
+
+    # ------------------------------------------------------------------
+    # CANDIDATOS, CURRÍCULOS E CANDIDATURAS
+    # ------------------------------------------------------------------
+
+    def _criar_candidatos(self, total, vaga_ids, candidaturas_por_candidato):
+        candidaturas_por_candidato = min(candidaturas_por_candidato, len(vaga_ids))
+
+        for inicio in range(0, total, self.lote):
+            fim = min(inicio + self.lote, total)
+            with transaction.atomic():
+                usuarios = self._criar_usuarios('candidato', inicio, fim)
+                linhas = len(usuarios)
+
+                profiles, perfis = [], []
+                experiencias, formacoes, competencias, idiomas, candidaturas = [], [], [], [], []
+
+                for u in usuarios:
+                    profiles.append(Profile(
+                        user_id=u.pk, tipo='candidato',
+                        nome_completo=f'{u.first_name} {u.last_name}',
+                        disponivel_para_alocacao=self.rng.random() < 0.3,
+                    ))
+                    perfis.append(self._novo_perfil(u))
+                    experiencias.extend(self._novas_experiencias(u.pk))
+                    formacoes.extend(self._novas_formacoes(u.pk))
+                    competencias.extend(
+                        Competencia(candidato_id=u.pk, nome=nome)
+                        for nome in self.rng.sample(COMPETENCIAS, self.rng.randint(2, 8))
+                    )
+                    idiomas.extend(
+                        Idioma(candidato_id=u.pk, idioma=idioma, nivel=self.rng.choice(
+                            ('basico', 'intermediario', 'avancado', 'fluente')))
+                        for idioma in self.rng.sample(IDIOMAS, self.rng.randint(0, 2))
+                    )
+                    if candidaturas_por_candidato:
+                        candidaturas.extend(
+                            Candidatura(
+                                vaga_id=vaga_id, candidato_id=u.pk,
+                                status=self.rng.choice(Candidatura.STATUS_CHOICES)[0],
+                                score=self.rng.randint(0, 100),
+                            )
+                            for vaga_id in self.rng.sample(vaga_ids, candidaturas_por_candidato)
+                        )
+
+                for modelo, objs in (
+                    (Profile, profiles), (PerfilCandidato, perfis),
+                    (ExperienciaProfissional, experiencias), (FormacaoAcademica, formacoes),
+                    (Competencia, competencias), (Idioma, idiomas), (Candidatura, candidaturas),
+                ):
+                    modelo.objects.bulk_create(objs)
+                    linhas += len(objs)
+                # Sem post_save: o primeiro evento do histórico (e a entrada no
+                # funil) é gravado aqui, já no status sorteado
+                historico_status_service.registrar_criacao(candidaturas)
+                linhas += len(candidaturas)
+
+            self._progresso('candidatos', fim, total, linhas)
+
+    def _novo_perfil(self, user):
+        cidade, uf = self.rng.choice(CIDADES)
+        cargo = self.rng.choice(CARGOS)
+        return PerfilCandidato(
+            user_id=user.pk,
+            titulo_profissional=cargo,
+            resumo_profissional=(
+                f'{cargo} com experiência em {", ".join(self.rng.sample(COMPETENCIAS, 3))}.'
+            ),
+            email_contato=user.email,
+            whatsapp=f'({self.rng.randint(11, 99)}) 9{self.rng.randint(1000, 9999)}-{self.rng.randint(1000, 9999)}',
+            cidade=cidade,
+            estado=uf,
+            modelo_trabalho=self.rng.choice(('remoto', 'hibrido', 'presencial')),
+            disponibilidade=self.rng.choice(('imediata', '15_dias', '30_dias')),
+            pretensao_salarial=Decimal(self.rng.randrange(1500, 20000, 100)),
+        )
+
+    def _novas_experiencias(self, user_id):
+        experiencias = []
+        for i in range(self.rng.randint(0, 5)):
+            inicio = self._data(15)
+            atual = i == 0 and self.rng.random() < 0.5
+            experiencias.append(ExperienciaProfissional(
+                candidato_id=user_id,
+                cargo=self.rng.choice(CARGOS),
+                empresa=f'{self.rng.choice(SOBRENOMES)} {self.rng.choice(EMPRESAS)}',
+                data_inicio=inicio,
+                data_fim=None if atual else inicio + timedelta(days=self.rng.randint(90, 1500)),
+                atual=atual,
+                descricao='Atuação em projetos da área com entregas contínuas.',
+            ))
+        return experiencias
+
+    def _novas_formacoes(self, user_id):
+        return [
+            FormacaoAcademica(
+                candidato_id=user_id,
+                grau=self.rng.choice(FormacaoAcademica.GRAU_CHOICES)[0],
+                curso=self.rng.choice(CURSOS),
+                instituicao=self.rng.choice(INSTITUICOES),
+                status=self.rng.choice(FormacaoAcademica.STATUS_CHOICES)[0],
+                data_inicio=self._data(20),
+            )
+            for _ in range(self.rng.randint(0, 3))
+        ]
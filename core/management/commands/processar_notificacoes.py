@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.services import notificacao_service
+
+
+class Command(BaseCommand):
+    help = (
+        'Job agendado (cron): distribui as vagas publicadas aos candidatos compatíveis do '
+        'banco de talentos e envia os e-mails pendentes em lotes, respeitando '
+        'NOTIFICACAO_INTERVALO_HORAS por candidato.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=notificacao_service.TAMANHO_LOTE,
+                            help='E-mails enviados por lote na mesma conexão SMTP.')
+        parser.add_argument('--limite', type=int,
+                            help='Máximo de e-mails nesta execução (limite do provedor).')
+        parser.add_argument('--continuo', type=int, metavar='SEGUNDOS',
+                            help='Repete o ciclo a cada SEGUNDOS em vez de sair.')
+
+    def handle(self, *args, **opts):
+        while True:
+            inicio = time.perf_counter()
+            criadas = notificacao_service.processar_disparos()
+            enviados = notificacao_service.enviar_pendentes(opts['lote'], opts['limite'])
+            self.stdout.write(
+                f'{criadas} notificações geradas, {enviados} e-mails enviados '
+                f'em {time.perf_counter() - inicio:.1f}s'
+            )
+            if not opts['continuo']:
+                return
+            time.sleep(opts['continuo'])
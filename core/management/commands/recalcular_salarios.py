@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.services import salario_service
+
+
+class Command(BaseCommand):
+    help = (
+        'Job agendado (cron): reconstrói o histograma de salários (vagas e '
+        'pretensões por título, UF, modelo e contrato) a partir das tabelas. '
+        'O histograma é mantido a cada save; este job corrige desvios de '
+        'edições concorrentes e carrega os dados existentes após a migração.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=salario_service.TAMANHO_LOTE)
+
+    def handle(self, *args, **opts):
+        inicio = time.perf_counter()
+        total = salario_service.reconstruir(tamanho_lote=opts['lote'])
+        self.stdout.write(f'{total} baldes gravados em {time.perf_counter() - inicio:.1f}s')
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.models import Vaga
+from core.services import duplicatas_service
+
+
+class Command(BaseCommand):
+    help = (
+        'Relatório das vagas ativas quase iguais (MinHash/LSH), agrupadas. Com --reindexar, '
+        'recalcula antes as assinaturas de todo o catálogo num pool de processos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reindexar', action='store_true',
+                            help='Recalcula as assinaturas de todas as vagas antes do relatório.')
+        parser.add_argument('--processos', type=int,
+                            help='Processos do pool na reindexação (padrão: um por CPU).')
+        parser.add_argument('--limiar', type=float, default=duplicatas_service.LIMIAR,
+                            help='Similaridade mínima (0 a 1) para considerar duplicata.')
+
+    def handle(self, *args, **opts):
+        if opts['reindexar']:
+            inicio = time.perf_counter()
+            total = duplicatas_service.reindexar(opts['processos'])
+            self.stdout.write(f'{total} vagas reindexadas em {time.perf_counter() - inicio:.1f}s')
+
+        inicio = time.perf_counter()
+        grupos = duplicatas_service.grupos_duplicados(opts['limiar'])
+
+        for numero, ids in enumerate(grupos, start=1):
+            self.stdout.write(f'\nGrupo {numero} ({len(ids)} vagas)')
+            vagas = Vaga.objects.filter(id__in=ids).select_related('empresa__profile').order_by('criada_em')
+            for vaga in vagas:
+                empresa = vaga.empresa.profile.nome_completo or vaga.empresa.email
+                self.stdout.write(
+                    f'  [{vaga.id}] {vaga.codigo_vaga} · {vaga.titulo} · {empresa} · '
+                    f'{vaga.criada_em:%d/%m/%Y}'
+                )
+
+        duplicadas = sum(len(ids) - 1 for ids in grupos)
+        self.stdout.write(
+            f'\n{len(grupos)} grupos, {duplicadas} vagas excedentes '
+            f'em {time.perf_counter() - inicio:.1f}s'
+        )
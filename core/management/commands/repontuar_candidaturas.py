@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.models import Vaga
+from core.services import match_service
+
+
+class Command(BaseCommand):
+    help = (
+        'Job agendado (cron): recalcula o score das candidaturas das vagas cujas '
+        'regras de pontuação mudaram desde a última execução, em lotes. Com '
+        '--todas, repontua as candidaturas de todas as vagas ativas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=match_service.TAMANHO_LOTE)
+        parser.add_argument('--todas', action='store_true',
+                            help='Repontua todas as vagas ativas (ex.: após mudar REGRAS_PADRAO).')
+        parser.add_argument('--continuo', type=int, metavar='SEGUNDOS',
+                            help='Repete a repontuação pendente a cada SEGUNDOS em vez de sair.')
+
+    def handle(self, *args, **opts):
+        if opts['todas']:
+            inicio = time.perf_counter()
+            total = sum(
+                match_service.repontuar_vaga(vaga, opts['lote'])
+                for vaga in Vaga.objects.filter(ativa=True).select_related('regras_pontuacao', 'municipio')
+            )
+            self.stdout.write(f'{total} candidaturas repontuadas em {time.perf_counter() - inicio:.1f}s')
+            return
+
+        while True:
+            inicio = time.perf_counter()
+            total = match_service.processar_pendentes(opts['lote'])
+            self.stdout.write(f'{total} candidaturas repontuadas em {time.perf_counter() - inicio:.1f}s')
+            if not opts['continuo']:
+                return
+            time.sleep(opts['continuo'])
@@ -0,0 +1,248 @@
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.forms.models import model_to_dict
+from django.urls import reverse
+
+from core.management.commands.popular_base import SENHA_PADRAO
+from core.models import Candidatura, PerfilCandidato, Profile, Vaga
+
+BASELINE_PADRAO = Path(settings.BASE_DIR) / 'benchmarks' / 'carga_baseline.json'
+
+
+def percentil(valores_ordenados, p):
+    if not valores_ordenados:
+        return 0.0
+    indice = max(0, min(len(valores_ordenados) - 1, round(p / 100 * len(valores_ordenados)) - 1))
+    return valores_ordenados[indice]
+
+
+class UsuarioVirtual:
+    """Sessão HTTP de um usuário com login, cookies e token CSRF."""
+
+    def __init__(self, base_url, email, senha, registrar):
+        self.base_url = base_url.rstrip('/')
+        self.email = email
+        self.senha = senha
+        self.registrar = registrar
+        self.sessao = requests.Session()
+
+    def _csrf(self):
+        return self.sessao.cookies.get('csrftoken', '')
+
+    def _medir(self, rota, metodo, url, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            resposta = self.sessao.request(
+                metodo, self.base_url + url, allow_redirects=False, timeout=30, **kwargs
+            )
+            erro = resposta.status_code >= 400
+            limitada = resposta.status_code == 429
+        except requests.RequestException:
+            erro, limitada = True, False
+        self.registrar(rota, time.perf_counter() - inicio, erro, limitada)
+
+    def get(self, rota, url):
+        self._medir(rota, 'GET', url)
+
+    def post(self, rota, url, dados):
+        dados = dict(dados, csrfmiddlewaretoken=self._csrf())
+        self._medir(f'{rota} [POST]', 'POST', url, data=dados, headers={'X-CSRFToken': self._csrf()})
+
+    def login(self):
+        url = reverse('login')
+        self.get('login', url)
+        self.post('login', url, {'username': self.email, 'password': self.senha})
+
+
+class Command(BaseCommand):
+    help = (
+        'Teste de carga contra uma instância em execução (runserver/gunicorn) usando '
+        'a base populada por popular_base. Reporta p50/p95/p99 e vazão por rota e '
+        'compara com um baseline salvo. Suba o servidor com TRABALHEJA_LIMITES=0: '
+        'todas as requisições saem do mesmo IP e esbarrariam no limite de taxa.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000')
+        parser.add_argument('--usuarios', type=int, default=20, help='Usuários virtuais simultâneos.')
+        parser.add_argument('--duracao', type=int, default=60, help='Duração do teste em segundos.')
+        parser.add_argument('--proporcao-empresas', type=float, default=0.2)
+        parser.add_argument('--senha', default=SENHA_PADRAO)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--baseline', default=str(BASELINE_PADRAO))
+        parser.add_argument('--salvar-baseline', action='store_true',
+                            help='Grava o resultado como novo baseline em vez de comparar.')
+        parser.add_argument('--tolerancia', type=float, default=0.2,
+                            help='Piora relativa de p95 aceita antes de falhar (0.2 = 20%%).')
+
+    def handle(self, *args, **opts):
+        self.rng = random.Random(opts['seed'])
+        self.amostras = defaultdict(list)
+        self.erros = defaultdict(int)
+        self.limitadas = defaultdict(int)
+        self.lock = threading.Lock()
+
+        self._carregar_dados()
+
+        prazo = time.monotonic() + opts['duracao']
+        n_empresas = round(opts['usuarios'] * opts['proporcao_empresas']) if self.empresas else 0
+        jornadas = (
+            [self._jornada_empresa] * n_empresas
+            + [self._jornada_candidato] * (opts['usuarios'] - n_empresas)
+        )
+
+        self.stdout.write(
+            f'Disparando {len(jornadas)} usuários virtuais contra {opts["url"]} '
+            f'por {opts["duracao"]}s...'
+        )
+        inicio = time.monotonic()
+        with ThreadPoolExecutor(max_workers=len(jornadas)) as pool:
+            futuros = [
+                pool.submit(jornada, opts['url'], opts['senha'], prazo, random.Random(self.rng.random()))
+                for jornada in jornadas
+            ]
+            for futuro in futuros:
+                futuro.result()
+        duracao = time.monotonic() - inicio
+
+        resultado = self._resumir(duracao)
+        self._imprimir(resultado)
+
+        if self.limitadas:
+            # Respostas 429 medem o limitador, não a aplicação: o resultado não serve de baseline
+            raise CommandError(
+                f'O servidor recusou {sum(self.limitadas.values())} requisições por limite de taxa '
+                f'({", ".join(sorted(self.limitadas))}). Suba-o com TRABALHEJA_LIMITES=0 e repita o teste.'
+            )
+
+        caminho = Path(opts['baseline'])
+        if opts['salvar_baseline']:
+            caminho.parent.mkdir(parents=True, exist_ok=True)
+            caminho.write_text(json.dumps(resultado, indent=2, sort_keys=True))
+            self.stdout.write(self.style.SUCCESS(f'Baseline salvo em {caminho}'))
+        elif caminho.exists():
+            self._comparar(resultado, json.loads(caminho.read_text()), opts['tolerancia'])
+
+    # ------------------------------------------------------------------
+    # DADOS E JORNADAS
+    # ------------------------------------------------------------------
+
+    def _carregar_dados(self):
+        candidatos = list(Profile.objects.filter(
+            tipo='candidato', user__perfilcandidato__isnull=False
+        ).values_list('user__email', flat=True)[:5000])
+        self.empresas = list(Profile.objects.filter(
+            tipo='empresa', user__vagas__isnull=False
+        ).values_list('user_id', 'user__email').distinct()[:500])
+        self.vaga_ids = list(Vaga.objects.filter(ativa=True).values_list('id', flat=True)[:20000])
+
+        if not candidatos or not self.vaga_ids:
+            raise CommandError('Base vazia: rode "manage.py popular_base" antes do teste de carga.')
+        self.candidatos = candidatos
+
+    def _registrar(self, rota, duracao, erro, limitada=False):
+        with self.lock:
+            self.amostras[rota].append(duracao)
+            if limitada:
+                self.limitadas[rota] += 1
+            elif erro:
+                self.erros[rota] += 1
+
+    def _jornada_candidato(self, base_url, senha, prazo, rng):
+        usuario = UsuarioVirtual(base_url, rng.choice(self.candidatos), senha, self._registrar)
+        usuario.login()
+        perfil = PerfilCandidato.objects.filter(user__email=usuario.email).first()
+        dados_perfil = {
+            k: v for k, v in model_to_dict(perfil, exclude=['user', 'foto', 'id']).items() if v is not None
+        } if perfil else None
+
+        while time.monotonic() < prazo:
+            vaga_id = rng.choice(self.vaga_ids)
+            usuario.get('vaga_list', reverse('vaga_list'))
+            usuario.get('vaga_detail', reverse('vaga_detail', args=[vaga_id]))
+            usuario.get('vaga_apply', reverse('vaga_apply', args=[vaga_id]))
+            usuario.post('vaga_apply', reverse('vaga_apply', args=[vaga_id]),
+                         {'mensagem': 'Tenho interesse na vaga.'})
+            usuario.get('candidate_applications', reverse('candidate_applications'))
+            if dados_perfil and rng.random() < 0.2:
+                usuario.get('candidate_profile_edit', reverse('candidate_profile_edit'))
+                usuario.post('candidate_profile_edit', reverse('candidate_profile_edit'), dados_perfil)
+
+    def _jornada_empresa(self, base_url, senha, prazo, rng):
+        empresa_id, email = rng.choice(self.empresas)
+        usuario = UsuarioVirtual(base_url, email, senha, self._registrar)
+        usuario.login()
+        vagas = list(Vaga.objects.filter(empresa_id=empresa_id).values_list('id', flat=True)[:200])
+        status = [s for s, _ in Candidatura.STATUS_CHOICES]
+
+        while time.monotonic() < prazo:
+            vaga_id = rng.choice(vagas)
+            usuario.get('company_dashboard', reverse('company_dashboard'))
+            usuario.get('vaga_applicants', reverse('vaga_applicants', args=[vaga_id]))
+
+            candidaturas = list(Candidatura.objects.filter(
+                vaga_id=vaga_id
+            ).values_list('id', 'candidato_id')[:50])
+            if not candidaturas:
+                continue
+            candidatura_id, candidato_id = rng.choice(candidaturas)
+            usuario.post('application_status_update',
+                         reverse('application_status_update', args=[candidatura_id]),
+                         {'status': rng.choice(status)})
+            usuario.get('company_view_candidate', reverse('company_view_candidate', args=[candidato_id]))
+
+    # ------------------------------------------------------------------
+    # RELATÓRIO E BASELINE
+    # ------------------------------------------------------------------
+
+    def _resumir(self, duracao):
+        resultado = {}
+        for rota, tempos in sorted(self.amostras.items()):
+            tempos.sort()
+            resultado[rota] = {
+                'requisicoes': len(tempos),
+                'erros': self.erros[rota],
+                'rps': round(len(tempos) / duracao, 2),
+                'p50_ms': round(percentil(tempos, 50) * 1000, 1),
+                'p95_ms': round(percentil(tempos, 95) * 1000, 1),
+                'p99_ms': round(percentil(tempos, 99) * 1000, 1),
+            }
+        return resultado
+
+    def _imprimir(self, resultado):
+        self.stdout.write(
+            f'\n{"rota":<34} {"req":>7} {"erros":>6} {"req/s":>8} {"p50":>8} {"p95":>8} {"p99":>8}'
+        )
+        for rota, r in resultado.items():
+            self.stdout.write(
+                f'{rota:<34} {r["requisicoes"]:>7} {r["erros"]:>6} {r["rps"]:>8} '
+                f'{r["p50_ms"]:>8} {r["p95_ms"]:>8} {r["p99_ms"]:>8}'
+            )
+
+    def _comparar(self, resultado, baseline, tolerancia):
+        regressoes = []
+        for rota, atual in resultado.items():
+            anterior = baseline.get(rota)
+            if not anterior:
+                continue
+            limite = anterior['p95_ms'] * (1 + tolerancia)
+            if atual['p95_ms'] > limite:
+                regressoes.append(
+                    f'{rota}: p95 {atual["p95_ms"]} ms > {limite:.1f} ms '
+                    f'(baseline {anterior["p95_ms"]} ms)'
+                )
+            if atual['erros'] > anterior.get('erros', 0) and atual['erros'] / atual['requisicoes'] > 0.01:
+                regressoes.append(f'{rota}: {atual["erros"]} erros em {atual["requisicoes"]} requisições')
+
+        if regressoes:
+            raise CommandError('Regressões em relação ao baseline:\n' + '\n'.join(regressoes))
+        self.stdout.write(self.style.SUCCESS('Sem regressões em relação ao baseline.'))
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services import vagas_similares_service
+
+
+class Command(BaseCommand):
+    help = (
+        'Job agendado (cron): refaz as listas de vagas similares afetadas pelas vagas '
+        'criadas, alteradas ou encerradas desde a última execução. Com --reconstruir, '
+        'recalcula todas as listas em paralelo num pool de processos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reconstruir', action='store_true',
+                            help='Recalcula as listas de todas as vagas ativas.')
+        parser.add_argument('--processos', type=int,
+                            help='Processos do pool na reconstrução (padrão: um por CPU).')
+        parser.add_argument('--continuo', type=int, metavar='SEGUNDOS',
+                            help='Repete a atualização incremental a cada SEGUNDOS em vez de sair.')
+
+    def handle(self, *args, **opts):
+        if not vagas_similares_service.disponivel():
+            raise CommandError('NumPy não está instalado; as vagas similares estão desativadas.')
+
+        if opts['reconstruir']:
+            inicio = time.perf_counter()
+            total = vagas_similares_service.reconstruir(opts['processos'])
+            self.stdout.write(f'{total} vagas processadas em {time.perf_counter() - inicio:.1f}s')
+            return
+
+        while True:
+            inicio = time.perf_counter()
+            total = vagas_similares_service.processar_pendentes()
+            self.stdout.write(f'{total} listas atualizadas em {time.perf_counter() - inicio:.1f}s')
+            if not opts['continuo']:
+                return
+            time.sleep(opts['continuo'])
@@ -0,0 +1,202 @@
+import logging
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.template.backends.django import Template as DjangoTemplate
+
+from .services import profiling_service
+
+logger = logging.getLogger('core.profiling')
+
+# Coleta da requisição em andamento (None fora do middleware)
+_coleta_atual = ContextVar('coleta_profiling', default=None)
+
+# Quantas queries guardamos por requisição para o relatório de lentidão
+MAX_SQL_GUARDADAS = 200
+
+
+class _Coleta:
+    __slots__ = ('queries', 'tempo_sql', 'tempo_template', 'cache_hits',
+                 'cache_misses', 'no_cache', 'sqls')
+
+    def __init__(self):
+        self.queries = 0
+        self.tempo_sql = 0.0
+        self.tempo_template = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.no_cache = False
+        self.sqls = []
+
+
+# ----------------------------------------------------------------------
+# INSTRUMENTAÇÃO (SQL, TEMPLATES E CACHE)
+# ----------------------------------------------------------------------
+
+def _wrapper_sql(execute, sql, params, many, context):
+    coleta = _coleta_atual.get()
+    if coleta is None:
+        return execute(sql, params, many, context)
+
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duracao = time.perf_counter() - inicio
+        coleta.queries += 1
+        coleta.tempo_sql += duracao
+        if len(coleta.sqls) < MAX_SQL_GUARDADAS:
+            coleta.sqls.append((duracao, sql))
+
+
+def _instrumentar_templates():
+    if getattr(DjangoTemplate.render, '_profiling', False):
+        return
+
+    render_original = DjangoTemplate.render
+
+    def render(self, context=None, request=None):
+        coleta = _coleta_atual.get()
+        if coleta is None:
+            return render_original(self, context, request)
+        inicio = time.perf_counter()
+        try:
+            return render_original(self, context, request)
+        finally:
+            coleta.tempo_template += time.perf_counter() - inicio
+
+    render._profiling = True
+    DjangoTemplate.render = render
+
+
+def _instrumentar_cache():
+    # Os backends do Django não emitem sinais; instrumentamos as classes
+    # configuradas uma única vez por processo. get e get_many chamam um ao
+    # outro conforme o backend (BaseCache.get_many usa get, DatabaseCache.get
+    # usa get_many): só a chamada de fora conta, marcada em `coleta.no_cache`.
+    for alias in settings.CACHES:
+        classe = type(caches[alias])
+        if getattr(classe.get, '_profiling', False):
+            continue
+
+        get_original = classe.get
+        get_many_original = classe.get_many
+        ausente = object()
+
+        def get(self, key, default=None, version=None, _original=get_original):
+            coleta = _coleta_atual.get()
+            if coleta is None or coleta.no_cache:
+                return _original(self, key, default, version)
+            coleta.no_cache = True
+            try:
+                valor = _original(self, key, ausente, version)
+            finally:
+                coleta.no_cache = False
+            if valor is ausente:
+                coleta.cache_misses += 1
+                return default
+            coleta.cache_hits += 1
+            return valor
+
+        def get_many(self, keys, version=None, _original=get_many_original):
+            coleta = _coleta_atual.get()
+            if coleta is None or coleta.no_cache:
+                return _original(self, keys, version)
+            keys = list(keys)
+            coleta.no_cache = True
+            try:
+                resultado = _original(self, keys, version)
+            finally:
+                coleta.no_cache = False
+            coleta.cache_hits += len(resultado)
+            coleta.cache_misses += len(keys) - len(resultado)
+            return resultado
+
+        get._profiling = True
+        classe.get = get
+        classe.get_many = get_many
+
+
+# ----------------------------------------------------------------------
+# MIDDLEWARE
+# ----------------------------------------------------------------------
+
+class ProfilingMiddleware:
+    """
+    Mede por view: número e tempo de queries, tempo de template, acessos
+    ao cache e latência total. Usuários staff recebem o header
+    Server-Timing; os agregados ficam disponíveis em /metrics/.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.limite_queries = getattr(settings, 'PROFILING_SLOW_QUERY_COUNT', 50)
+        self.limite_latencia = getattr(settings, 'PROFILING_SLOW_LATENCY_MS', 1000) / 1000
+        _instrumentar_templates()
+        _instrumentar_cache()
+
+    def __call__(self, request):
+        coleta = _Coleta()
+        token = _coleta_atual.set(coleta)
+        inicio = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(_wrapper_sql))
+                response = self.get_response(request)
+        finally:
+            _coleta_atual.reset(token)
+        latencia = time.perf_counter() - inicio
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else '<nao_resolvida>'
+
+        lenta = coleta.queries > self.limite_queries or latencia > self.limite_latencia
+        if lenta:
+            self._reportar_lenta(request, view, latencia, coleta)
+
+        profiling_service.registrar(
+            view, latencia, coleta.queries, coleta.tempo_sql,
+            coleta.tempo_template, coleta.cache_hits, coleta.cache_misses,
+            lenta=lenta,
+        )
+
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated and user.is_staff:
+            response['Server-Timing'] = self._server_timing(latencia, coleta)
+
+        return response
+
+    def _server_timing(self, latencia, coleta):
+        return ', '.join((
+            f'db;dur={coleta.tempo_sql * 1000:.1f};desc="{coleta.queries} queries"',
+            f'tpl;dur={coleta.tempo_template * 1000:.1f}',
+            f'cache;desc="hits={coleta.cache_hits} misses={coleta.cache_misses}"',
+            f'total;dur={latencia * 1000:.1f}',
+        ))
+
+    def _reportar_lenta(self, request, view, latencia, coleta):
+        # Agrupa SQL repetido (sintoma típico de N+1) e destaca as mais lentas
+        repetidas = {}
+        for duracao, sql in coleta.sqls:
+            repetidas[sql] = repetidas.get(sql, 0) + 1
+        top_repetidas = sorted(repetidas.items(), key=lambda item: -item[1])[:3]
+        top_lentas = sorted(coleta.sqls, key=lambda item: -item[0])[:3]
+
+        linhas = [
+            f'Requisição lenta em {view} ({request.method} {request.path}): '
+            f'{latencia * 1000:.0f} ms, {coleta.queries} queries '
+            f'({coleta.tempo_sql * 1000:.0f} ms em SQL)'
+        ]
+        for sql, vezes in top_repetidas:
+            if vezes > 1:
+                linhas.append(f'  repetida {vezes}x: {sql}')
+        for duracao, sql in top_lentas:
+            linhas.append(f'  {duracao * 1000:.1f} ms: {sql}')
+
+        logger.warning('\n'.join(linhas))
+
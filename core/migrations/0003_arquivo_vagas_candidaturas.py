@@ -0,0 +1,70 @@
+# Generated by Django 6.0 on 2026-10-19 18:21
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_profile_disponivel_para_alocacao'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidaturaArquivada',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('vaga_id', models.BigIntegerField(db_index=True)),
+                ('mensagem', models.TextField(blank=True)),
+                ('status', models.CharField(choices=[('enviada', 'Enviada'), ('em_analise', 'Em análise'), ('aprovada', 'Aprovada'), ('rejeitada', 'Rejeitada')], max_length=20)),
+                ('score', models.PositiveIntegerField(default=0)),
+                ('criada_em', models.DateTimeField()),
+                ('arquivada_em', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VagaArquivada',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('titulo', models.CharField(max_length=150)),
+                ('departamento', models.CharField(max_length=100)),
+                ('codigo_vaga', models.CharField(max_length=50)),
+                ('modelo_trabalho', models.CharField(choices=[('remoto', 'Remoto'), ('hibrido', 'Híbrido'), ('presencial', 'Presencial')], max_length=20)),
+                ('localizacao', models.CharField(max_length=100)),
+                ('tipo_contrato', models.CharField(choices=[('clt', 'CLT'), ('pj', 'PJ'), ('estagio', 'Estágio'), ('temporario', 'Temporário')], max_length=20)),
+                ('salario_min', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('salario_max', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('dados', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('criada_em', models.DateTimeField()),
+                ('encerrada_em', models.DateTimeField(null=True)),
+                ('arquivada_em', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='vaga',
+            name='encerrada_em',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='candidatura',
+            index=models.Index(fields=['criada_em'], name='core_candid_criada__fc8875_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vaga',
+            index=models.Index(fields=['ativa', 'criada_em'], name='core_vaga_ativa_d3a3d9_idx'),
+        ),
+        migrations.AddField(
+            model_name='candidaturaarquivada',
+            name='candidato',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='candidaturas_arquivadas', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='vagaarquivada',
+            name='empresa',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vagas_arquivadas', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
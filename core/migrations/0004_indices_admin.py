@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-19 18:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_arquivo_vagas_candidaturas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='candidatura',
+            index=models.Index(fields=['score'], name='core_candid_score_6ebc9c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidatura',
+            index=models.Index(fields=['status', 'score'], name='core_candid_status_fbbcc4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vaga',
+            index=models.Index(fields=['modelo_trabalho'], name='core_vaga_modelo__b19c33_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vaga',
+            index=models.Index(fields=['tipo_contrato'], name='core_vaga_tipo_co_1accc3_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 6.0 on 2026-10-19 18:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_indices_admin'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DisparoVaga',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('processado_em', models.DateTimeField(blank=True, null=True)),
+                ('vaga', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='disparo', to='core.vaga')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['processado_em', 'criado_em'], name='core_dispar_process_44436f_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='NotificacaoVaga',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveIntegerField(default=0)),
+                ('criada_em', models.DateTimeField(auto_now_add=True)),
+                ('enviada_em', models.DateTimeField(blank=True, null=True)),
+                ('candidato', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notificacoes_vagas', to=settings.AUTH_USER_MODEL)),
+                ('vaga', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notificacoes', to='core.vaga')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['enviada_em', 'candidato'], name='core_notifi_enviada_3f949b_idx'), models.Index(fields=['candidato', 'enviada_em'], name='core_notifi_candida_097a96_idx')],
+                'unique_together': {('vaga', 'candidato')},
+            },
+        ),
+    ]
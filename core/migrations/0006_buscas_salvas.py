@@ -0,0 +1,55 @@
+# Generated by Django 6.0 on 2026-10-19 18:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_notificacoes_vagas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BuscaSalva',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=100, verbose_name='Nome do alerta')),
+                ('modelo_trabalho', models.CharField(blank=True, choices=[('remoto', 'Remoto'), ('hibrido', 'Híbrido'), ('presencial', 'Presencial')], max_length=20)),
+                ('tipo_contrato', models.CharField(blank=True, choices=[('clt', 'CLT'), ('pj', 'PJ'), ('estagio', 'Estágio'), ('temporario', 'Temporário')], max_length=20)),
+                ('salario_minimo', models.DecimalField(blank=True, decimal_places=2, help_text='Apenas vagas cuja faixa salarial chega a este valor.', max_digits=10, null=True, verbose_name='Salário mínimo')),
+                ('palavras_chave', models.CharField(blank=True, help_text='Todas precisam aparecer na vaga. Ex: Python Django', max_length=200, verbose_name='Palavras-chave')),
+                ('total_termos', models.PositiveSmallIntegerField(default=0, editable=False)),
+                ('criada_em', models.DateTimeField(auto_now_add=True)),
+                ('candidato', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buscas_salvas', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='notificacaovaga',
+            name='busca',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.buscasalva'),
+        ),
+        migrations.CreateModel(
+            name='TermoBuscaSalva',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('termo', models.CharField(max_length=50)),
+                ('busca', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='termos', to='core.buscasalva')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='buscasalva',
+            index=models.Index(fields=['total_termos', 'modelo_trabalho', 'tipo_contrato', 'salario_minimo'], name='core_buscas_total_t_8222be_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='termobuscasalva',
+            index=models.Index(fields=['termo', 'busca'], name='core_termob_termo_dae75d_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='termobuscasalva',
+            unique_together={('busca', 'termo')},
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 6.0 on 2026-10-19 18:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_buscas_salvas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DistribuicaoEixo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('eixo', models.CharField(max_length=20)),
+                ('valor', models.PositiveSmallIntegerField()),
+                ('total', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='analise',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Análise'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='estrategia',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Estratégia'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='execucao',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Execução'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='influencia',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Influência'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='is_elite',
+            field=models.BooleanField(default=False, verbose_name='Grupo Elite'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='resiliencia',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Resiliência'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='teste_perfil_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(condition=models.Q(('is_elite', True)), fields=['execucao'], name='profile_elite_execucao_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(condition=models.Q(('is_elite', True)), fields=['analise'], name='profile_elite_analise_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(condition=models.Q(('is_elite', True)), fields=['influencia'], name='profile_elite_influencia_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(condition=models.Q(('is_elite', True)), fields=['estrategia'], name='profile_elite_estrategia_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(condition=models.Q(('is_elite', True)), fields=['resiliencia'], name='profile_elite_resiliencia_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='distribuicaoeixo',
+            unique_together={('eixo', 'valor')},
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0 on 2026-10-19 18:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_teste_perfil_estruturado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VagaSimilarPendente',
+            fields=[
+                ('vaga_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VagaSimilar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.vaga')),
+                ('vaga', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similares', to='core.vaga')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['vaga', '-score'], name='core_vagasi_vaga_id_2c886c_idx')],
+                'unique_together': {('vaga', 'similar')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0 on 2026-10-19 18:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_vagas_similares'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssinaturaVaga',
+            fields=[
+                ('vaga', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='assinatura', serialize=False, to='core.vaga')),
+                ('minhash', models.BinaryField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BandaVaga',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chave', models.BigIntegerField()),
+                ('vaga', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.vaga')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['chave', 'vaga'], name='core_bandav_chave_9d7f80_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 6.0 on 2026-10-19 18:48
+
+import csv
+from pathlib import Path
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+ARQUIVO = Path(__file__).resolve().parent.parent / 'data' / 'municipios.csv'
+
+
+def carregar_municipios(apps, schema_editor):
+    Municipio = apps.get_model('core', 'Municipio')
+    with open(ARQUIVO, encoding='utf-8') as f:
+        linhas = csv.DictReader(linha for linha in f if not linha.startswith('#'))
+        Municipio.objects.bulk_create([
+            Municipio(
+                nome=l['nome'], uf=l['uf'], nome_normalizado=l['nome_normalizado'],
+                latitude=float(l['latitude']), longitude=float(l['longitude']),
+                populacao=int(l['populacao']), geohash=l['geohash'],
+            )
+            for l in linhas
+        ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_vagas_duplicadas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Municipio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=100)),
+                ('uf', models.CharField(max_length=2)),
+                ('nome_normalizado', models.CharField(max_length=100)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('populacao', models.PositiveIntegerField(default=0)),
+                ('geohash', models.CharField(db_index=True, max_length=12)),
+            ],
+            options={
+                'unique_together': {('nome_normalizado', 'uf')},
+            },
+        ),
+        migrations.AddField(
+            model_name='perfilcandidato',
+            name='municipio',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.municipio'),
+        ),
+        migrations.AddField(
+            model_name='vaga',
+            name='municipio',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='vagas', to='core.municipio'),
+        ),
+        migrations.AddIndex(
+            model_name='vaga',
+            index=models.Index(fields=['municipio', 'ativa'], name='core_vaga_municip_182fc0_idx'),
+        ),
+        migrations.RunPython(carregar_municipios, migrations.RunPython.noop),
+    ]
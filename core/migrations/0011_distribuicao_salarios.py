@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-19 18:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_municipios'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DistribuicaoSalario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('origem', models.CharField(choices=[('vaga', 'Salário oferecido'), ('candidato', 'Pretensão salarial')], max_length=10)),
+                ('titulo', models.CharField(max_length=150)),
+                ('estado', models.CharField(blank=True, max_length=2)),
+                ('modelo_trabalho', models.CharField(blank=True, max_length=20)),
+                ('tipo_contrato', models.CharField(blank=True, max_length=20)),
+                ('balde', models.SmallIntegerField()),
+                ('total', models.IntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('titulo', 'origem', 'estado', 'modelo_trabalho', 'tipo_contrato', 'balde')},
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 6.0 on 2026-10-19 18:55
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def status_desde_criacao(apps, schema_editor):
+    # Sem histórico, o melhor palpite para a entrada no status atual é a criação
+    Candidatura = apps.get_model('core', 'Candidatura')
+    Candidatura.objects.update(status_desde=F('criada_em'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_distribuicao_salarios'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidatura',
+            name='status_desde',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.RunPython(status_desde_criacao, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='FunilDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vaga_id', models.BigIntegerField()),
+                ('dia', models.DateField()),
+                ('status', models.CharField(choices=[('enviada', 'Enviada'), ('em_analise', 'Em análise'), ('aprovada', 'Aprovada'), ('rejeitada', 'Rejeitada')], max_length=20)),
+                ('entradas', models.IntegerField(default=0)),
+                ('saidas', models.IntegerField(default=0)),
+                ('segundos_na_etapa', models.BigIntegerField(default=0)),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('empresa', 'vaga_id', 'dia', 'status')},
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 6.0 on 2026-10-19 18:58
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def semear_historico(apps, schema_editor):
+    # Candidaturas existentes: criação e, se já mudou, a passagem para o status atual
+    Candidatura = apps.get_model('core', 'Candidatura')
+    HistoricoStatus = apps.get_model('core', 'HistoricoStatus')
+    ultimo = 0
+    while True:
+        lote = list(
+            Candidatura.objects.filter(id__gt=ultimo).order_by('id')
+            .values_list('id', 'vaga_id', 'status', 'criada_em', 'status_desde')[:2000]
+        )
+        if not lote:
+            return
+        ultimo = lote[-1][0]
+        eventos = []
+        for candidatura_id, vaga_id, status, criada_em, status_desde in lote:
+            eventos.append(HistoricoStatus(
+                candidatura_id=candidatura_id, vaga_id=vaga_id, status='enviada', criado_em=criada_em,
+            ))
+            if status != 'enviada':
+                eventos.append(HistoricoStatus(
+                    candidatura_id=candidatura_id, vaga_id=vaga_id, status_anterior='enviada',
+                    status=status, criado_em=status_desde,
+                ))
+        HistoricoStatus.objects.bulk_create(eventos)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_funil_contratacao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistoricoStatus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('candidatura_id', models.BigIntegerField()),
+                ('vaga_id', models.BigIntegerField()),
+                ('status_anterior', models.CharField(blank=True, choices=[('enviada', 'Enviada'), ('em_analise', 'Em análise'), ('aprovada', 'Aprovada'), ('rejeitada', 'Rejeitada')], max_length=20)),
+                ('status', models.CharField(choices=[('enviada', 'Enviada'), ('em_analise', 'Em análise'), ('aprovada', 'Aprovada'), ('rejeitada', 'Rejeitada')], max_length=20)),
+                ('criado_em', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['candidatura_id', 'criado_em'], name='core_histor_candida_a246fd_idx'), models.Index(fields=['vaga_id', 'criado_em'], name='core_histor_vaga_id_563670_idx')],
+            },
+        ),
+        migrations.RunPython(semear_historico, migrations.RunPython.noop),
+    ]
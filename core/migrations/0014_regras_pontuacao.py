@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-19 19:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_historico_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegrasPontuacao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('regras', models.JSONField(default=dict)),
+                ('versao', models.PositiveIntegerField(default=1)),
+                ('versao_aplicada', models.PositiveIntegerField(default=0)),
+                ('atualizada_em', models.DateTimeField(auto_now=True)),
+                ('vaga', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='regras_pontuacao', to='core.vaga')),
+            ],
+        ),
+    ]
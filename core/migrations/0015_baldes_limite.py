@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-19 19:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_regras_pontuacao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BaldeLimite',
+            fields=[
+                ('chave', models.CharField(max_length=80, primary_key=True, serialize=False)),
+                ('fichas', models.FloatField()),
+                ('atualizado_em', models.FloatField(db_index=True)),
+            ],
+        ),
+    ]
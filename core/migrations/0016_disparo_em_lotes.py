@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-19 19:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_baldes_limite'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='disparovaga',
+            name='reservado_ate',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='disparovaga',
+            name='ultimo_candidato_id',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
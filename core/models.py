@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
 from django.core.validators import MinLengthValidator, MaxLengthValidator
 
 
@@ -26,9 +28,42 @@ class Profile(models.Model):
 
     disponivel_para_alocacao = models.BooleanField(default=False, verbose_name="Banco de Talentos TrabalheJá")
 
+    # --- TESTE DE PERFIL ELITE (0 a 100 por eixo) ---
+    is_elite = models.BooleanField(default=False, verbose_name="Grupo Elite")
+    execucao = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Execução")
+    analise = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Análise")
+    influencia = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Influência")
+    estrategia = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Estratégia")
+    resiliencia = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Resiliência")
+    teste_perfil_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        # Filtro do banco de talentos por nota mínima em cada eixo
+        # (índices parciais: só os perfis do Grupo Elite entram)
+        indexes = [
+            models.Index(fields=['execucao'], condition=models.Q(is_elite=True), name='profile_elite_execucao_idx'),
+            models.Index(fields=['analise'], condition=models.Q(is_elite=True), name='profile_elite_analise_idx'),
+            models.Index(fields=['influencia'], condition=models.Q(is_elite=True), name='profile_elite_influencia_idx'),
+            models.Index(fields=['estrategia'], condition=models.Q(is_elite=True), name='profile_elite_estrategia_idx'),
+            models.Index(fields=['resiliencia'], condition=models.Q(is_elite=True), name='profile_elite_resiliencia_idx'),
+        ]
+
     def __str__(self):
         return f"{self.nome_completo} ({self.get_tipo_display()})"
 
+    @property
+    def resultado_teste_perfil(self):
+        """Notas do teste por eixo, ou None se o candidato ainda não fez o teste."""
+        if self.teste_perfil_em is None:
+            return None
+        return {
+            'execucao': self.execucao,
+            'analise': self.analise,
+            'influencia': self.influencia,
+            'estrategia': self.estrategia,
+            'resiliencia': self.resiliencia,
+        }
+
 # ----------------------------------------------------------------------
 # PERFIL COMPLETO DO CANDIDATO (CURRÍCULO)
 # ----------------------------------------------------------------------
@@ -87,6 +122,10 @@ class PerfilCandidato(models.Model):
         help_text="Sigla (Ex: SP, RJ)",
         verbose_name="Estado (UF)"
     )
+    # Cidade/UF resolvidas na tabela de municípios (core.signals)
+    municipio = models.ForeignKey(
+        'Municipio', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='+'
+    )
 
     # --- 4. PREFERÊNCIAS E EXPECTATIVAS ---
     modelo_trabalho = models.CharField(
@@ -254,6 +293,10 @@ class Vaga(models.Model):
 
     modelo_trabalho = models.CharField(max_length=20, choices=MODELO_TRABALHO)
     localizacao = models.CharField(max_length=100)
+    # `localizacao` resolvida na tabela de municípios (core.signals)
+    municipio = models.ForeignKey(
+        'Municipio', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='vagas'
+    )
     tipo_contrato = models.CharField(max_length=20, choices=TIPO_CONTRATO)
     carga_horaria = models.CharField(max_length=50)
 
@@ -278,6 +321,25 @@ class Vaga(models.Model):
     criada_em = models.DateTimeField(auto_now_add=True)
 
     ativa = models.BooleanField(default=True)
+    encerrada_em = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ativa', 'criada_em']),
+            # Vagas num raio: municípios próximos -> vagas ativas de cada um
+            models.Index(fields=['municipio', 'ativa']),
+            # Filtros do changelist do admin
+            models.Index(fields=['modelo_trabalho']),
+            models.Index(fields=['tipo_contrato']),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Marca quando a vaga foi encerrada: base da janela de retenção do arquivo
+        if self.ativa:
+            self.encerrada_em = None
+        elif self.encerrada_em is None:
+            self.encerrada_em = timezone.now()
+        super().save(*args, **kwargs)
 
     def __str__(self):
         # Tenta pegar o nome da empresa no perfil, se não existir usa o email
@@ -312,10 +374,393 @@ class Candidatura(models.Model):
     )
 
     criada_em = models.DateTimeField(auto_now_add=True)
+    # Entrada no status atual: base do tempo por etapa do funil (core.signals)
+    status_desde = models.DateTimeField(default=timezone.now, editable=False)
     score = models.PositiveIntegerField(default=0)
 
     class Meta:
         unique_together = ('vaga', 'candidato')
+        indexes = [
+            models.Index(fields=['criada_em']),
+            # Ordenação e filtro do changelist do admin (-score, status)
+            models.Index(fields=['score']),
+            models.Index(fields=['status', 'score']),
+        ]
 
     def __str__(self):
         return f"{self.candidato.email} → {self.vaga.titulo}"
+
+# ----------------------------------------------------------------------
+# ARQUIVO (VAGAS ENCERRADAS E CANDIDATURAS ANTIGAS)
+# ----------------------------------------------------------------------
+# Tabelas frias para onde o job expirar_vagas move os registros, mantendo
+# core_vaga e core_candidatura pequenas. Os ids originais são preservados.
+
+class VagaArquivada(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    empresa = models.ForeignKey(User, on_delete=models.CASCADE, related_name='vagas_arquivadas')
+
+    titulo = models.CharField(max_length=150)
+    departamento = models.CharField(max_length=100)
+    codigo_vaga = models.CharField(max_length=50)
+    modelo_trabalho = models.CharField(max_length=20, choices=Vaga.MODELO_TRABALHO)
+    localizacao = models.CharField(max_length=100)
+    tipo_contrato = models.CharField(max_length=20, choices=Vaga.TIPO_CONTRATO)
+    salario_min = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    salario_max = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    # Demais campos descritivos, guardados sem estrutura
+    dados = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+
+    criada_em = models.DateTimeField()
+    encerrada_em = models.DateTimeField(null=True)
+    arquivada_em = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.titulo} ({self.codigo_vaga}) [arquivada]"
+
+
+class CandidaturaArquivada(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    # Sem FK: a vaga pode estar em core_vaga ou em core_vagaarquivada
+    vaga_id = models.BigIntegerField(db_index=True)
+    candidato = models.ForeignKey(User, on_delete=models.CASCADE, related_name='candidaturas_arquivadas')
+
+    mensagem = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=Candidatura.STATUS_CHOICES)
+    score = models.PositiveIntegerField(default=0)
+
+    criada_em = models.DateTimeField()
+    arquivada_em = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.candidato_id} → vaga {self.vaga_id} [arquivada]"
+
+
+# ----------------------------------------------------------------------
+# NOTIFICAÇÕES DO BANCO DE TALENTOS
+# ----------------------------------------------------------------------
+# Ao publicar uma vaga, um DisparoVaga entra na fila; o comando
+# processar_notificacoes gera as NotificacaoVaga dos candidatos compatíveis
+# e as envia por e-mail, agrupadas por candidato.
+
+class DisparoVaga(models.Model):
+    vaga = models.OneToOneField(Vaga, on_delete=models.CASCADE, related_name='disparo')
+    criado_em = models.DateTimeField(auto_now_add=True)
+    processado_em = models.DateTimeField(null=True, blank=True)
+    # A distribuição grava um lote do banco de talentos por transação:
+    # user_id do último perfil avaliado (retomada) e até quando o worker
+    # que a está fazendo a reserva
+    ultimo_candidato_id = models.BigIntegerField(default=0)
+    reservado_ate = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['processado_em', 'criado_em']),
+        ]
+
+    def __str__(self):
+        return f"Disparo da vaga {self.vaga_id}"
+
+
+class NotificacaoVaga(models.Model):
+    vaga = models.ForeignKey(Vaga, on_delete=models.CASCADE, related_name='notificacoes')
+    candidato = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notificacoes_vagas')
+    score = models.PositiveIntegerField(default=0)
+    # Preenchido quando a vaga chegou ao candidato por uma busca salva
+    busca = models.ForeignKey('BuscaSalva', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    criada_em = models.DateTimeField(auto_now_add=True)
+    enviada_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('vaga', 'candidato')
+        indexes = [
+            # Fila de envio e último envio por candidato (limite de frequência)
+            models.Index(fields=['enviada_em', 'candidato']),
+            models.Index(fields=['candidato', 'enviada_em']),
+        ]
+
+    def __str__(self):
+        return f"{self.candidato_id} ← vaga {self.vaga_id}"
+
+
+# ----------------------------------------------------------------------
+# BUSCAS SALVAS (ALERTAS DE VAGAS)
+# ----------------------------------------------------------------------
+# Cada nova vaga é comparada com as buscas salvas "ao contrário": em vez de
+# testar todas as buscas, consulta-se o índice de termos e os critérios
+# estruturados indexados (ver services/busca_salva_service.py).
+
+class BuscaSalva(models.Model):
+    candidato = models.ForeignKey(User, on_delete=models.CASCADE, related_name='buscas_salvas')
+    nome = models.CharField(max_length=100, verbose_name="Nome do alerta")
+
+    # Critérios vazios aceitam qualquer valor
+    modelo_trabalho = models.CharField(max_length=20, choices=Vaga.MODELO_TRABALHO, blank=True)
+    tipo_contrato = models.CharField(max_length=20, choices=Vaga.TIPO_CONTRATO, blank=True)
+    salario_minimo = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True,
+        verbose_name="Salário mínimo",
+        help_text="Apenas vagas cuja faixa salarial chega a este valor."
+    )
+    palavras_chave = models.CharField(
+        max_length=200, blank=True,
+        verbose_name="Palavras-chave",
+        help_text="Todas precisam aparecer na vaga. Ex: Python Django"
+    )
+    # Quantos termos distintos a busca exige (cache do índice reverso)
+    total_termos = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    criada_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['total_termos', 'modelo_trabalho', 'tipo_contrato', 'salario_minimo']),
+        ]
+
+    def __str__(self):
+        return f"{self.nome} ({self.candidato_id})"
+
+
+class TermoBuscaSalva(models.Model):
+    # Índice reverso: uma linha por palavra-chave normalizada de cada busca
+    busca = models.ForeignKey(BuscaSalva, on_delete=models.CASCADE, related_name='termos')
+    termo = models.CharField(max_length=50)
+
+    class Meta:
+        unique_together = ('busca', 'termo')
+        indexes = [
+            models.Index(fields=['termo', 'busca']),
+        ]
+
+    def __str__(self):
+        return self.termo
+
+
+# ----------------------------------------------------------------------
+# DISTRIBUIÇÃO DAS NOTAS DO TESTE DE PERFIL
+# ----------------------------------------------------------------------
+# Histograma por eixo (uma linha por nota possível, 0 a 100), mantido a cada
+# teste enviado. O percentil de um candidato sai da soma dos baldes abaixo
+# da sua nota, sem ler os resultados dos demais candidatos.
+
+class DistribuicaoEixo(models.Model):
+    eixo = models.CharField(max_length=20)
+    valor = models.PositiveSmallIntegerField()
+    total = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('eixo', 'valor')
+
+    def __str__(self):
+        return f"{self.eixo}={self.valor}: {self.total}"
+
+
+# ----------------------------------------------------------------------
+# VAGAS SIMILARES
+# ----------------------------------------------------------------------
+# Vizinhos pré-calculados de cada vaga ativa, lidos pela página de detalhe
+# sem nenhum cálculo de similaridade na requisição. Vagas alteradas entram
+# em VagaSimilarPendente e manage.py vagas_similares refaz só as listas afetadas.
+
+class VagaSimilar(models.Model):
+    vaga = models.ForeignKey(Vaga, on_delete=models.CASCADE, related_name='similares')
+    similar = models.ForeignKey(Vaga, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+
+    class Meta:
+        unique_together = ('vaga', 'similar')
+        indexes = [
+            models.Index(fields=['vaga', '-score']),
+        ]
+
+    def __str__(self):
+        return f"{self.vaga_id} ~ {self.similar_id} ({self.score:.2f})"
+
+
+class VagaSimilarPendente(models.Model):
+    # Sem chave estrangeira: vagas excluídas também precisam sair das listas
+    vaga_id = models.BigIntegerField(primary_key=True)
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Vaga {self.vaga_id} pendente"
+
+
+# ----------------------------------------------------------------------
+# VAGAS DUPLICADAS
+# ----------------------------------------------------------------------
+# Assinatura MinHash do texto de cada vaga e suas bandas (LSH): vagas com
+# alguma banda igual são candidatas a duplicata, encontradas pelo índice
+# de `chave` sem comparar com o catálogo inteiro.
+
+class AssinaturaVaga(models.Model):
+    vaga = models.OneToOneField(Vaga, on_delete=models.CASCADE, primary_key=True, related_name='assinatura')
+    minhash = models.BinaryField()
+
+    def __str__(self):
+        return f"Assinatura da vaga {self.vaga_id}"
+
+
+class BandaVaga(models.Model):
+    vaga = models.ForeignKey(Vaga, on_delete=models.CASCADE, related_name='+')
+    # Número da banda nos bits altos, hash das linhas da banda nos 32 baixos
+    chave = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['chave', 'vaga']),
+        ]
+
+    def __str__(self):
+        return f"{self.vaga_id}: {self.chave}"
+
+
+# ----------------------------------------------------------------------
+# MUNICÍPIOS
+# ----------------------------------------------------------------------
+# Tabela estática de municípios e distritos do Brasil com coordenadas,
+# carregada de core/data/municipios.csv pela migração. O geohash permite
+# buscar por raio com faixas no índice em vez de varrer a tabela.
+
+class Municipio(models.Model):
+    nome = models.CharField(max_length=100)
+    uf = models.CharField(max_length=2)
+    nome_normalizado = models.CharField(max_length=100)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    populacao = models.PositiveIntegerField(default=0)
+    geohash = models.CharField(max_length=12, db_index=True)
+
+    class Meta:
+        unique_together = ('nome_normalizado', 'uf')
+
+    def __str__(self):
+        return f"{self.nome} - {self.uf}"
+
+
+# ----------------------------------------------------------------------
+# DISTRIBUIÇÃO DE SALÁRIOS
+# ----------------------------------------------------------------------
+# Histograma de salários em baldes logarítmicos (~4% de largura) por
+# título normalizado, UF, modelo de trabalho e tipo de contrato, mantido a
+# cada vaga ou perfil salvo. Medianas e quartis saem dos baldes de um
+# título, sem ler as vagas nem os perfis.
+
+class DistribuicaoSalario(models.Model):
+    ORIGENS = (
+        ('vaga', 'Salário oferecido'),
+        ('candidato', 'Pretensão salarial'),
+    )
+
+    origem = models.CharField(max_length=10, choices=ORIGENS)
+    titulo = models.CharField(max_length=150)
+    estado = models.CharField(max_length=2, blank=True)
+    modelo_trabalho = models.CharField(max_length=20, blank=True)
+    tipo_contrato = models.CharField(max_length=20, blank=True)
+    balde = models.SmallIntegerField()
+    # Pode ficar negativo se a tabela for criada com dados já existentes e
+    # ainda não reconstruída (manage.py recalcular_salarios)
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        # Começa pelo título: as consultas leem todos os baldes de um título
+        unique_together = ('titulo', 'origem', 'estado', 'modelo_trabalho', 'tipo_contrato', 'balde')
+
+    def __str__(self):
+        return f"{self.origem} {self.titulo} {self.estado}/{self.modelo_trabalho}/{self.tipo_contrato} #{self.balde}: {self.total}"
+
+
+# ----------------------------------------------------------------------
+# FUNIL DE CONTRATAÇÃO
+# ----------------------------------------------------------------------
+# Por dia, vaga e etapa: candidaturas que entraram e saíram da etapa e o
+# tempo somado que as que saíram passaram nela. Mantido a cada candidatura
+# criada ou com status alterado; qualquer período é lido destas linhas.
+# vaga_id sem FK para o histórico sobreviver ao arquivamento da vaga;
+# vaga_id = 0 guarda o total da empresa.
+
+class FunilDiario(models.Model):
+    TOTAL_EMPRESA = 0
+
+    empresa = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    vaga_id = models.BigIntegerField()
+    dia = models.DateField()
+    status = models.CharField(max_length=20, choices=Candidatura.STATUS_CHOICES)
+    entradas = models.IntegerField(default=0)
+    saidas = models.IntegerField(default=0)
+    segundos_na_etapa = models.BigIntegerField(default=0)
+
+    class Meta:
+        # Também o índice das consultas (empresa, vaga ou total, período)
+        unique_together = ('empresa', 'vaga_id', 'dia', 'status')
+
+    def __str__(self):
+        return f"{self.dia} vaga {self.vaga_id} {self.status}: +{self.entradas} -{self.saidas}"
+
+
+# ----------------------------------------------------------------------
+# HISTÓRICO DE STATUS DAS CANDIDATURAS
+# ----------------------------------------------------------------------
+# Registro somente de inclusão: uma linha por mudança de status, gravada na
+# mesma transação da mudança. Sem FKs, como o funil: o histórico de uma
+# candidatura arquivada continua sob o mesmo id.
+
+class HistoricoStatus(models.Model):
+    candidatura_id = models.BigIntegerField()
+    vaga_id = models.BigIntegerField()
+    status_anterior = models.CharField(max_length=20, choices=Candidatura.STATUS_CHOICES, blank=True)
+    status = models.CharField(max_length=20, choices=Candidatura.STATUS_CHOICES)
+    criado_em = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Linha do tempo de uma candidatura / desde quando está na etapa
+            models.Index(fields=['candidatura_id', 'criado_em']),
+            # Eventos de uma vaga num período
+            models.Index(fields=['vaga_id', 'criado_em']),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('O histórico de status não pode ser alterado.')
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"#{self.candidatura_id} {self.status_anterior or '-'} → {self.status} em {self.criado_em:%d/%m/%Y %H:%M}"
+
+
+# ----------------------------------------------------------------------
+# REGRAS DE PONTUAÇÃO DO MATCH POR VAGA
+# ----------------------------------------------------------------------
+# Pesos declarativos (formato em core.services.match_service.REGRAS_PADRAO;
+# vaga sem regras usa os padrão). Cada alteração sobe a `versao`; as
+# candidaturas da vaga são repontuadas em segundo plano até
+# `versao_aplicada` alcançá-la (manage.py repontuar_candidaturas).
+
+class RegrasPontuacao(models.Model):
+    vaga = models.OneToOneField(Vaga, on_delete=models.CASCADE, related_name='regras_pontuacao')
+    regras = models.JSONField(default=dict)
+    versao = models.PositiveIntegerField(default=1)
+    versao_aplicada = models.PositiveIntegerField(default=0)
+    atualizada_em = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Regras da vaga {self.vaga_id} v{self.versao}"
+
+
+# ----------------------------------------------------------------------
+# LIMITE DE TAXA
+# ----------------------------------------------------------------------
+# Um balde de fichas por rota, escopo (IP ou conta) e identificador. O saldo
+# é reposto na própria UPDATE condicional que gasta a ficha, então o limite
+# vale para todos os workers e máquinas que usam o banco.
+
+class BaldeLimite(models.Model):
+    chave = models.CharField(max_length=80, primary_key=True)
+    fichas = models.FloatField()
+    # time.time() da última ficha gasta ou devolvida
+    atualizado_em = models.FloatField(db_index=True)
+
+    def __str__(self):
+        return f"{self.chave}: {self.fichas:.1f}"
@@ -0,0 +1,147 @@
+# core/services/arquivo_service.py
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.functions import Coalesce
+from django.forms.models import model_to_dict
+from django.utils import timezone
+
+from ..models import Vaga, Candidatura, VagaArquivada, CandidaturaArquivada
+from . import cache_paginas_service, vagas_similares_service
+
+TAMANHO_LOTE = 1000
+
+# Campos de Vaga copiados como colunas em VagaArquivada; o restante vai em `dados`
+CAMPOS_VAGA = (
+    'titulo', 'departamento', 'codigo_vaga', 'modelo_trabalho', 'localizacao',
+    'tipo_contrato', 'salario_min', 'salario_max', 'criada_em', 'encerrada_em',
+)
+
+
+def dias_expiracao():
+    return getattr(settings, 'VAGA_DIAS_EXPIRACAO', 60)
+
+
+def dias_retencao():
+    return getattr(settings, 'CANDIDATURA_DIAS_RETENCAO', 180)
+
+
+def _em_lotes(queryset, tamanho_lote, processar):
+    """
+    Processa ids em lotes, cada um em sua própria transação curta, para não
+    segurar locks longos em tabelas quentes. Retorna o total processado.
+    """
+    total = 0
+    while True:
+        ids = list(queryset.values_list('id', flat=True)[:tamanho_lote])
+        if not ids:
+            return total
+        with transaction.atomic():
+            total += processar(ids)
+
+
+def expirar_vagas(agora=None, tamanho_lote=TAMANHO_LOTE):
+    """Encerra vagas ativas publicadas há mais de VAGA_DIAS_EXPIRACAO dias."""
+    agora = agora or timezone.now()
+    limite = agora - timedelta(days=dias_expiracao())
+    vencidas = Vaga.objects.filter(ativa=True, criada_em__lt=limite).order_by('id')
+
+    def encerrar(ids):
+        vagas_similares_service.marcar_pendentes(ids)
+        return Vaga.objects.filter(id__in=ids).update(ativa=False, encerrada_em=agora)
+
+    total = _em_lotes(vencidas, tamanho_lote, encerrar)
+    # update() não dispara post_save: invalida a listagem pública aqui
+    if total:
+        cache_paginas_service.invalidar('vagas')
+    return total
+
+
+def _mover_candidaturas(ids):
+    candidaturas = list(Candidatura.objects.filter(id__in=ids))
+    CandidaturaArquivada.objects.bulk_create([
+        CandidaturaArquivada(
+            id=c.id, vaga_id=c.vaga_id, candidato_id=c.candidato_id, mensagem=c.mensagem,
+            status=c.status, score=c.score, criada_em=c.criada_em,
+        )
+        for c in candidaturas
+    ], ignore_conflicts=True)
+    Candidatura.objects.filter(id__in=ids).delete()
+    return len(candidaturas)
+
+
+def arquivar_candidaturas(agora=None, tamanho_lote=TAMANHO_LOTE):
+    """Move candidaturas de vagas encerradas mais antigas que a retenção."""
+    agora = agora or timezone.now()
+    limite = agora - timedelta(days=dias_retencao())
+    antigas = Candidatura.objects.filter(vaga__ativa=False, criada_em__lt=limite).order_by('id')
+    return _em_lotes(antigas, tamanho_lote, _mover_candidaturas)
+
+
+def _mover_vagas(ids):
+    # Relê as vagas com lock, já na transação do lote: uma candidatura criada
+    # depois da seleção barra a vaga aqui (no PostgreSQL o INSERT dela espera
+    # o FOR UPDATE; no SQLite a escrita da transação já serializa tudo)
+    vagas = list(
+        Vaga.objects.filter(id__in=ids, candidaturas__isnull=True).select_for_update(of=('self',))
+    )
+    arquivadas = []
+    for vaga in vagas:
+        dados = model_to_dict(vaga, exclude=('id', 'empresa', 'ativa') + CAMPOS_VAGA)
+        arquivadas.append(VagaArquivada(
+            id=vaga.id, empresa_id=vaga.empresa_id, dados=dados,
+            **{campo: getattr(vaga, campo) for campo in CAMPOS_VAGA},
+        ))
+    VagaArquivada.objects.bulk_create(arquivadas, ignore_conflicts=True)
+    Vaga.objects.filter(id__in=[v.id for v in vagas]).delete()
+    return len(vagas)
+
+
+def arquivar_vagas(agora=None, tamanho_lote=TAMANHO_LOTE):
+    """Move vagas encerradas há mais que a retenção e já sem candidaturas."""
+    agora = agora or timezone.now()
+    limite = agora - timedelta(days=dias_retencao())
+    encerradas = (
+        Vaga.objects
+        .filter(ativa=False, candidaturas__isnull=True)
+        .annotate(fim=Coalesce('encerrada_em', 'criada_em'))
+        .filter(fim__lt=limite)
+        .order_by('id')
+    )
+    return _em_lotes(encerradas, tamanho_lote, _mover_vagas)
+
+
+def atualizar_estatisticas():
+    """
+    Refaz as estatísticas do SQLite (sqlite_stat1) das tabelas que perdem
+    linhas para o arquivo; o admin lê delas o total estimado. No PostgreSQL
+    o autovacuum já mantém o pg_class.reltuples.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for modelo in (Vaga, Candidatura):
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(modelo._meta.db_table)}')
+
+
+# ----------------------------------------------------------------------
+# LEITURA DO ARQUIVO
+# ----------------------------------------------------------------------
+
+def candidaturas_arquivadas(candidato):
+    """
+    Histórico arquivado de um candidato, mais recentes primeiro. O título da
+    vaga é buscado na tabela quente ou no arquivo, conforme onde ela estiver.
+    """
+    candidaturas = list(
+        CandidaturaArquivada.objects.filter(candidato=candidato).order_by('-criada_em')
+    )
+    vaga_ids = {c.vaga_id for c in candidaturas}
+    titulos = dict(Vaga.objects.filter(id__in=vaga_ids).values_list('id', 'titulo'))
+    titulos.update(VagaArquivada.objects.filter(id__in=vaga_ids).values_list('id', 'titulo'))
+
+    for c in candidaturas:
+        c.vaga_titulo = titulos.get(c.vaga_id, '')
+    return candidaturas
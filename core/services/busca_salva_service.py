@@ -0,0 +1,89 @@
+# core/services/busca_salva_service.py
+
+import re
+import unicodedata
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from ..models import BuscaSalva, TermoBuscaSalva
+
+MAX_BUSCAS_POR_CANDIDATO = 10
+
+# Campos de texto da vaga em que as palavras-chave são procuradas
+CAMPOS_TEXTO_VAGA = (
+    'titulo', 'departamento', 'localizacao', 'resumo', 'responsabilidades',
+    'requisitos_obrigatorios', 'requisitos_desejaveis', 'soft_skills',
+)
+
+PALAVRAS_VAZIAS = {
+    'a', 'o', 'as', 'os', 'de', 'da', 'do', 'das', 'dos', 'e', 'em', 'na', 'no',
+    'nas', 'nos', 'com', 'para', 'por', 'um', 'uma', 'ou',
+}
+
+# Mantém termos como c++, c#, node.js e .net inteiros
+_TOKEN = re.compile(r'[a-z0-9.+#]*[a-z0-9+#]')
+
+
+def tokens(texto):
+    """Sequência de tokens normalizados (minúsculas, sem acentos) de um texto."""
+    texto = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode().lower()
+    return _TOKEN.findall(texto)
+
+
+def termos(texto):
+    """Conjunto de termos (tokens sem palavras vazias) de um texto."""
+    return {
+        t[:50] for t in tokens(texto)
+        if t not in PALAVRAS_VAZIAS and (len(t) > 1 or not t.isalpha())
+    }
+
+
+def termos_da_vaga(vaga):
+    return termos(' '.join(getattr(vaga, campo) or '' for campo in CAMPOS_TEXTO_VAGA))
+
+
+@transaction.atomic
+def indexar(busca):
+    """Salva a busca e reconstrói seus termos no índice reverso."""
+    termos_busca = termos(busca.palavras_chave)
+    busca.total_termos = len(termos_busca)
+    busca.save()
+
+    busca.termos.all().delete()
+    TermoBuscaSalva.objects.bulk_create(
+        [TermoBuscaSalva(busca=busca, termo=t) for t in termos_busca]
+    )
+    return busca
+
+
+def percolar(vaga):
+    """
+    Buscas salvas que a vaga satisfaz. Os critérios estruturados usam o
+    índice composto de BuscaSalva; as palavras-chave, o índice por termo: só
+    as postagens dos termos presentes na vaga são lidas, e uma busca casa
+    quando todos os seus termos aparecem (contagem == total_termos). O custo
+    depende das buscas candidatas, não do total de buscas cadastradas.
+    """
+    criterios = Q(modelo_trabalho__in=('', vaga.modelo_trabalho)) \
+        & Q(tipo_contrato__in=('', vaga.tipo_contrato))
+    if vaga.salario_max is None:
+        criterios &= Q(salario_minimo__isnull=True)
+    else:
+        criterios &= Q(salario_minimo__isnull=True) | Q(salario_minimo__lte=vaga.salario_max)
+
+    encontradas = list(BuscaSalva.objects.filter(criterios, total_termos=0))
+
+    termos_vaga = termos_da_vaga(vaga)
+    if termos_vaga:
+        com_todos_os_termos = (
+            TermoBuscaSalva.objects
+            .filter(termo__in=termos_vaga)
+            .values('busca_id', 'busca__total_termos')
+            .annotate(encontrados=Count('id'))
+            .filter(encontrados=F('busca__total_termos'))
+            .values('busca_id')
+        )
+        encontradas += BuscaSalva.objects.filter(criterios, id__in=com_todos_os_termos)
+
+    return encontradas
@@ -0,0 +1,117 @@
+# core/services/cache_paginas_service.py
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+# Quanto tempo um worker pode segurar a trava de regeneração de uma página
+TRAVA_SEGUNDOS = 30
+
+# Cabeçalhos que não podem ser reaproveitados entre visitantes
+CABECALHOS_IGNORADOS = {'set-cookie', 'x-cache'}
+
+
+def segundos():
+    return getattr(settings, 'PAGINA_CACHE_SEGUNDOS', 300)
+
+
+def _cache():
+    # Compartilhado entre os workers: invalidação e trava valem para todos
+    return caches[getattr(settings, 'PAGINA_CACHE_ALIAS', 'paginas')]
+
+
+def _chave_versao(grupo):
+    return f'pagina:versao:{grupo}'
+
+
+def _versao(grupo):
+    cache = _cache()
+    versao = cache.get(_chave_versao(grupo))
+    if versao is None:
+        # Versão inicial baseada no relógio: se a chave for despejada do cache,
+        # a nova versão nunca coincide com a de páginas antigas ainda guardadas
+        cache.add(_chave_versao(grupo), int(time.time() * 1000), timeout=None)
+        versao = cache.get(_chave_versao(grupo))
+    return versao
+
+
+def invalidar(grupo):
+    """Vence todas as páginas do grupo trocando a versão que elas precisam ter."""
+    cache = _cache()
+    try:
+        cache.incr(_chave_versao(grupo))
+    except ValueError:
+        cache.set(_chave_versao(grupo), int(time.time() * 1000), timeout=None)
+
+
+def _chave(request, grupo):
+    # Varia por esquema, host, caminho e query string. Sem a versão: a cópia
+    # invalidada continua no mesmo lugar e pode ser servida enquanto se regenera
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return f'pagina:{grupo}:{url}'
+
+
+def _cacheavel(request, response):
+    """
+    Só guarda respostas 200 que não dependam do visitante. Se a página usou
+    {% csrf_token %} (get_token marca CSRF_COOKIE_NEEDS_UPDATE), o HTML traz um
+    token do visitante atual e não pode ser servido a outro.
+    """
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+        and 'private' not in response.get('Cache-Control', '')
+        and 'no-store' not in response.get('Cache-Control', '')
+    )
+
+
+def _resposta(entrada, estado):
+    response = HttpResponse(entrada['conteudo'], status=entrada['status'])
+    for nome, valor in entrada['cabecalhos']:
+        response[nome] = valor
+    response['X-Cache'] = estado
+    return response
+
+
+def servir(request, grupo, gerar):
+    """
+    Serve a página do cache ou chama `gerar()` para renderizá-la. Vencida ou
+    invalidada, a cópia ainda fica guardada por mais um período: só o worker
+    que pega a trava regenera e os demais servem a cópia antiga enquanto
+    isso. Sem cópia nenhuma (primeiro acesso), cada um gera a sua.
+    """
+    cache = _cache()
+    versao = _versao(grupo)
+    chave = _chave(request, grupo)
+    entrada = cache.get(chave)
+    if entrada and entrada['versao'] == versao and entrada['expira_em'] > time.time():
+        return _resposta(entrada, 'HIT')
+
+    if entrada and not cache.add(f'{chave}:trava', 1, TRAVA_SEGUNDOS):
+        return _resposta(entrada, 'STALE')
+
+    try:
+        response = gerar()
+        patch_vary_headers(response, ('Cookie',))
+        if _cacheavel(request, response):
+            cache.set(chave, {
+                'conteudo': response.content,
+                'status': response.status_code,
+                'cabecalhos': [
+                    (nome, valor) for nome, valor in response.items()
+                    if nome.lower() not in CABECALHOS_IGNORADOS
+                ],
+                'versao': versao,
+                'expira_em': time.time() + segundos(),
+            }, timeout=segundos() * 2)
+        response['X-Cache'] = 'MISS'
+        return response
+    finally:
+        if entrada:
+            cache.delete(f'{chave}:trava')
@@ -0,0 +1,249 @@
+# core/services/duplicatas_service.py
+
+import random
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.db import connections, transaction
+from django.db.models import Count, Max, Min
+
+from ..models import Vaga, AssinaturaVaga, BandaVaga
+from .busca_salva_service import tokens
+from .similaridade_service import np
+
+# Campos de texto que entram na assinatura
+CAMPOS_TEXTO = (
+    'titulo', 'departamento', 'resumo', 'responsabilidades', 'requisitos_obrigatorios',
+    'requisitos_desejaveis', 'soft_skills', 'beneficios', 'etapas_processo',
+)
+
+# Shingles de 3 palavras; 128 funções de hash em 16 bandas de 8 linhas.
+# Com essas bandas, um par com Jaccard 0.8 vira candidato com ~95% de
+# chance e um par com 0.5, com ~6%.
+TAMANHO_SHINGLE = 3
+PERMUTACOES = 128
+BANDAS = 16
+LINHAS_POR_BANDA = PERMUTACOES // BANDAS
+
+# Similaridade (Jaccard estimado) a partir da qual a vaga é tratada como duplicata
+LIMIAR = 0.8
+
+TAMANHO_LOTE = 1000
+
+# Buckets maiores que isso (texto padrão repetido) são comparados só contra o primeiro
+MAX_PARES_POR_BUCKET = 50
+
+# Hash multiply-shift: ((a * x + b) mod 2^64) >> 32, com `a` ímpar
+_MASCARA = (1 << 64) - 1
+_sorteio = random.Random(20240601)
+_A = [_sorteio.getrandbits(64) | 1 for _ in range(PERMUTACOES)]
+_B = [_sorteio.getrandbits(64) for _ in range(PERMUTACOES)]
+if np is not None:
+    _A_NP = np.array(_A, dtype=np.uint64)[:, None]
+    _B_NP = np.array(_B, dtype=np.uint64)[:, None]
+
+
+# ----------------------------------------------------------------------
+# ASSINATURAS
+# ----------------------------------------------------------------------
+
+def texto_da_vaga(vaga):
+    return ' '.join(getattr(vaga, campo) or '' for campo in CAMPOS_TEXTO)
+
+
+def _shingles(texto):
+    palavras = tokens(texto)
+    if len(palavras) <= TAMANHO_SHINGLE:
+        return {zlib.crc32(' '.join(palavras).encode())} if palavras else set()
+    return {
+        zlib.crc32(' '.join(palavras[i:i + TAMANHO_SHINGLE]).encode())
+        for i in range(len(palavras) - TAMANHO_SHINGLE + 1)
+    }
+
+
+def assinatura(texto):
+    """Assinatura MinHash (PERMUTACOES inteiros de 32 bits, em bytes) ou None se não há texto."""
+    shingles = _shingles(texto)
+    if not shingles:
+        return None
+    if np is not None:
+        x = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+        # Multiplicação em uint64 dá a volta em 2^64, como queremos
+        hashes = (_A_NP * x + _B_NP) >> np.uint64(32)
+        return hashes.min(axis=1).astype(np.uint32).tobytes()
+    return array('I', (
+        min(((a * x + b) & _MASCARA) >> 32 for x in shingles) for a, b in zip(_A, _B)
+    )).tobytes()
+
+
+def chaves(minhash):
+    """Chave de cada banda da assinatura (banda nos bits altos)."""
+    tamanho = LINHAS_POR_BANDA * 4
+    return [
+        (banda << 32) | zlib.crc32(minhash[banda * tamanho:(banda + 1) * tamanho])
+        for banda in range(BANDAS)
+    ]
+
+
+def similaridade(a, b):
+    """Jaccard estimado: fração das posições em que as assinaturas coincidem."""
+    a, b = array('I', a), array('I', b)
+    return sum(x == y for x, y in zip(a, b)) / PERMUTACOES
+
+
+# ----------------------------------------------------------------------
+# ÍNDICE
+# ----------------------------------------------------------------------
+
+def _assinatura_da_vaga(vaga):
+    # Calculada uma vez por instância: a checagem na view e o post_save reaproveitam
+    if not hasattr(vaga, '_minhash'):
+        vaga._minhash = assinatura(texto_da_vaga(vaga))
+    return vaga._minhash
+
+
+def _gravar(assinaturas):
+    """Substitui assinatura e bandas das vagas de `assinaturas` (dict vaga_id -> bytes|None)."""
+    ids = list(assinaturas)
+    with transaction.atomic():
+        AssinaturaVaga.objects.filter(vaga_id__in=ids).delete()
+        BandaVaga.objects.filter(vaga_id__in=ids).delete()
+        AssinaturaVaga.objects.bulk_create([
+            AssinaturaVaga(vaga_id=vaga_id, minhash=minhash)
+            for vaga_id, minhash in assinaturas.items() if minhash
+        ])
+        BandaVaga.objects.bulk_create([
+            BandaVaga(vaga_id=vaga_id, chave=chave)
+            for vaga_id, minhash in assinaturas.items() if minhash
+            for chave in chaves(minhash)
+        ], batch_size=1000)
+
+
+def indexar_lote(vagas):
+    """Grava assinatura e bandas das vagas (após salvar; o texto pode ter mudado)."""
+    for inicio in range(0, len(vagas), TAMANHO_LOTE):
+        lote = vagas[inicio:inicio + TAMANHO_LOTE]
+        _gravar({vaga.pk: _assinatura_da_vaga(vaga) for vaga in lote})
+        for vaga in lote:
+            del vaga._minhash
+
+
+def indexar(vaga):
+    indexar_lote([vaga])
+
+
+def duplicatas(vaga, limiar=LIMIAR):
+    """
+    Vagas ativas (de qualquer empresa) quase iguais a `vaga`, como lista de
+    (Vaga, similaridade) da mais parecida para a menos. Lê só as vagas que
+    dividem alguma banda com ela pelo índice de BandaVaga.
+    """
+    minhash = _assinatura_da_vaga(vaga)
+    if minhash is None:
+        return []
+
+    candidatas = BandaVaga.objects.filter(chave__in=chaves(minhash)).values('vaga_id')
+    if vaga.pk:
+        candidatas = candidatas.exclude(vaga_id=vaga.pk)
+
+    encontradas = []
+    for outra in (
+        AssinaturaVaga.objects.filter(vaga_id__in=candidatas, vaga__ativa=True)
+        .select_related('vaga__empresa__profile')
+    ):
+        s = similaridade(minhash, bytes(outra.minhash))
+        if s >= limiar:
+            encontradas.append((outra.vaga, s))
+    encontradas.sort(key=lambda par: -par[1])
+    return encontradas
+
+
+# ----------------------------------------------------------------------
+# RELATÓRIO DO CATÁLOGO
+# ----------------------------------------------------------------------
+
+def _assinar_intervalo(inicio, fim):
+    """Tarefa do pool: assinaturas das vagas com id em [inicio, fim)."""
+    return [
+        (vaga.id, assinatura(texto_da_vaga(vaga)))
+        for vaga in Vaga.objects.filter(id__gte=inicio, id__lt=fim).only('id', *CAMPOS_TEXTO)
+    ]
+
+
+def reindexar(processos=None, tamanho_lote=TAMANHO_LOTE):
+    """
+    Recalcula as assinaturas de todas as vagas num pool de `processos`
+    (padrão: um por CPU), cada um lendo do banco a sua faixa de ids, e
+    regrava o índice. Retorna o número de vagas.
+    """
+    limites = Vaga.objects.aggregate(primeiro=Min('id'), ultimo=Max('id'))
+    if limites['primeiro'] is None:
+        return 0
+    inicios = range(limites['primeiro'], limites['ultimo'] + 1, tamanho_lote)
+
+    # Os filhos (criados na primeira tarefa) não devem herdar conexões abertas
+    connections.close_all()
+    total = 0
+    with ProcessPoolExecutor(max_workers=processos, initializer=django.setup) as pool:
+        for resultado in pool.map(_assinar_intervalo, inicios, (i + tamanho_lote for i in inicios)):
+            _gravar(dict(resultado))
+            total += len(resultado)
+    return total
+
+
+def _pares_candidatos():
+    """Pares de vagas ativas que dividem alguma banda."""
+    repetidas = (
+        BandaVaga.objects.filter(vaga__ativa=True)
+        .values('chave').annotate(total=Count('id')).filter(total__gt=1).values('chave')
+    )
+    pares = set()
+    chave_atual, membros = None, []
+
+    def fechar_bucket():
+        if len(membros) <= MAX_PARES_POR_BUCKET:
+            pares.update((a, b) for i, a in enumerate(membros) for b in membros[i + 1:])
+        else:
+            pares.update((membros[0], b) for b in membros[1:])
+
+    for chave, vaga_id in (
+        BandaVaga.objects.filter(chave__in=repetidas, vaga__ativa=True)
+        .order_by('chave', 'vaga_id').values_list('chave', 'vaga_id').iterator(chunk_size=5000)
+    ):
+        if chave != chave_atual:
+            fechar_bucket()
+            chave_atual, membros = chave, []
+        membros.append(vaga_id)
+    fechar_bucket()
+    return pares
+
+
+def grupos_duplicados(limiar=LIMIAR, tamanho_lote=TAMANHO_LOTE):
+    """
+    Agrupa as vagas ativas quase iguais (componentes conexos dos pares com
+    similaridade >= limiar). Retorna listas de vaga_id com 2+ vagas, das
+    maiores para as menores.
+    """
+    pais = {}
+
+    def raiz(x):
+        while pais.setdefault(x, x) != x:
+            pais[x] = pais[pais[x]]
+            x = pais[x]
+        return x
+
+    pares = sorted(_pares_candidatos())
+    for inicio in range(0, len(pares), tamanho_lote):
+        lote = pares[inicio:inicio + tamanho_lote]
+        ids = {vaga_id for par in lote for vaga_id in par}
+        assinaturas = dict(AssinaturaVaga.objects.filter(vaga_id__in=ids).values_list('vaga_id', 'minhash'))
+        for a, b in lote:
+            if similaridade(bytes(assinaturas[a]), bytes(assinaturas[b])) >= limiar:
+                pais[raiz(a)] = raiz(b)
+
+    grupos = {}
+    for vaga_id in pais:
+        grupos.setdefault(raiz(vaga_id), []).append(vaga_id)
+    return sorted((sorted(g) for g in grupos.values() if len(g) > 1), key=len, reverse=True)
@@ -0,0 +1,229 @@
+# core/services/feed_service.py
+
+import asyncio
+import contextvars
+import json
+import logging
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError
+
+from ..models import Candidatura, HistoricoStatus, Vaga
+
+logger = logging.getLogger('core.feed')
+
+NOMES_STATUS = dict(Candidatura.STATUS_CHOICES)
+
+# Eventos lidos por query (na leitura do log e na recuperação após reconexão)
+LIMITE_LEITURA = 500
+# Comentário SSE enviado a conexões ociosas, para proxies não as derrubarem
+PING_SEGUNDOS = 25
+# Eventos pendentes por conexão; quem não acompanha é desligado e reconecta
+FILA_MAXIMA = 200
+RECONEXAO_MS = 3000
+
+
+# ----------------------------------------------------------------------
+# EVENTOS
+# ----------------------------------------------------------------------
+# O log de eventos é a própria tabela HistoricoStatus (só recebe inserts):
+# o id de cada linha é o id do evento SSE, e o navegador retoma do
+# Last-Event-ID depois de uma queda sem perder nada.
+
+def ultimo_id():
+    return HistoricoStatus.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def ler_eventos(depois_de, empresa_id=None, vaga_id=None, limite=LIMITE_LEITURA):
+    """
+    Eventos com id > `depois_de`, em ordem, da empresa (ou só da vaga) ou de
+    todas. Retorna (eventos, último id lido) — o id avança mesmo quando o
+    evento é de uma vaga que não existe mais.
+    """
+    vagas = Vaga.objects.only('id', 'empresa_id', 'titulo')
+    if empresa_id is not None:
+        vagas = vagas.filter(empresa_id=empresa_id)
+    if vaga_id is not None:
+        vagas = vagas.filter(id=vaga_id)
+
+    historico = HistoricoStatus.objects.filter(id__gt=depois_de).order_by('id')
+    if empresa_id is not None or vaga_id is not None:
+        historico = historico.filter(vaga_id__in=vagas.values('id'))
+    historico = list(historico[:limite])
+    if not historico:
+        return [], depois_de
+
+    vagas = vagas.in_bulk({h.vaga_id for h in historico})
+    candidaturas = Candidatura.objects.select_related('candidato') \
+        .in_bulk({h.candidatura_id for h in historico})
+    eventos = []
+    for h in historico:
+        vaga, candidatura = vagas.get(h.vaga_id), candidaturas.get(h.candidatura_id)
+        if vaga is None or candidatura is None:
+            continue
+        candidato = candidatura.candidato
+        eventos.append({
+            'id': h.id,
+            'tipo': 'status' if h.status_anterior else 'candidatura',
+            'empresa_id': vaga.empresa_id,
+            'vaga_id': vaga.id,
+            'vaga': vaga.titulo,
+            'candidatura_id': candidatura.id,
+            'candidato': candidato.get_full_name() or candidato.username,
+            'status': h.status,
+            'status_nome': NOMES_STATUS.get(h.status, h.status),
+            'status_anterior_nome': NOMES_STATUS.get(h.status_anterior, ''),
+            'criado_em': h.criado_em.isoformat(),
+        })
+    return eventos, historico[-1].id
+
+
+def formatar(evento):
+    return f'id: {evento["id"]}\nevent: {evento["tipo"]}\ndata: {json.dumps(evento)}\n\n'
+
+
+# ----------------------------------------------------------------------
+# BROKER DO PROCESSO
+# ----------------------------------------------------------------------
+# Uma tarefa asyncio por worker lê o fim do log e distribui os eventos às
+# filas das conexões abertas, por empresa: uma query a cada rodada, qualquer
+# que seja o número de conexões. Gravações deste processo acordam a tarefa
+# na hora (notificar); as de outros workers chegam na rodada seguinte
+# (FEED_INTERVALO_SEGUNDOS). Ids em ordem de commit: o SQLite serializa
+# as escritas.
+
+class _Broker:
+
+    def __init__(self):
+        self.assinantes = defaultdict(set)  # empresa_id -> {asyncio.Queue}
+        self.loop = None
+        self.tarefa = None
+        self.acordar = None
+        self.pronto = None
+        self.ultimo = 0
+
+    async def assinar(self, empresa_id):
+        """Fila da conexão; retorna depois que o broker leu o fim do log."""
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop, self.tarefa = loop, None
+            self.assinantes.clear()
+        if self.tarefa is None or self.tarefa.done():
+            self.acordar, self.pronto = asyncio.Event(), asyncio.Event()
+            # Contexto limpo: a tarefa sobrevive à requisição que a criou
+            self.tarefa = loop.create_task(self._acompanhar(), context=contextvars.Context())
+        fila = asyncio.Queue(maxsize=FILA_MAXIMA)
+        self.assinantes[empresa_id].add(fila)
+        await self.pronto.wait()
+        return fila
+
+    def cancelar(self, empresa_id, fila):
+        filas = self.assinantes.get(empresa_id)
+        if filas is not None:
+            filas.discard(fila)
+            if not filas:
+                del self.assinantes[empresa_id]
+
+    def notificar(self):
+        loop, acordar = self.loop, self.acordar
+        if loop is not None and acordar is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(acordar.set)
+
+    async def _acompanhar(self):
+        intervalo = getattr(settings, 'FEED_INTERVALO_SEGUNDOS', 2)
+        try:
+            self.ultimo = await sync_to_async(ultimo_id)()
+        finally:
+            self.pronto.set()
+        while self.assinantes:
+            try:
+                await asyncio.wait_for(self.acordar.wait(), intervalo)
+            except asyncio.TimeoutError:
+                pass
+            self.acordar.clear()
+
+            try:
+                eventos, self.ultimo = await sync_to_async(ler_eventos)(self.ultimo)
+            except DatabaseError:
+                logger.exception('Falha ao ler o log de candidaturas; nova tentativa na próxima rodada')
+                continue
+            for evento in eventos:
+                for fila in list(self.assinantes.get(evento['empresa_id'], ())):
+                    self._entregar(evento['empresa_id'], fila, evento)
+            if len(eventos) == LIMITE_LEITURA:
+                self.acordar.set()
+        self.tarefa = None
+
+    def _entregar(self, empresa_id, fila, evento):
+        try:
+            fila.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Conexão lenta: desliga; o navegador reconecta com o Last-Event-ID
+            self.cancelar(empresa_id, fila)
+            while not fila.empty():
+                fila.get_nowait()
+            fila.put_nowait(None)
+
+
+_broker = _Broker()
+
+
+def notificar():
+    """Acorda o broker deste processo. Seguro fora do event loop (views síncronas)."""
+    _broker.notificar()
+
+
+# ----------------------------------------------------------------------
+# TRANSMISSÃO
+# ----------------------------------------------------------------------
+
+async def transmitir(empresa_id, vaga_id=None, desde=None):
+    """
+    Corpo do stream SSE (ASGI): eventos perdidos desde `desde` (o
+    Last-Event-ID) e depois os novos, com ping nas conexões ociosas.
+    """
+    fila = await _broker.assinar(empresa_id)
+    try:
+        yield f'retry: {RECONEXAO_MS}\n\n'
+        if desde is None:
+            enviado = _broker.ultimo
+            yield f'id: {enviado}\n\n'
+        else:
+            enviado = desde
+            while True:
+                eventos, lido = await sync_to_async(ler_eventos)(enviado, empresa_id, vaga_id)
+                for evento in eventos:
+                    yield formatar(evento)
+                if lido == enviado:
+                    break
+                enviado = lido
+
+        while True:
+            try:
+                evento = await asyncio.wait_for(fila.get(), PING_SEGUNDOS)
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            if evento is None:
+                return
+            if evento['id'] <= enviado or (vaga_id is not None and evento['vaga_id'] != vaga_id):
+                continue
+            yield formatar(evento)
+            enviado = evento['id']
+    finally:
+        _broker.cancelar(empresa_id, fila)
+
+
+def pendentes(empresa_id, vaga_id=None, desde=None):
+    """
+    Alternativa sob WSGI, sem conexão presa a um thread: devolve o que há
+    desde `desde` e encerra; o EventSource reconecta sozinho após o
+    `retry`, o que vira um polling com o Last-Event-ID.
+    """
+    reconexao = getattr(settings, 'FEED_WSGI_RECONEXAO_SEGUNDOS', 10) * 1000
+    if desde is None:
+        return f'retry: {reconexao}\nid: {ultimo_id()}\n\n'
+    eventos, lido = ler_eventos(desde, empresa_id, vaga_id)
+    return f'retry: {reconexao}\n\n' + ''.join(formatar(e) for e in eventos) + f'id: {lido}\n\n'
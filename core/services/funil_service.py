@@ -0,0 +1,208 @@
+# core/services/funil_service.py
+
+from collections import defaultdict
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, Exists, F, OuterRef, Q, Sum, Value, When
+from django.utils import timezone
+
+from ..models import Vaga, Candidatura, FunilDiario, HistoricoStatus
+
+ETAPAS = [status for status, _ in Candidatura.STATUS_CHOICES]
+NOMES_ETAPAS = dict(Candidatura.STATUS_CHOICES)
+
+DIAS_PADRAO = 30
+# Período máximo de uma consulta: até 4 linhas (etapas) por dia
+DIAS_MAXIMO = 92
+
+TAMANHO_LOTE = 2000
+
+_CAMPOS = ('entradas', 'saidas', 'segundos_na_etapa')
+
+
+def _pedacos(lista, tamanho=200):
+    for i in range(0, len(lista), tamanho):
+        yield lista[i:i + tamanho]
+
+
+# ----------------------------------------------------------------------
+# ATUALIZAÇÃO DOS AGREGADOS
+# ----------------------------------------------------------------------
+
+def somar(deltas):
+    """
+    Aplica {(empresa_id, vaga_id, dia, status): [entradas, saidas, segundos]}
+    às linhas da vaga e ao total da empresa (vaga_id = 0).
+    """
+    totais = defaultdict(lambda: [0, 0, 0])
+    for (empresa_id, vaga_id, dia, status), valores in deltas.items():
+        for chave in ((empresa_id, vaga_id, dia, status), (empresa_id, FunilDiario.TOTAL_EMPRESA, dia, status)):
+            for i, valor in enumerate(valores):
+                totais[chave][i] += valor
+    if not totais:
+        return
+
+    with transaction.atomic():
+        FunilDiario.objects.bulk_create([
+            FunilDiario(empresa_id=empresa_id, vaga_id=vaga_id, dia=dia, status=status)
+            for empresa_id, vaga_id, dia, status in totais
+        ], ignore_conflicts=True)
+        for lote in _pedacos(list(totais.items())):
+            condicoes = [
+                (Q(empresa_id=empresa_id, vaga_id=vaga_id, dia=dia, status=status), valores)
+                for (empresa_id, vaga_id, dia, status), valores in lote
+            ]
+            FunilDiario.objects.filter(reduce(or_, (q for q, _ in condicoes))).update(**{
+                campo: F(campo) + Case(*(When(q, then=Value(v[i])) for q, v in condicoes), default=Value(0))
+                for i, campo in enumerate(_CAMPOS)
+            })
+
+
+def _empresas(candidaturas):
+    """{vaga_id: empresa_id}, usando a vaga já carregada quando houver."""
+    empresas = {c.vaga.pk: c.vaga.empresa_id for c in candidaturas if Candidatura.vaga.is_cached(c)}
+    faltando = {c.vaga_id for c in candidaturas} - set(empresas)
+    if faltando:
+        empresas.update(Vaga.objects.filter(id__in=faltando).values_list('id', 'empresa_id'))
+    return empresas
+
+
+def registrar_candidaturas(candidaturas):
+    """Candidaturas criadas: entrada na etapa inicial, no dia da criação."""
+    empresas = _empresas(candidaturas)
+    deltas = defaultdict(lambda: [0, 0, 0])
+    for c in candidaturas:
+        deltas[(empresas[c.vaga_id], c.vaga_id, timezone.localdate(c.criada_em), c.status)][0] += 1
+    somar(deltas)
+
+
+def registrar_transicoes(transicoes):
+    """
+    Mudanças de status, como (candidatura, status anterior, desde quando
+    estava nele): saída da etapa anterior com o tempo passado nela e
+    entrada na nova, ambas no dia de `candidatura.status_desde`.
+    """
+    empresas = _empresas([c for c, _, _ in transicoes])
+    deltas = defaultdict(lambda: [0, 0, 0])
+    for c, anterior, desde in transicoes:
+        empresa_id, dia = empresas[c.vaga_id], timezone.localdate(c.status_desde)
+        saida = deltas[(empresa_id, c.vaga_id, dia, anterior)]
+        saida[1] += 1
+        saida[2] += max(0, int((c.status_desde - desde).total_seconds()))
+        deltas[(empresa_id, c.vaga_id, dia, c.status)][0] += 1
+    somar(deltas)
+
+
+# ----------------------------------------------------------------------
+# CONSULTA
+# ----------------------------------------------------------------------
+
+def periodo(inicio=None, fim=None):
+    """Período pedido limitado a DIAS_MAXIMO (padrão: últimos DIAS_PADRAO dias)."""
+    fim = fim or timezone.localdate()
+    inicio = inicio or fim - timedelta(days=DIAS_PADRAO - 1)
+    if inicio > fim:
+        inicio, fim = fim, inicio
+    return max(inicio, fim - timedelta(days=DIAS_MAXIMO - 1)), fim
+
+
+def funil(empresa, inicio, fim, vaga=None):
+    """
+    Métricas do funil da empresa (ou só da `vaga`) no período: candidaturas
+    por dia e, por etapa, entradas, taxa sobre as candidaturas recebidas e
+    tempo médio na etapa. Lê no máximo 4 linhas agregadas por dia.
+    """
+    vaga_id = vaga.pk if vaga else FunilDiario.TOTAL_EMPRESA
+    por_dia = defaultdict(int)
+    etapas = {status: {'entradas': 0, 'saidas': 0, 'segundos': 0} for status in ETAPAS}
+    for dia, status, entradas, saidas, segundos in (
+        FunilDiario.objects.filter(empresa=empresa, vaga_id=vaga_id, dia__range=(inicio, fim))
+        .values_list('dia', 'status', 'entradas', 'saidas', 'segundos_na_etapa')
+    ):
+        if status == ETAPAS[0]:
+            por_dia[dia] += entradas
+        etapa = etapas[status]
+        etapa['entradas'] += entradas
+        etapa['saidas'] += saidas
+        etapa['segundos'] += segundos
+
+    recebidas = etapas[ETAPAS[0]]['entradas']
+    decididas = etapas['aprovada']['entradas'] + etapas['rejeitada']['entradas']
+    return {
+        'serie': [
+            (inicio + timedelta(days=i), por_dia[inicio + timedelta(days=i)])
+            for i in range((fim - inicio).days + 1)
+        ],
+        'etapas': [
+            {
+                'status': status,
+                'nome': NOMES_ETAPAS[status],
+                'entradas': etapa['entradas'],
+                'taxa': round(100 * etapa['entradas'] / recebidas) if recebidas else None,
+                'dias_medios': round(etapa['segundos'] / etapa['saidas'] / 86400, 1) if etapa['saidas'] else None,
+            }
+            for status, etapa in etapas.items()
+        ],
+        'recebidas': recebidas,
+        'aprovacao': round(100 * etapas['aprovada']['entradas'] / decididas) if decididas else None,
+    }
+
+
+# ----------------------------------------------------------------------
+# RECONSTRUÇÃO
+# ----------------------------------------------------------------------
+
+def reconstruir(tamanho_lote=TAMANHO_LOTE):
+    """
+    Refaz os agregados das vagas existentes repassando o histórico de
+    status (HistoricoStatus) de cada candidatura em ordem. Candidaturas sem
+    histórico (gravadas em lote por fora dos sinais) entram pelo status
+    atual, no dia da criação. Retorna o número de eventos lidos.
+    """
+    empresas = dict(Vaga.objects.values_list('id', 'empresa_id'))
+    deltas = defaultdict(lambda: [0, 0, 0])
+    total = 0
+    anterior = (None, None)  # (candidatura_id, criado_em) do evento anterior
+    for candidatura_id, vaga_id, status_anterior, status, criado_em in (
+        HistoricoStatus.objects.filter(vaga_id__in=Vaga.objects.values('id')).order_by('candidatura_id', 'criado_em')
+        .values_list('candidatura_id', 'vaga_id', 'status_anterior', 'status', 'criado_em')
+        .iterator(chunk_size=tamanho_lote)
+    ):
+        total += 1
+        if vaga_id not in empresas:  # vaga criada durante a leitura
+            continue
+        empresa_id, dia = empresas[vaga_id], timezone.localdate(criado_em)
+        if status_anterior and anterior[0] == candidatura_id:
+            saida = deltas[(empresa_id, vaga_id, dia, status_anterior)]
+            saida[1] += 1
+            saida[2] += max(0, int((criado_em - anterior[1]).total_seconds()))
+        deltas[(empresa_id, vaga_id, dia, status)][0] += 1
+        anterior = (candidatura_id, criado_em)
+
+    for vaga_id, status, criada_em in (
+        Candidatura.objects.filter(vaga_id__in=Vaga.objects.values('id'))
+        .filter(~Exists(HistoricoStatus.objects.filter(candidatura_id=OuterRef('pk'))))
+        .values_list('vaga_id', 'status', 'criada_em')
+        .iterator(chunk_size=tamanho_lote)
+    ):
+        total += 1
+        if vaga_id in empresas:
+            deltas[(empresas[vaga_id], vaga_id, timezone.localdate(criada_em), status)][0] += 1
+
+    with transaction.atomic():
+        # Agregados de vagas já arquivadas ficam (as candidaturas saíram da tabela)
+        FunilDiario.objects.filter(
+            Q(vaga_id__in=Vaga.objects.values('id')) | Q(vaga_id=FunilDiario.TOTAL_EMPRESA)
+        ).delete()
+        # e o total da empresa recomeça por eles
+        FunilDiario.objects.bulk_create([
+            FunilDiario(vaga_id=FunilDiario.TOTAL_EMPRESA, **linha)
+            for linha in FunilDiario.objects.values('empresa_id', 'dia', 'status').annotate(
+                entradas=Sum('entradas'), saidas=Sum('saidas'), segundos_na_etapa=Sum('segundos_na_etapa'),
+            )
+        ], batch_size=1000)
+        somar(deltas)
+    return total
@@ -0,0 +1,106 @@
+# core/services/historico_status_service.py
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Candidatura, HistoricoStatus
+from . import feed_service, funil_service
+
+
+def _pedacos(lista, tamanho=500):
+    for i in range(0, len(lista), tamanho):
+        yield lista[i:i + tamanho]
+
+
+# ----------------------------------------------------------------------
+# GRAVAÇÃO
+# ----------------------------------------------------------------------
+# Chamadas pelos sinais de Candidatura (save individual, admin) e por
+# alterar_status (mudanças em lote, que não passam pelo save). Depois do
+# commit, o feed ao vivo das empresas (feed_service) é acordado.
+
+def registrar_criacao(candidaturas):
+    """Primeiro evento das candidaturas criadas e sua entrada no funil."""
+    HistoricoStatus.objects.bulk_create([
+        HistoricoStatus(candidatura_id=c.pk, vaga_id=c.vaga_id, status=c.status, criado_em=c.criada_em)
+        for c in candidaturas
+    ])
+    funil_service.registrar_candidaturas(candidaturas)
+    transaction.on_commit(feed_service.notificar)
+
+
+def registrar_transicoes(transicoes):
+    """
+    Eventos de mudança de status, como (candidatura já com o status novo,
+    status anterior, desde quando estava nele), e a passagem no funil.
+    """
+    HistoricoStatus.objects.bulk_create([
+        HistoricoStatus(
+            candidatura_id=c.pk, vaga_id=c.vaga_id, status_anterior=anterior,
+            status=c.status, criado_em=c.status_desde,
+        )
+        for c, anterior, _ in transicoes
+    ], batch_size=1000)
+    funil_service.registrar_transicoes(transicoes)
+    transaction.on_commit(feed_service.notificar)
+
+
+@transaction.atomic
+def alterar_status(candidaturas, novo_status):
+    """
+    Leva as candidaturas do queryset para `novo_status` (as que já estão
+    nele ficam como estão): um UPDATE por lote na tabela principal mais os
+    eventos e o funil, tudo na mesma transação. Retorna quantas mudaram.
+    """
+    agora = timezone.now()
+    mudam = list(
+        candidaturas.exclude(status=novo_status).select_for_update()
+        .values_list('id', 'vaga_id', 'status', 'status_desde')
+    )
+    for lote in _pedacos(mudam):
+        Candidatura.objects.filter(id__in=[c[0] for c in lote]).update(status=novo_status, status_desde=agora)
+
+    registrar_transicoes([
+        (Candidatura(id=id_, vaga_id=vaga_id, status=novo_status, status_desde=agora), anterior, desde)
+        for id_, vaga_id, anterior, desde in mudam
+    ])
+    return len(mudam)
+
+
+# ----------------------------------------------------------------------
+# CONSULTA
+# ----------------------------------------------------------------------
+
+def linhas_do_tempo(candidaturas):
+    """Preenche `c.historico` (eventos em ordem) das candidaturas, com uma query."""
+    por_candidatura = defaultdict(list)
+    ids = [c.pk for c in candidaturas]
+    if ids:
+        for evento in HistoricoStatus.objects.filter(candidatura_id__in=ids).order_by('candidatura_id', 'criado_em'):
+            por_candidatura[evento.candidatura_id].append(evento)
+    for c in candidaturas:
+        c.historico = por_candidatura[c.pk]
+    return candidaturas
+
+
+def eventos_da_vaga(vaga_id, inicio, fim, limite=20):
+    """
+    Mudanças de status mais recentes da vaga entre as datas `inicio` e `fim`
+    (inclusive), com `evento.candidatura` e o candidato carregados.
+    """
+    # Limites em datetime (não __date), para a faixa usar o índice (vaga_id, criado_em)
+    desde = timezone.make_aware(datetime.combine(inicio, time.min))
+    ate = timezone.make_aware(datetime.combine(fim + timedelta(days=1), time.min))
+    eventos = list(
+        HistoricoStatus.objects.filter(
+            vaga_id=vaga_id, criado_em__gte=desde, criado_em__lt=ate,
+        ).exclude(status_anterior='').order_by('-criado_em')[:limite]
+    )
+    candidaturas = Candidatura.objects.select_related('candidato') \
+        .in_bulk({e.candidatura_id for e in eventos})
+    for evento in eventos:
+        evento.candidatura = candidaturas.get(evento.candidatura_id)
+    return eventos
@@ -0,0 +1,296 @@
+# core/services/importacao_curriculos_service.py
+
+import unicodedata
+from datetime import date
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from ..models import (
+    Profile, PerfilCandidato, ExperienciaProfissional, FormacaoAcademica,
+    Competencia, Idioma
+)
+from ..signals import perfis_criados_em_lote
+from . import localizacao_service
+from .importacao_vagas_service import ler_registros
+
+TAMANHO_LOTE = 500
+
+
+def _chave(texto):
+    """Minúsculas e sem acentos, para casar rótulos livres com as choices."""
+    texto = unicodedata.normalize('NFKD', str(texto or '')).encode('ascii', 'ignore').decode()
+    return ' '.join(texto.lower().replace('-', ' ').split())
+
+
+UFS = {}
+for _uf, _nome in PerfilCandidato.ESTADOS_CHOICES:
+    UFS[_chave(_uf)] = _uf
+    UFS[_chave(_nome)] = _uf
+
+GRAUS = {
+    'ensino medio': 'ensino_medio', 'high school': 'ensino_medio',
+    'tecnico': 'tecnico', 'curso tecnico': 'tecnico', 'technical': 'tecnico', 'bootcamp': 'tecnico',
+    'tecnologo': 'tecnologo', 'associate': 'tecnologo',
+    'bacharelado': 'bacharelado', 'bachelor': 'bacharelado', 'graduacao': 'bacharelado',
+    'licenciatura': 'licenciatura',
+    'pos graduacao': 'pos_graduacao', 'especializacao': 'pos_graduacao', 'postgraduate': 'pos_graduacao',
+    'mestrado': 'mestrado', 'master': 'mestrado', 'masters': 'mestrado',
+    'doutorado': 'doutorado', 'phd': 'doutorado', 'doctorate': 'doutorado',
+    'mba': 'mba',
+}
+
+NIVEIS_IDIOMA = {
+    'basico': 'basico', 'beginner': 'basico', 'elementary': 'basico', 'basic': 'basico',
+    'intermediario': 'intermediario', 'intermediate': 'intermediario',
+    'avancado': 'avancado', 'advanced': 'avancado',
+    'fluente': 'fluente', 'fluent': 'fluente', 'nativo': 'fluente', 'native': 'fluente',
+    'native speaker': 'fluente',
+}
+
+REDES = {'linkedin': 'linkedin', 'github': 'github'}
+
+
+def _data(valor, campo):
+    """Aceita 'AAAA-MM-DD', 'AAAA-MM' ou 'AAAA' (formato do JSON Resume)."""
+    if not valor:
+        return None
+    partes = str(valor).split('-')
+    try:
+        return date(int(partes[0]), int(partes[1]) if len(partes) > 1 else 1,
+                    int(partes[2]) if len(partes) > 2 else 1)
+    except (ValueError, IndexError):
+        raise ValidationError({campo: f'Data inválida: {valor}'})
+
+
+def _objeto(valor, campo):
+    """Objeto JSON do campo ({} se ausente); outro tipo vira erro do registro."""
+    if not valor:
+        return {}
+    if not isinstance(valor, dict):
+        raise ValidationError({campo: 'Deve ser um objeto.'})
+    return valor
+
+
+def _objetos(valor, campo):
+    """Lista de objetos JSON do campo ([] se ausente)."""
+    if not valor:
+        return []
+    if not isinstance(valor, list):
+        raise ValidationError({campo: 'Deve ser uma lista.'})
+    for i, item in enumerate(valor):
+        if not isinstance(item, dict):
+            raise ValidationError({f'{campo}[{i}]': 'Deve ser um objeto.'})
+    return valor
+
+
+def _texto(valor, campo):
+    """Texto sem espaços nas pontas ('' se ausente)."""
+    if valor is None:
+        return ''
+    if not isinstance(valor, str):
+        raise ValidationError({campo: 'Deve ser um texto.'})
+    return valor.strip()
+
+
+def _validar(instancia, exclude):
+    instancia.full_clean(exclude=exclude, validate_unique=False, validate_constraints=False)
+    return instancia
+
+
+def converter_curriculo(registro, disponivel_para_alocacao):
+    """
+    Converte um currículo no formato JSON Resume (basics/work/education/
+    skills/languages, mais um bloco opcional `meta` com as preferências do
+    TrabalheJá) nas instâncias do modelo, ainda sem usuário vinculado.
+    Levanta ValidationError com os problemas encontrados.
+    """
+    if not isinstance(registro, dict):
+        raise ValidationError('Registro deve ser um objeto.')
+
+    basics = _objeto(registro.get('basics'), 'basics')
+    meta = _objeto(registro.get('meta'), 'meta')
+    local = _objeto(basics.get('location'), 'basics.location')
+
+    email = _texto(basics.get('email'), 'email').lower()
+    try:
+        validate_email(email)
+    except ValidationError:
+        raise ValidationError({'email': 'E-mail ausente ou inválido.'})
+
+    nome = _texto(basics.get('name'), 'name')
+    if not nome:
+        raise ValidationError({'name': 'Nome é obrigatório.'})
+    primeiro, _, sobrenome = nome.partition(' ')
+
+    redes = {}
+    for rede in _objetos(basics.get('profiles'), 'basics.profiles'):
+        campo = REDES.get(_chave(rede.get('network')))
+        if campo and rede.get('url'):
+            redes[campo] = rede['url']
+
+    perfil = _validar(PerfilCandidato(
+        titulo_profissional=basics.get('label') or '',
+        resumo_profissional=basics.get('summary') or '',
+        email_contato=email,
+        whatsapp=basics.get('phone') or '',
+        portfolio=basics.get('url') or '',
+        cidade=local.get('city') or '',
+        estado=UFS.get(_chave(local.get('region')), local.get('region') or ''),
+        modelo_trabalho=meta.get('modelo_trabalho', 'remoto'),
+        disponibilidade=meta.get('disponibilidade', 'imediata'),
+        pretensao_salarial=meta.get('pretensao_salarial'),
+        **redes,
+    ), exclude=['user', 'foto'])
+
+    experiencias = []
+    for i, trabalho in enumerate(_objetos(registro.get('work'), 'work')):
+        fim = _data(trabalho.get('endDate'), f'work[{i}].endDate')
+        experiencias.append(_validar(ExperienciaProfissional(
+            cargo=trabalho.get('position') or '',
+            empresa=trabalho.get('name') or trabalho.get('company') or '',
+            data_inicio=_data(trabalho.get('startDate'), f'work[{i}].startDate'),
+            data_fim=fim,
+            atual=fim is None,
+            descricao=trabalho.get('summary') or '-',
+        ), exclude=['candidato']))
+
+    formacoes = []
+    hoje = date.today()
+    for i, estudo in enumerate(_objetos(registro.get('education'), 'education')):
+        grau = GRAUS.get(_chave(estudo.get('studyType')))
+        if not grau:
+            raise ValidationError({f'education[{i}].studyType': f'Grau não reconhecido: {estudo.get("studyType")}'})
+        fim = _data(estudo.get('endDate'), f'education[{i}].endDate')
+        formacoes.append(_validar(FormacaoAcademica(
+            grau=grau,
+            curso=estudo.get('area') or '',
+            instituicao=estudo.get('institution') or '',
+            status='concluido' if fim and fim <= hoje else 'cursando',
+            data_inicio=_data(estudo.get('startDate'), f'education[{i}].startDate'),
+            data_fim=fim,
+        ), exclude=['candidato']))
+
+    competencias = []
+    for i, skill in enumerate(_objetos(registro.get('skills'), 'skills')):
+        nome_skill = _texto(skill.get('name'), f'skills[{i}].name')
+        if nome_skill:
+            competencias.append(_validar(Competencia(nome=nome_skill), exclude=['candidato']))
+
+    idiomas = []
+    for i, idioma in enumerate(_objetos(registro.get('languages'), 'languages')):
+        nivel = NIVEIS_IDIOMA.get(_chave(idioma.get('fluency')), 'basico')
+        idiomas.append(_validar(Idioma(idioma=idioma.get('language') or '', nivel=nivel), exclude=['candidato']))
+
+    disponivel = meta.get('disponivel_para_alocacao', disponivel_para_alocacao)
+    if not isinstance(disponivel, bool):
+        raise ValidationError({'meta.disponivel_para_alocacao': 'Use true ou false.'})
+
+    user = User(
+        username=email, email=email, first_name=primeiro[:150], last_name=sobrenome[:150],
+        password=make_password(None),
+    )
+    profile = Profile(
+        tipo='candidato', nome_completo=nome,
+        disponivel_para_alocacao=disponivel,
+    )
+    return {
+        'user': user, 'profile': profile, 'perfil': perfil,
+        'experiencias': experiencias, 'formacoes': formacoes,
+        'competencias': competencias, 'idiomas': idiomas,
+    }
+
+
+def _gravar_lote(lote, ao_erro):
+    emails = [c['user'].username for _, c in lote]
+    existentes = set(User.objects.filter(username__in=emails).values_list('username', flat=True))
+
+    novos = []
+    for numero, curriculo in lote:
+        email = curriculo['user'].username
+        if email in existentes:
+            ao_erro(numero, {'email': [f'{email} já está cadastrado.']})
+            continue
+        existentes.add(email)
+        novos.append(curriculo)
+    if not novos:
+        return 0
+
+    with transaction.atomic():
+        # bulk_create não dispara post_save: o signal criar_profile não roda
+        # por linha e os Profiles são criados aqui mesmo, também em lote.
+        usuarios = User.objects.bulk_create([c['user'] for c in novos])
+        if usuarios[0].pk is None:
+            ids = dict(User.objects.filter(
+                username__in=[u.username for u in usuarios]
+            ).values_list('username', 'id'))
+            for u in usuarios:
+                u.pk = ids[u.username]
+
+        filhos = {
+            ExperienciaProfissional: [], FormacaoAcademica: [], Competencia: [], Idioma: [],
+        }
+        for curriculo, user in zip(novos, usuarios):
+            curriculo['profile'].user_id = user.pk
+            curriculo['perfil'].user_id = user.pk
+            for modelo, chave in (
+                (ExperienciaProfissional, 'experiencias'), (FormacaoAcademica, 'formacoes'),
+                (Competencia, 'competencias'), (Idioma, 'idiomas'),
+            ):
+                for obj in curriculo[chave]:
+                    obj.candidato_id = user.pk
+                    filhos[modelo].append(obj)
+
+        # Também sem pre_save/post_save no perfil: município resolvido aqui e
+        # salários e vetores de similaridade pelo signal de lote
+        perfis = [c['perfil'] for c in novos]
+        municipios = localizacao_service.resolver_lote((p.cidade, p.estado) for p in perfis)
+        for perfil, municipio_id in zip(perfis, municipios):
+            perfil.municipio_id = municipio_id
+
+        Profile.objects.bulk_create([c['profile'] for c in novos])
+        PerfilCandidato.objects.bulk_create(perfis)
+        for modelo, objs in filhos.items():
+            modelo.objects.bulk_create(objs)
+        transaction.on_commit(
+            lambda: perfis_criados_em_lote.send(sender=PerfilCandidato, perfis=perfis)
+        )
+
+    return len(novos)
+
+
+def importar_curriculos(texto, formato, disponivel_para_alocacao=True,
+                        tamanho_lote=TAMANHO_LOTE, ao_erro=None):
+    """
+    Importa currículos em lotes transacionais, deduplicando por e-mail (no
+    arquivo e contra a base). Erros são entregues a `ao_erro(numero, erros)`.
+    Retorna um dicionário com o total de registros, criados e erros.
+    """
+    total = criados = erros = 0
+
+    def registrar_erro(numero, detalhes):
+        nonlocal erros
+        erros += 1
+        if ao_erro:
+            ao_erro(numero, detalhes)
+
+    lote = []
+    for numero, registro in enumerate(ler_registros(texto, formato), start=1):
+        total += 1
+        try:
+            lote.append((numero, converter_curriculo(registro, disponivel_para_alocacao)))
+        except ValidationError as exc:
+            registrar_erro(numero, exc.message_dict if hasattr(exc, 'error_dict') else {'__all__': exc.messages})
+            continue
+
+        if len(lote) >= tamanho_lote:
+            criados += _gravar_lote(lote, registrar_erro)
+            lote = []
+
+    if lote:
+        criados += _gravar_lote(lote, registrar_erro)
+
+    return {'total': total, 'criados': criados, 'erros': erros}
@@ -0,0 +1,174 @@
+# core/services/importacao_vagas_service.py
+
+import csv
+import io
+import json
+
+from django.db import transaction
+
+from ..forms import VagaForm
+from ..models import Vaga
+from ..signals import vagas_criadas_em_lote
+from . import localizacao_service
+
+TAMANHO_LOTE = 1000
+FORMATOS = ('csv', 'json', 'jsonl')
+
+
+class VagaImportacaoForm(VagaForm):
+    # A unicidade de codigo_vaga é verificada em lote pelo importador,
+    # evitando uma query por linha.
+    def validate_unique(self):
+        pass
+
+    def revincular(self, dados):
+        """
+        Reaproveita o form para um novo registro. Instanciar um VagaForm faz
+        deepcopy de todos os campos, o que dominava o custo da importação.
+        """
+        self.data = dados
+        self.instance = Vaga()
+        self._errors = None
+        self._bound_fields_cache = {}
+        return self
+
+
+def detectar_formato(nome_arquivo):
+    extensao = nome_arquivo.rsplit('.', 1)[-1].lower()
+    if extensao == 'ndjson':
+        return 'jsonl'
+    return extensao if extensao in FORMATOS else None
+
+
+def _iterar_json_array(texto, tamanho_bloco=64 * 1024):
+    """Lê um array JSON de objetos incrementalmente, sem carregar o arquivo todo."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    inicio_array = False
+    fim = False
+
+    while not fim:
+        bloco = texto.read(tamanho_bloco)
+        fim = not bloco
+        buffer += bloco
+        pos = 0
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if not inicio_array:
+                if pos < len(buffer):
+                    if buffer[pos] != '[':
+                        raise ValueError('O arquivo JSON deve conter uma lista de vagas.')
+                    inicio_array = True
+                    pos += 1
+                    continue
+                break
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+            try:
+                objeto, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if fim:
+                    raise ValueError('JSON inválido ou incompleto.')
+                break
+            yield objeto
+
+        buffer = buffer[pos:]
+
+
+def ler_registros(texto, formato):
+    """Gera dicionários a partir de um stream de texto CSV, JSON ou JSON Lines."""
+    if formato == 'csv':
+        yield from csv.DictReader(texto)
+    elif formato == 'jsonl':
+        for linha in texto:
+            if linha.strip():
+                yield json.loads(linha)
+    elif formato == 'json':
+        yield from _iterar_json_array(texto)
+    else:
+        raise ValueError(f'Formato não suportado: {formato}')
+
+
+def _normalizar(registro):
+    dados = {k.strip(): (v.strip() if isinstance(v, str) else v)
+             for k, v in registro.items() if k}
+    # Checkbox ausente seria lido como False: vagas importadas nascem ativas
+    dados.setdefault('ativa', True)
+    if dados['ativa'] in ('', None):
+        dados['ativa'] = True
+    return dados
+
+
+def _gravar_lote(lote, empresa, ao_erro):
+    # Lotes anteriores já estão no banco, então basta checar o próprio lote
+    # contra o banco e contra ele mesmo: a memória fica limitada ao lote.
+    vistos = set()
+    codigos = [vaga.codigo_vaga for _, vaga in lote]
+    existentes = set(Vaga.objects.filter(codigo_vaga__in=codigos).values_list('codigo_vaga', flat=True))
+
+    vagas = []
+    for numero, vaga in lote:
+        if vaga.codigo_vaga in existentes or vaga.codigo_vaga in vistos:
+            ao_erro(numero, {'codigo_vaga': ['Já existe uma vaga com este código.']})
+            continue
+        vistos.add(vaga.codigo_vaga)
+        vaga.empresa = empresa
+        vagas.append(vaga)
+
+    # bulk_create não dispara pre_save: municípios do lote numa query só
+    municipios = localizacao_service.resolver_lote([(vaga.localizacao, None) for vaga in vagas])
+    for vaga, municipio_id in zip(vagas, municipios):
+        vaga.municipio_id = municipio_id
+
+    with transaction.atomic():
+        vagas = Vaga.objects.bulk_create(vagas)
+        if vagas:
+            transaction.on_commit(
+                lambda: vagas_criadas_em_lote.send(sender=Vaga, vagas=vagas)
+            )
+    return len(vagas)
+
+
+def importar_vagas(texto, formato, empresa, tamanho_lote=TAMANHO_LOTE, ao_erro=None):
+    """
+    Valida cada registro com as regras do VagaForm e insere as vagas válidas
+    com bulk_create em lotes. Erros são entregues a `ao_erro(numero, erros)`
+    para que o chamador decida como reportá-los sem acumular tudo em memória.
+    Retorna um dicionário com o total de registros, criadas e erros.
+    """
+    total = criadas = erros = 0
+
+    def registrar_erro(numero, detalhes):
+        nonlocal erros
+        erros += 1
+        if ao_erro:
+            ao_erro(numero, detalhes)
+
+    form = VagaImportacaoForm(data={})
+    lote = []
+    for numero, registro in enumerate(ler_registros(texto, formato), start=1):
+        total += 1
+        if not isinstance(registro, dict):
+            registrar_erro(numero, {'__all__': ['Registro deve ser um objeto.']})
+            continue
+
+        if not form.revincular(_normalizar(registro)).is_valid():
+            registrar_erro(numero, {campo: list(msgs) for campo, msgs in form.errors.items()})
+            continue
+
+        lote.append((numero, form.instance))
+        if len(lote) >= tamanho_lote:
+            criadas += _gravar_lote(lote, empresa, registrar_erro)
+            lote = []
+
+    if lote:
+        criadas += _gravar_lote(lote, empresa, registrar_erro)
+
+    return {'total': total, 'criadas': criadas, 'erros': erros}
+
+
+def abrir_upload(arquivo):
+    """Envolve um UploadedFile (binário) num stream de texto UTF-8."""
+    return io.TextIOWrapper(arquivo.file, encoding='utf-8-sig', newline='')
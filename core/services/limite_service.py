@@ -0,0 +1,114 @@
+# core/services/limite_service.py
+
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.db.models import F, Value
+from django.db.models.functions import Least
+from django.db.models.lookups import GreaterThanOrEqual
+
+from ..models import BaldeLimite
+from . import profiling_service
+
+ESCOPOS = ('ip', 'conta')
+
+
+def _resumo(identificador):
+    # Chave curta e de tamanho fixo (e-mails, IPv6)
+    return hashlib.sha1(str(identificador).encode()).hexdigest()[:20]
+
+
+def _chave(rota, escopo, identificador):
+    return f'{rota}:{escopo}:{_resumo(identificador)}'
+
+
+# ----------------------------------------------------------------------
+# BALDE DE FICHAS
+# ----------------------------------------------------------------------
+# O balde tem `capacidade` fichas, repostas continuamente ao longo de
+# `periodo` segundos. O saldo é lido antes: requisição bloqueada (a rajada
+# de um abuso) custa só esse SELECT, sem disputar a escrita do banco. Com
+# saldo, reposição e gasto acontecem numa única UPDATE condicional (só passa
+# com saldo >= 1), atômica no banco: dois workers nunca gastam a mesma
+# ficha, sem ler-e-regravar.
+
+def _saldo(capacidade, periodo, agora):
+    """Fichas do balde em `agora`: as gravadas mais a reposição desde a última gravação."""
+    return Least(
+        Value(float(capacidade)),
+        F('fichas') + (Value(agora) - F('atualizado_em')) * Value(capacidade / periodo),
+    )
+
+
+def _espera(fichas, capacidade, periodo):
+    return max(1, math.ceil((1 - fichas) * periodo / capacidade))
+
+
+def consumir(rota, escopo, identificador, capacidade, periodo, agora=None):
+    """
+    Gasta uma ficha. Retorna 0 se havia saldo, ou em quantos segundos
+    volta a haver (bloqueios não gastam saldo nem escrevem no banco).
+    """
+    agora = time.time() if agora is None else agora
+    chave = _chave(rota, escopo, identificador)
+    saldo = _saldo(capacidade, periodo, agora)
+    balde = BaldeLimite.objects.filter(chave=chave)
+
+    fichas = balde.annotate(saldo=saldo).values_list('saldo', flat=True).first()
+    if fichas is None:
+        BaldeLimite.objects.bulk_create(
+            [BaldeLimite(chave=chave, fichas=capacidade, atualizado_em=agora)], ignore_conflicts=True,
+        )
+    elif fichas < 1:
+        return _espera(fichas, capacidade, periodo)
+
+    if balde.filter(GreaterThanOrEqual(saldo, 1)).update(fichas=saldo - 1, atualizado_em=Value(agora)):
+        return 0
+    # Outro worker levou a última ficha entre a leitura e a UPDATE
+    fichas = balde.annotate(saldo=saldo).values_list('saldo', flat=True).first() or 0
+    return _espera(fichas, capacidade, periodo)
+
+
+def devolver(rota, escopo, identificador, capacidade):
+    """Devolve a ficha gasta por uma requisição que outro limite barrou."""
+    BaldeLimite.objects.filter(chave=_chave(rota, escopo, identificador)) \
+        .update(fichas=Least(Value(float(capacidade)), F('fichas') + 1))
+
+
+def verificar(rota, ip, conta=None):
+    """
+    Aplica os limites da rota (settings.LIMITES_REQUISICOES) por IP e por
+    conta. Retorna 0 ou os segundos de espera do primeiro limite estourado;
+    nesse caso as fichas já gastas nos escopos anteriores são devolvidas.
+    """
+    if not getattr(settings, 'LIMITES_ATIVOS', True):
+        return 0
+    limites = getattr(settings, 'LIMITES_REQUISICOES', {}).get(rota, {})
+    gastas = []
+    for escopo, identificador in zip(ESCOPOS, (ip, conta)):
+        if escopo not in limites or not identificador:
+            continue
+        capacidade, periodo = limites[escopo]
+        espera = consumir(rota, escopo, identificador, capacidade, periodo)
+        profiling_service.registrar_limite(rota, escopo, bloqueada=bool(espera))
+        if espera:
+            for args in gastas:
+                devolver(*args)
+            return espera
+        gastas.append((rota, escopo, identificador, capacidade))
+    return 0
+
+
+def limpar(agora=None):
+    """
+    Apaga os baldes parados há mais que o maior período configurado: já
+    estão cheios de novo e seriam recriados iguais. Retorna quantos saíram.
+    """
+    agora = time.time() if agora is None else agora
+    periodos = [
+        periodo for limites in getattr(settings, 'LIMITES_REQUISICOES', {}).values()
+        for _, periodo in limites.values()
+    ]
+    return BaldeLimite.objects.filter(atualizado_em__lt=agora - max(periodos, default=0)).delete()[0]
@@ -0,0 +1,214 @@
+# core/services/localizacao_service.py
+
+import math
+import re
+import unicodedata
+from functools import lru_cache
+
+from django.db.models import Q
+
+from ..models import Municipio, PerfilCandidato
+
+UFS = {uf for uf, _ in PerfilCandidato.ESTADOS_CHOICES}
+
+RAIO_TERRA_KM = 6371.0
+
+# Precisão do geohash gravado em Municipio (células de ~150 m)
+PRECISAO_GEOHASH = 7
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# "Cidade - UF", "Cidade/UF", "Cidade, UF", "Cidade (UF)"... O hífen só
+# separa com espaços em volta ou antes da UF final, por causa de nomes como
+# Embu-Guaçu e Ji-Paraná.
+_SEPARADORES = re.compile(r'\s+[-–]\s+|\s*[/,()|]\s*|-(?=[A-Za-z]{2}\s*$)')
+
+
+def normalizar(texto):
+    """Minúsculas, sem acentos e com espaços simples: a forma usada nas buscas por nome."""
+    texto = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode().lower()
+    return ' '.join(re.sub(r"[^a-z0-9' ]", ' ', texto).split())
+
+
+_UF_POR_NOME = {normalizar(nome): uf for uf, nome in PerfilCandidato.ESTADOS_CHOICES}
+
+
+# ----------------------------------------------------------------------
+# NORMALIZAÇÃO DE TEXTO LIVRE
+# ----------------------------------------------------------------------
+
+def _partes(texto):
+    partes = [p for p in _SEPARADORES.split(texto or '') if p.strip()]
+    uf = None
+    cidades = []
+    for parte in partes:
+        sigla = parte.strip().upper()
+        if sigla in UFS and uf is None:
+            uf = sigla
+        elif normalizar(parte) in _UF_POR_NOME and cidades and uf is None:
+            uf = _UF_POR_NOME[normalizar(parte)]
+        else:
+            cidades.append(normalizar(parte))
+    return cidades, uf
+
+
+@lru_cache(maxsize=4096)
+def resolver(texto, uf=None):
+    """
+    Id do Municipio descrito por um texto livre ("Campinas - SP",
+    "São Paulo/SP (Zona Sul)", "Belo Horizonte") ou None. Sem UF, fica com
+    a localidade mais populosa do nome. A tabela é estática, então o
+    resultado é guardado em memória por processo.
+    """
+    cidades, uf_texto = _partes(texto)
+    uf = (uf or uf_texto or '').upper() or None
+
+    for cidade in cidades:
+        encontrados = Municipio.objects.filter(nome_normalizado=cidade)
+        if uf:
+            encontrados = encontrados.filter(uf=uf)
+        municipio_id = encontrados.order_by('-populacao').values_list('id', flat=True).first()
+        if municipio_id:
+            return municipio_id
+    return None
+
+
+def resolver_lote(pares):
+    """
+    resolver() para uma lista de (texto, uf), com uma única query para os
+    nomes de todo o lote (importações em bulk_create, sem pre_save).
+    Retorna a lista de ids na mesma ordem.
+    """
+    pares = [(texto, (uf or '').upper() or None) for texto, uf in pares]
+    partes = {par: _partes(par[0]) for par in set(pares)}
+    nomes = {cidade for cidades, _ in partes.values() for cidade in cidades}
+
+    # nome -> [(uf, id)] do mais populoso para o menos
+    municipios = {}
+    for municipio_id, nome, uf in (
+        Municipio.objects.filter(nome_normalizado__in=nomes)
+        .order_by('-populacao').values_list('id', 'nome_normalizado', 'uf')
+    ):
+        municipios.setdefault(nome, []).append((uf, municipio_id))
+
+    resolvidos = {}
+    for par, (cidades, uf_texto) in partes.items():
+        uf = par[1] or uf_texto
+        resolvidos[par] = next((
+            municipio_id
+            for cidade in cidades
+            for uf_municipio, municipio_id in municipios.get(cidade, ())
+            if not uf or uf_municipio == uf
+        ), None)
+    return [resolvidos[par] for par in pares]
+
+
+@lru_cache(maxsize=8192)
+def uf_do_municipio(municipio_id):
+    """UF do município (tabela estática, guardada em memória) ou ''."""
+    if municipio_id is None:
+        return ''
+    return Municipio.objects.filter(pk=municipio_id).values_list('uf', flat=True).first() or ''
+
+
+# ----------------------------------------------------------------------
+# DISTÂNCIAS E GEOHASH
+# ----------------------------------------------------------------------
+
+def distancia_km(lat1, lon1, lat2, lon2):
+    """Distância em linha reta (haversine) entre dois pontos."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * RAIO_TERRA_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def geohash(latitude, longitude, precisao=PRECISAO_GEOHASH):
+    """Geohash (base32) do ponto: prefixos comuns = células vizinhas."""
+    faixa_lat, faixa_lon = [-90.0, 90.0], [-180.0, 180.0]
+    codigo, bits, valor, longitude_da_vez = [], 0, 0, True
+    while len(codigo) < precisao:
+        faixa, coordenada = (faixa_lon, longitude) if longitude_da_vez else (faixa_lat, latitude)
+        meio = (faixa[0] + faixa[1]) / 2
+        valor <<= 1
+        if coordenada >= meio:
+            valor |= 1
+            faixa[0] = meio
+        else:
+            faixa[1] = meio
+        longitude_da_vez = not longitude_da_vez
+        bits += 1
+        if bits == 5:
+            codigo.append(_BASE32[valor])
+            bits, valor = 0, 0
+    return ''.join(codigo)
+
+
+def _tamanho_celula(precisao):
+    """(altura, largura) em graus de uma célula de geohash."""
+    bits = 5 * precisao
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def _celulas(latitude, longitude, raio_km):
+    """Prefixos de geohash que cobrem o quadrado de lado 2 x raio em torno do ponto."""
+    delta_lat = raio_km / 111.0
+    delta_lon = raio_km / max(1.0, 111.0 * math.cos(math.radians(latitude)))
+
+    # Maior precisão cuja célula ainda é maior que o raio: no máximo 3 x 3 células
+    precisao = 1
+    while precisao < PRECISAO_GEOHASH:
+        altura, largura = _tamanho_celula(precisao + 1)
+        if altura < delta_lat or largura < delta_lon:
+            break
+        precisao += 1
+
+    altura, largura = _tamanho_celula(precisao)
+    celulas = set()
+    lat = latitude - delta_lat
+    while True:
+        lon = longitude - delta_lon
+        while True:
+            celulas.add(geohash(max(-90.0, min(90.0, lat)), (lon + 180.0) % 360.0 - 180.0, precisao))
+            if lon >= longitude + delta_lon:
+                break
+            lon = min(lon + largura, longitude + delta_lon)
+        if lat >= latitude + delta_lat:
+            break
+        lat = min(lat + altura, latitude + delta_lat)
+    return celulas
+
+
+def municipios_no_raio(latitude, longitude, raio_km):
+    """
+    {municipio_id: distância em km} das localidades a até `raio_km` do
+    ponto. Cada célula de geohash vira uma faixa no índice de
+    Municipio.geohash; só as localidades dessas faixas têm a distância
+    calculada.
+    """
+    faixas = Q()
+    for prefixo in _celulas(latitude, longitude, raio_km):
+        # '{' vem logo depois de 'z', o maior caractere do base32 do geohash
+        faixas |= Q(geohash__gte=prefixo, geohash__lt=prefixo + '{')
+
+    proximos = {}
+    for municipio_id, lat, lon in Municipio.objects.filter(faixas).values_list('id', 'latitude', 'longitude'):
+        distancia = distancia_km(latitude, longitude, lat, lon)
+        if distancia <= raio_km:
+            proximos[municipio_id] = distancia
+    return proximos
+
+
+def vagas_no_raio(vagas, municipio_id, raio_km):
+    """
+    Vagas do queryset cujo município fica a até `raio_km` do município de
+    origem, da mais próxima para a mais distante, com `distancia_km`
+    preenchido. As vagas são lidas pelo índice (municipio, ativa).
+    """
+    origem = Municipio.objects.only('latitude', 'longitude').get(pk=municipio_id)
+    distancias = municipios_no_raio(origem.latitude, origem.longitude, raio_km)
+    encontradas = list(vagas.filter(municipio_id__in=list(distancias)))
+    for vaga in encontradas:
+        vaga.distancia_km = round(distancias[vaga.municipio_id])
+    encontradas.sort(key=lambda vaga: vaga.distancia_km)
+    return encontradas
@@ -1,30 +1,330 @@
 # core/services/match_service.py
 
+import unicodedata
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Exists, F, OuterRef
+from django.utils import timezone
+
+from ..models import Candidatura, Competencia, FormacaoAcademica, Idioma, PerfilCandidato, RegrasPontuacao
+from .localizacao_service import distancia_km
+from .perfil_elite_service import EIXOS
+
+NIVEIS_IDIOMA = [nivel for nivel, _ in Idioma._meta.get_field('nivel').choices]
+
+TAMANHO_LOTE = 500
+
+# Pontuadores compilados por (vaga, versão das regras). A versão sobe a cada
+# alteração, então uma entrada nunca fica desatualizada, só sem uso.
+MAX_COMPILADOS = 1024
+_compilados = {}
+
+
+def normalizar(texto):
+    texto = unicodedata.normalize('NFKD', str(texto or '')).encode('ascii', 'ignore').decode()
+    return ' '.join(texto.lower().split())
+
+
+# ----------------------------------------------------------------------
+# REGRAS
+# ----------------------------------------------------------------------
+# As regras de uma vaga (RegrasPontuacao.regras) sobrepõem as padrão, que
+# reproduzem os pesos históricos do match. Faixas são [limite, pontos]: vale
+# a de menor distância (km) que alcança o candidato, ou a de maior número de
+# experiências que ele atinge.
+
+REGRAS_PADRAO = {
+    'modelo_trabalho': 20,
+    'remoto': 15,
+    'distancia': [[30, 15], [100, 8]],
+    'salario': 20,
+    'experiencia': [[4, 20], [2, 12], [1, 5]],
+    'formacao_concluida': 15,
+    'formacao_incompleta': 8,
+    # Pontos por competência exigida que o candidato tem
+    'competencias': [],
+    'pontos_competencia': 0,
+    # {idioma: nível mínimo}; pontos por idioma atendido
+    'idiomas': {},
+    'pontos_idioma': 0,
+    # {eixo do teste de perfil: pontos para a nota 100}
+    'eixos': {},
+    'maximo': 100,
+}
+
+_PONTOS = ('modelo_trabalho', 'remoto', 'salario', 'formacao_concluida', 'formacao_incompleta',
+           'pontos_competencia', 'pontos_idioma', 'maximo')
+
+
+def _faixas(valor, nome):
+    try:
+        faixas = [(float(limite), int(pontos)) for limite, pontos in valor]
+    except (TypeError, ValueError):
+        raise ValidationError(f'{nome}: use pares [limite, pontos].')
+    if any(limite < 0 or pontos < 0 for limite, pontos in faixas):
+        raise ValidationError(f'{nome}: limites e pontos não podem ser negativos.')
+    return [[limite, pontos] for limite, pontos in faixas]
+
+
+def validar(regras):
+    """Regras completas (padrão + as informadas) ou ValidationError."""
+    desconhecidas = set(regras) - set(REGRAS_PADRAO)
+    if desconhecidas:
+        raise ValidationError(f'Regras desconhecidas: {", ".join(sorted(desconhecidas))}.')
+    r = {**REGRAS_PADRAO, **regras}
+
+    for nome in _PONTOS:
+        if not isinstance(r[nome], int) or r[nome] < 0:
+            raise ValidationError(f'{nome}: informe um inteiro não negativo.')
+    r['distancia'] = _faixas(r['distancia'], 'distancia')
+    r['experiencia'] = _faixas(r['experiencia'], 'experiencia')
+    r['competencias'] = sorted({normalizar(c) for c in r['competencias'] if normalizar(c)})
+
+    idiomas = {}
+    for idioma, nivel in dict(r['idiomas']).items():
+        if nivel not in NIVEIS_IDIOMA:
+            raise ValidationError(f'Nível de idioma inválido: {nivel}.')
+        idiomas[normalizar(idioma)] = nivel
+    r['idiomas'] = idiomas
+
+    eixos = dict(r['eixos'])
+    if set(eixos) - set(EIXOS) or any(not isinstance(p, int) or p < 0 for p in eixos.values()):
+        raise ValidationError(f'Eixos: use {", ".join(EIXOS)} com pontos inteiros não negativos.')
+    r['eixos'] = {eixo: pontos for eixo, pontos in eixos.items() if pontos}
+    return r
+
+
+# ----------------------------------------------------------------------
+# COMPILAÇÃO
+# ----------------------------------------------------------------------
+# As regras viram uma lista de critérios já resolvidos (faixas ordenadas,
+# conjuntos normalizados); critérios sem peso ficam de fora. O pontuador
+# também diz que dados extras do candidato as regras usam (`precisa`).
+
+def _distancia(vaga, latitude, longitude):
+    """Distância entre o município da vaga e o ponto do candidato (None se algum é desconhecido)."""
+    if vaga.modelo_trabalho == 'remoto' or vaga.municipio_id is None or latitude is None:
+        return None
+    return distancia_km(vaga.municipio.latitude, vaga.municipio.longitude, latitude, longitude)
+
+
+class Pontuador:
+    __slots__ = ('criterios', 'maximo', 'precisa')
+
+    def __init__(self, criterios, maximo, precisa):
+        self.criterios = criterios
+        self.maximo = maximo
+        self.precisa = precisa
+
+    def __call__(self, vaga, perfil):
+        return min(round(sum(criterio(vaga, perfil) for criterio in self.criterios)), self.maximo)
+
+
+def compilar(regras):
+    r = validar(regras)
+    criterios = []
+    precisa = set()
+
+    if r['modelo_trabalho']:
+        pontos_modelo = r['modelo_trabalho']
+        criterios.append(lambda vaga, p: pontos_modelo if p.modelo_trabalho == vaga.modelo_trabalho else 0)
+
+    # Localização: vaga remota serve a qualquer cidade; as demais pela distância
+    distancias = sorted(r['distancia'])
+    if r['remoto'] or any(pontos for _, pontos in distancias):
+        pontos_remoto = r['remoto']
+
+        def localizacao(vaga, p):
+            if vaga.modelo_trabalho == 'remoto':
+                return pontos_remoto
+            distancia = _distancia(vaga, p.municipio_latitude, p.municipio_longitude)
+            if distancia is not None:
+                for limite, pontos in distancias:
+                    if distancia <= limite:
+                        return pontos
+            return 0
+        criterios.append(localizacao)
+
+    if r['salario']:
+        pontos_salario = r['salario']
+        criterios.append(lambda vaga, p: pontos_salario if (
+            p.pretensao_salarial and vaga.salario_max and p.pretensao_salarial <= vaga.salario_max
+        ) else 0)
+
+    experiencias = sorted(r['experiencia'], reverse=True)
+    if any(pontos for _, pontos in experiencias):
+        def experiencia(vaga, p):
+            for limite, pontos in experiencias:
+                if p.total_experiencias >= limite:
+                    return pontos
+            return 0
+        criterios.append(experiencia)
+
+    if r['formacao_concluida'] or r['formacao_incompleta']:
+        concluida, incompleta = r['formacao_concluida'], r['formacao_incompleta']
+        criterios.append(lambda vaga, p: concluida if p.formacao_concluida else incompleta if p.tem_formacao else 0)
+
+    if r['competencias'] and r['pontos_competencia']:
+        exigidas, pontos_competencia = frozenset(r['competencias']), r['pontos_competencia']
+        criterios.append(lambda vaga, p: pontos_competencia * len(exigidas & p.competencias_normalizadas))
+        precisa.add('competencias')
+
+    if r['idiomas'] and r['pontos_idioma']:
+        minimos = {idioma: NIVEIS_IDIOMA.index(nivel) for idioma, nivel in r['idiomas'].items()}
+        pontos_idioma = r['pontos_idioma']
+        criterios.append(lambda vaga, p: pontos_idioma * sum(
+            1 for idioma, minimo in minimos.items() if p.niveis_idioma.get(idioma, -1) >= minimo
+        ))
+        precisa.add('idiomas')
+
+    if r['eixos']:
+        pesos = [(f'eixo_{eixo}', pontos / 100) for eixo, pontos in r['eixos'].items()]
+        criterios.append(lambda vaga, p: sum(peso * (getattr(p, campo) or 0) for campo, peso in pesos))
+
+    return Pontuador(tuple(criterios), r['maximo'], frozenset(precisa))
+
+
+_PADRAO = compilar({})
+
+
+def pontuador(vaga):
+    """Pontuador das regras atuais da vaga, compilado uma vez por versão."""
+    try:
+        regras = vaga.regras_pontuacao
+    except RegrasPontuacao.DoesNotExist:
+        return _PADRAO
+
+    chave = (vaga.pk, regras.versao)
+    compilado = _compilados.get(chave)
+    if compilado is None:
+        if len(_compilados) >= MAX_COMPILADOS:
+            _compilados.clear()
+        compilado = _compilados[chave] = compilar(regras.regras)
+    return compilado
+
+
+# ----------------------------------------------------------------------
+# PONTUAÇÃO
+# ----------------------------------------------------------------------
+
+def anotar_criterios(perfis):
+    """
+    Anota num queryset de PerfilCandidato o que as regras de match
+    consultariam por candidato, para pontuar muitos com uma única query.
+    """
+    formacoes = FormacaoAcademica.objects.filter(candidato=OuterRef('user'))
+    return perfis.annotate(
+        total_experiencias=Count('user__experiencias'),
+        formacao_concluida=Exists(formacoes.filter(status='concluido')),
+        tem_formacao=Exists(formacoes),
+        municipio_latitude=F('municipio__latitude'),
+        municipio_longitude=F('municipio__longitude'),
+        **{f'eixo_{eixo}': F(f'user__profile__{eixo}') for eixo in EIXOS},
+    )
+
+
+def carregar_extras(perfis, precisa):
+    """Competências e idiomas dos perfis, uma query por tipo e só se as regras usam."""
+    user_ids = [p.user_id for p in perfis]
+    if 'competencias' in precisa:
+        competencias = defaultdict(set)
+        for user_id, nome in Competencia.objects.filter(candidato_id__in=user_ids).values_list('candidato_id', 'nome'):
+            competencias[user_id].add(normalizar(nome))
+        for p in perfis:
+            p.competencias_normalizadas = competencias[p.user_id]
+    if 'idiomas' in precisa:
+        niveis = defaultdict(dict)
+        for user_id, idioma, nivel in Idioma.objects.filter(candidato_id__in=user_ids).values_list(
+            'candidato_id', 'idioma', 'nivel'
+        ):
+            atual = niveis[user_id]
+            idioma = normalizar(idioma)
+            atual[idioma] = max(atual.get(idioma, -1), NIVEIS_IDIOMA.index(nivel))
+        for p in perfis:
+            p.niveis_idioma = niveis[p.user_id]
+
+
+def pontuar_lote(vaga, perfis):
+    """Scores de uma lista de perfis vindos de anotar_criterios, na ordem."""
+    funcao = pontuador(vaga)
+    carregar_extras(perfis, funcao.precisa)
+    return [funcao(vaga, p) for p in perfis]
+
+
+def calcular_match_anotado(vaga, perfil):
+    return pontuar_lote(vaga, [perfil])[0]
+
+
 def calcular_match(vaga, candidato):
-    score = 0
-
-    # Modelo de trabalho
-    if candidato.modelo_trabalho == vaga.modelo_trabalho:
-        score += 20
-
-    # Pretensão salarial
-    if candidato.pretensao_salarial and vaga.salario_max:
-        if candidato.pretensao_salarial <= vaga.salario_max:
-            score += 20
-
-    # Experiência
-    total_exp = candidato.user.experiencias.count()
-    if total_exp >= 4:
-        score += 20
-    elif total_exp >= 2:
-        score += 12
-    elif total_exp >= 1:
-        score += 5
-
-    # Formação
-    if candidato.user.formacoes.filter(status='concluido').exists():
-        score += 15
-    elif candidato.user.formacoes.exists():
-        score += 8
-
-    return min(score, 100)
+    """Score de um PerfilCandidato para a vaga, lendo os critérios dele."""
+    perfil = anotar_criterios(PerfilCandidato.objects.filter(pk=candidato.pk)).first()
+    return calcular_match_anotado(vaga, perfil) if perfil else 0
+
+
+def calcular_match_usuario(vaga, user_id):
+    """Score do candidato (User) para a vaga; 0 se ele não tem currículo."""
+    perfil = anotar_criterios(PerfilCandidato.objects.filter(user_id=user_id)).first()
+    return calcular_match_anotado(vaga, perfil) if perfil else 0
+
+
+# ----------------------------------------------------------------------
+# REPONTUAÇÃO
+# ----------------------------------------------------------------------
+
+def repontuar_vaga(vaga, tamanho_lote=TAMANHO_LOTE):
+    """Recalcula o score das candidaturas da vaga em lotes. Retorna quantas."""
+    candidaturas = dict(vaga.candidaturas.values_list('candidato_id', 'id'))
+    perfis = anotar_criterios(
+        PerfilCandidato.objects.filter(user_id__in=vaga.candidaturas.values('candidato_id'))
+    ).order_by('pk')
+
+    total = 0
+    lote = []
+    for perfil in perfis.iterator(chunk_size=tamanho_lote):
+        lote.append(perfil)
+        if len(lote) >= tamanho_lote:
+            total += _gravar_scores(vaga, lote, candidaturas)
+            lote = []
+    if lote:
+        total += _gravar_scores(vaga, lote, candidaturas)
+    return total
+
+
+def _gravar_scores(vaga, perfis, candidaturas):
+    atualizadas = [
+        Candidatura(id=candidaturas[p.user_id], score=score)
+        for p, score in zip(perfis, pontuar_lote(vaga, perfis))
+        if p.user_id in candidaturas
+    ]
+    Candidatura.objects.bulk_update(atualizadas, ['score'], batch_size=TAMANHO_LOTE)
+    return len(atualizadas)
+
+
+def processar_pendentes(tamanho_lote=TAMANHO_LOTE):
+    """
+    Repontua as vagas cujas regras mudaram desde a última execução. Retorna
+    o número de candidaturas repontuadas. Uma regra alterada no meio do
+    trabalho continua pendente e é refeita na próxima rodada.
+    """
+    total = 0
+    for regras in RegrasPontuacao.objects.filter(versao_aplicada__lt=F('versao')).select_related('vaga'):
+        vaga = regras.vaga
+        vaga.regras_pontuacao = regras
+        total += repontuar_vaga(vaga, tamanho_lote)
+        RegrasPontuacao.objects.filter(pk=regras.pk, versao_aplicada__lt=regras.versao) \
+            .update(versao_aplicada=regras.versao)
+    return total
+
+
+def salvar_regras(vaga, regras):
+    """Grava as regras da vaga com nova versão; a repontuação fica pendente."""
+    regras = validar(regras)
+    atual, criada = RegrasPontuacao.objects.get_or_create(vaga=vaga, defaults={'regras': regras})
+    if not criada:
+        RegrasPontuacao.objects.filter(pk=atual.pk).update(
+            regras=regras, versao=F('versao') + 1, atualizada_em=timezone.now()
+        )
+        atual.refresh_from_db()
+    vaga.regras_pontuacao = atual
+    return atual
@@ -0,0 +1,223 @@
+# core/services/notificacao_service.py
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F, Max, Q
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import PerfilCandidato, Vaga, DisparoVaga, NotificacaoVaga
+from .match_service import anotar_criterios, pontuar_lote
+from .busca_salva_service import percolar
+
+TAMANHO_LOTE = 100
+
+# Validade da reserva de um disparo, renovada a cada lote distribuído
+RESERVA = timedelta(minutes=10)
+
+
+def score_minimo():
+    return getattr(settings, 'NOTIFICACAO_SCORE_MINIMO', 40)
+
+
+def intervalo_minimo():
+    return timedelta(hours=getattr(settings, 'NOTIFICACAO_INTERVALO_HORAS', 24))
+
+
+def max_vagas_por_email():
+    return getattr(settings, 'NOTIFICACAO_MAX_VAGAS_POR_EMAIL', 10)
+
+
+# ----------------------------------------------------------------------
+# FILA
+# ----------------------------------------------------------------------
+
+def enfileirar(vagas):
+    """Agenda a distribuição das vagas ativas para o banco de talentos."""
+    DisparoVaga.objects.bulk_create(
+        [DisparoVaga(vaga=vaga) for vaga in vagas if vaga.ativa],
+        ignore_conflicts=True,
+    )
+
+
+def _reservar_disparo(agora):
+    """
+    Reserva o disparo pendente mais antigo que ninguém esteja processando
+    (ou cuja reserva venceu, de um worker que caiu) com uma UPDATE
+    condicional: vários workers drenam a fila sem pegar o mesmo disparo.
+    """
+    livres = DisparoVaga.objects.filter(processado_em__isnull=True) \
+        .filter(Q(reservado_ate__isnull=True) | Q(reservado_ate__lt=agora))
+    for disparo in livres.order_by('criado_em')[:10]:
+        if livres.filter(pk=disparo.pk).update(reservado_ate=agora + RESERVA):
+            disparo.reservado_ate = agora + RESERVA
+            return disparo
+    return None
+
+
+# ----------------------------------------------------------------------
+# SELEÇÃO DOS CANDIDATOS
+# ----------------------------------------------------------------------
+
+def distribuir_vaga(vaga, disparo, tamanho_lote=1000):
+    """
+    Cria as notificações pendentes da vaga para os donos das buscas salvas
+    que ela satisfaz e para os candidatos do banco de talentos com score de
+    match acima do mínimo. Cada lote é uma transação curta (no SQLite a
+    trava de escrita não fica presa pela varredura toda) que grava também
+    até onde o `disparo` chegou, para a retomada. Retorna quantas criou.
+    """
+    total = 0
+    if not disparo.ultimo_candidato_id:
+        # Buscas salvas primeiro, para a notificação registrar a busca de origem
+        por_busca = {}
+        for busca in percolar(vaga):
+            por_busca.setdefault(busca.candidato_id, busca)
+        NotificacaoVaga.objects.bulk_create([
+            NotificacaoVaga(vaga=vaga, candidato_id=candidato_id, busca=busca)
+            for candidato_id, busca in por_busca.items()
+        ], ignore_conflicts=True)
+        total = len(por_busca)
+
+    banco_de_talentos = anotar_criterios(PerfilCandidato.objects.filter(
+        user__profile__tipo='candidato',
+        user__profile__disponivel_para_alocacao=True,
+    )).order_by('user_id')
+    minimo = score_minimo()
+
+    while True:
+        perfis = list(banco_de_talentos.filter(user_id__gt=disparo.ultimo_candidato_id)[:tamanho_lote])
+        if not perfis:
+            return total
+        with transaction.atomic():
+            total += _notificar_compativeis(vaga, perfis, minimo)
+            disparo.ultimo_candidato_id = perfis[-1].user_id
+            disparo.reservado_ate = timezone.now() + RESERVA
+            disparo.save(update_fields=['ultimo_candidato_id', 'reservado_ate'])
+
+
+def _notificar_compativeis(vaga, perfis, minimo):
+    # Pontuados em lote com as regras da vaga (competências e idiomas numa query só)
+    lote = [
+        NotificacaoVaga(vaga=vaga, candidato_id=perfil.user_id, score=score)
+        for perfil, score in zip(perfis, pontuar_lote(vaga, perfis))
+        if score >= minimo
+    ]
+    NotificacaoVaga.objects.bulk_create(lote, ignore_conflicts=True)
+    return len(lote)
+
+
+def processar_disparos():
+    """
+    Esvazia a fila de disparos. Um disparo só é dado como processado depois
+    do último lote; se o worker cair no meio, outro retoma de onde parou
+    quando a reserva vencer. Retorna as notificações criadas.
+    """
+    total = 0
+    while True:
+        disparo = _reservar_disparo(timezone.now())
+        if disparo is None:
+            return total
+        vaga = Vaga.objects.get(pk=disparo.vaga_id)
+        if vaga.ativa:
+            total += distribuir_vaga(vaga, disparo)
+        disparo.processado_em = timezone.now()
+        disparo.reservado_ate = None
+        disparo.save(update_fields=['processado_em', 'reservado_ate'])
+
+
+# ----------------------------------------------------------------------
+# ENVIO
+# ----------------------------------------------------------------------
+
+def _montar_email(user, notificacoes):
+    """Um único e-mail por candidato com as vagas acumuladas (melhores primeiro)."""
+    base = getattr(settings, 'SITE_URL', 'http://127.0.0.1:8000').rstrip('/')
+    limite = max_vagas_por_email()
+    vagas = [
+        {'vaga': n.vaga, 'score': n.score, 'busca': n.busca,
+         'url': base + reverse('vaga_detail', args=[n.vaga_id])}
+        for n in notificacoes[:limite]
+    ]
+    if len(notificacoes) == 1:
+        assunto = f'Nova vaga compatível com seu perfil: {notificacoes[0].vaga.titulo}'
+    else:
+        assunto = f'{len(notificacoes)} novas vagas compatíveis com seu perfil'
+
+    corpo = render_to_string('emails/vagas_compativeis.txt', {
+        'nome': user.first_name or user.username,
+        'vagas': vagas,
+        'restantes': len(notificacoes) - len(vagas),
+        'url_vagas': base + reverse('vaga_list'),
+        'url_perfil': base + reverse('candidate_profile'),
+        'url_alertas': base + reverse('candidate_saved_searches'),
+    })
+    # Quem só tem busca salva pode não ter currículo preenchido
+    perfil = getattr(user, 'perfilcandidato', None)
+    return EmailMessage(assunto, corpo, to=[getattr(perfil, 'email_contato', '') or user.email])
+
+
+def enviar_pendentes(tamanho_lote=TAMANHO_LOTE, limite=None, agora=None):
+    """
+    Envia as notificações pendentes agrupadas por candidato, em lotes sobre
+    uma única conexão SMTP. Quem recebeu e-mail há menos de
+    NOTIFICACAO_INTERVALO_HORAS fica para depois, acumulando as vagas num
+    resumo. Retorna o número de e-mails enviados.
+    """
+    agora = agora or timezone.now()
+    corte = agora - intervalo_minimo()
+
+    # Vagas que saíram do ar não são mais anunciadas
+    NotificacaoVaga.objects.filter(enviada_em__isnull=True, vaga__ativa=False).delete()
+    pendentes = NotificacaoVaga.objects.filter(enviada_em__isnull=True)
+
+    enviados = 0
+    ultimo_candidato = 0
+    with get_connection() as conexao:
+        while limite is None or enviados < limite:
+            tamanho = tamanho_lote if limite is None else min(tamanho_lote, limite - enviados)
+            candidatos = list(
+                pendentes.filter(candidato_id__gt=ultimo_candidato)
+                .values_list('candidato_id', flat=True)
+                .distinct().order_by('candidato_id')[:tamanho]
+            )
+            if not candidatos:
+                break
+            ultimo_candidato = candidatos[-1]
+
+            ultimos_envios = dict(
+                NotificacaoVaga.objects
+                .filter(candidato_id__in=candidatos, enviada_em__isnull=False)
+                .values('candidato_id').annotate(ultimo=Max('enviada_em'))
+                .values_list('candidato_id', 'ultimo')
+            )
+            liberados = [c for c in candidatos if ultimos_envios.get(c, corte) <= corte]
+            if not liberados:
+                continue
+
+            por_candidato = {}
+            for notificacao in (
+                pendentes.filter(candidato_id__in=liberados)
+                .select_related('vaga', 'busca')
+                # Vagas de buscas salvas primeiro, depois as de maior match
+                .order_by('candidato_id', F('busca_id').asc(nulls_last=True), '-score', '-criada_em')
+            ):
+                por_candidato.setdefault(notificacao.candidato_id, []).append(notificacao)
+            usuarios = User.objects.select_related('perfilcandidato').in_bulk(list(por_candidato))
+
+            mensagens, ids = [], []
+            for candidato_id, notificacoes in por_candidato.items():
+                mensagens.append(_montar_email(usuarios[candidato_id], notificacoes))
+                ids.extend(n.id for n in notificacoes)
+
+            # Só marca como enviadas depois do lote aceito pelo servidor
+            conexao.send_messages(mensagens)
+            NotificacaoVaga.objects.filter(id__in=ids).update(enviada_em=agora)
+            enviados += len(mensagens)
+
+    return enviados
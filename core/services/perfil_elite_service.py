@@ -0,0 +1,84 @@
+# core/services/perfil_elite_service.py
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import Profile, DistribuicaoEixo
+
+EIXOS = ('execucao', 'analise', 'influencia', 'estrategia', 'resiliencia')
+
+NOTA_MAXIMA = 100
+
+
+def _ajustar_distribuicao(notas, delta):
+    """Soma `delta` ao balde da nota de cada eixo (criando o balde se preciso)."""
+    DistribuicaoEixo.objects.bulk_create(
+        [DistribuicaoEixo(eixo=eixo, valor=valor) for eixo, valor in notas.items()],
+        ignore_conflicts=True,
+    )
+    for eixo, valor in notas.items():
+        DistribuicaoEixo.objects.filter(eixo=eixo, valor=valor).update(total=F('total') + delta)
+
+
+@transaction.atomic
+def registrar_resultado(profile, notas):
+    """
+    Grava as notas do teste (dict eixo -> 0..100) no Profile e atualiza o
+    histograma de cada eixo. Refazer o teste tira as notas antigas da
+    distribuição antes de incluir as novas.
+    """
+    # Relê com lock para que dois envios simultâneos não contem a nota antiga duas vezes
+    atual = Profile.objects.select_for_update().get(pk=profile.pk)
+    anteriores = atual.resultado_teste_perfil
+    if anteriores:
+        _ajustar_distribuicao(anteriores, -1)
+    _ajustar_distribuicao(notas, +1)
+
+    for eixo in EIXOS:
+        setattr(profile, eixo, notas[eixo])
+    profile.is_elite = True
+    # Concluir o teste é a entrada no Banco de Talentos TrabalheJá
+    profile.disponivel_para_alocacao = True
+    profile.teste_perfil_em = timezone.now()
+    profile.save(update_fields=list(EIXOS) + ['is_elite', 'disponivel_para_alocacao', 'teste_perfil_em'])
+
+
+def percentis(notas):
+    """
+    Percentil de cada nota entre todos os candidatos que fizeram o teste:
+    parcela abaixo + metade dos empates. Lê no máximo 101 baldes por eixo,
+    qualquer que seja o número de candidatos.
+    """
+    baldes = {eixo: [] for eixo in EIXOS}
+    for eixo, valor, total in (
+        DistribuicaoEixo.objects.filter(eixo__in=EIXOS, total__gt=0)
+        .values_list('eixo', 'valor', 'total')
+    ):
+        baldes[eixo].append((valor, total))
+
+    resultado = {}
+    for eixo in EIXOS:
+        nota = notas.get(eixo)
+        total = sum(t for _, t in baldes[eixo])
+        if nota is None or not total:
+            resultado[eixo] = None
+            continue
+        abaixo = sum(t for v, t in baldes[eixo] if v < nota)
+        empates = sum(t for v, t in baldes[eixo] if v == nota)
+        resultado[eixo] = round(100 * (abaixo + empates / 2) / total)
+    return resultado
+
+
+def filtrar_talentos(minimos):
+    """
+    Banco de talentos do Grupo Elite com nota mínima por eixo. Cada critério
+    usa o índice (is_elite, eixo) do Profile.
+    """
+    talentos = Profile.objects.filter(
+        tipo='candidato', is_elite=True, disponivel_para_alocacao=True,
+    )
+    for eixo, minimo in minimos.items():
+        if minimo:
+            talentos = talentos.filter(**{f'{eixo}__gte': minimo})
+    return talentos
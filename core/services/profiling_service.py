@@ -0,0 +1,130 @@
+# core/services/profiling_service.py
+
+import threading
+from collections import defaultdict
+
+# Buckets no formato Prometheus (limites superiores, inclusivos)
+LATENCIA_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERIES_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class Histograma:
+    __slots__ = ('limites', 'contagens', 'soma', 'total')
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * len(limites)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.soma += valor
+        self.total += 1
+        for i, limite in enumerate(self.limites):
+            if valor <= limite:
+                self.contagens[i] += 1
+                break
+
+
+class _MetricasView:
+    __slots__ = ('latencia', 'queries', 'tempo_sql', 'tempo_template',
+                 'cache_hits', 'cache_misses', 'lentas')
+
+    def __init__(self):
+        self.latencia = Histograma(LATENCIA_BUCKETS)
+        self.queries = Histograma(QUERIES_BUCKETS)
+        self.tempo_sql = 0.0
+        self.tempo_template = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.lentas = 0
+
+
+# Agregado por processo: cada worker do gunicorn expõe o seu próprio conjunto.
+_lock = threading.Lock()
+_por_view = defaultdict(_MetricasView)
+# Decisões do limite de taxa (core.services.limite_service) por (rota, escopo, resultado)
+_limites = defaultdict(int)
+
+
+def registrar(view, latencia, queries, tempo_sql, tempo_template,
+              cache_hits, cache_misses, lenta=False):
+    with _lock:
+        m = _por_view[view]
+        m.latencia.observar(latencia)
+        m.queries.observar(queries)
+        m.tempo_sql += tempo_sql
+        m.tempo_template += tempo_template
+        m.cache_hits += cache_hits
+        m.cache_misses += cache_misses
+        if lenta:
+            m.lentas += 1
+
+
+def registrar_limite(rota, escopo, bloqueada):
+    with _lock:
+        _limites[(rota, escopo, 'bloqueada' if bloqueada else 'liberada')] += 1
+
+
+def limpar():
+    with _lock:
+        _por_view.clear()
+        _limites.clear()
+
+
+def _label(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _linhas_histograma(nome, view, hist):
+    acumulado = 0
+    for limite, contagem in zip(hist.limites, hist.contagens):
+        acumulado += contagem
+        yield f'{nome}_bucket{{view="{view}",le="{limite}"}} {acumulado}'
+    yield f'{nome}_bucket{{view="{view}",le="+Inf"}} {hist.total}'
+    yield f'{nome}_sum{{view="{view}"}} {hist.soma}'
+    yield f'{nome}_count{{view="{view}"}} {hist.total}'
+
+
+def exportar_prometheus():
+    """Serializa as métricas agregadas no formato texto do Prometheus."""
+    with _lock:
+        itens = sorted(_por_view.items())
+
+        linhas = [
+            '# HELP trabalheja_request_latency_seconds Latência total da requisição.',
+            '# TYPE trabalheja_request_latency_seconds histogram',
+        ]
+        for view, m in itens:
+            linhas.extend(_linhas_histograma('trabalheja_request_latency_seconds', _label(view), m.latencia))
+
+        linhas += [
+            '# HELP trabalheja_request_queries Número de queries SQL por requisição.',
+            '# TYPE trabalheja_request_queries histogram',
+        ]
+        for view, m in itens:
+            linhas.extend(_linhas_histograma('trabalheja_request_queries', _label(view), m.queries))
+
+        contadores = (
+            ('trabalheja_sql_seconds_total', 'Tempo acumulado em SQL.', 'tempo_sql'),
+            ('trabalheja_template_seconds_total', 'Tempo acumulado renderizando templates.', 'tempo_template'),
+            ('trabalheja_cache_hits_total', 'Leituras de cache com sucesso.', 'cache_hits'),
+            ('trabalheja_cache_misses_total', 'Leituras de cache sem valor.', 'cache_misses'),
+            ('trabalheja_slow_requests_total', 'Requisições acima dos limites configurados.', 'lentas'),
+        )
+        for nome, ajuda, atributo in contadores:
+            linhas.append(f'# HELP {nome} {ajuda}')
+            linhas.append(f'# TYPE {nome} counter')
+            for view, m in itens:
+                linhas.append(f'{nome}{{view="{_label(view)}"}} {getattr(m, atributo)}')
+
+        linhas += [
+            '# HELP trabalheja_rate_limit_total Requisições avaliadas pelo limite de taxa.',
+            '# TYPE trabalheja_rate_limit_total counter',
+        ]
+        for (rota, escopo, resultado), total in sorted(_limites.items()):
+            linhas.append(
+                f'trabalheja_rate_limit_total{{rota="{_label(rota)}",escopo="{escopo}",resultado="{resultado}"}} {total}'
+            )
+
+    return '\n'.join(linhas) + '\n'
@@ -0,0 +1,222 @@
+# core/services/salario_service.py
+
+import math
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+
+from ..models import Vaga, PerfilCandidato, DistribuicaoSalario
+from .busca_salva_service import termos
+from .localizacao_service import uf_do_municipio
+
+# Baldes logarítmicos: o balde b cobre [BASE * FATOR^b, BASE * FATOR^(b+1)),
+# então qualquer quantil sai com erro relativo de no máximo ~2%
+SALARIO_BASE = 100
+FATOR = 1.04
+
+# Abaixo disso o recorte é alargado (sem contrato, sem modelo, sem UF)
+AMOSTRA_MINIMA = 5
+
+CAMPOS_CHAVE = ('titulo', 'origem', 'estado', 'modelo_trabalho', 'tipo_contrato', 'balde')
+
+TAMANHO_LOTE = 2000
+
+
+def _pedacos(lista, tamanho=200):
+    for i in range(0, len(lista), tamanho):
+        yield lista[i:i + tamanho]
+
+
+def titulo_normalizado(titulo):
+    """Termos do título em ordem alfabética: "Python Dev. Sênior" -> "dev python senior"."""
+    return ' '.join(sorted(termos(titulo)))[:150]
+
+
+def balde(valor):
+    return math.floor(math.log(float(valor) / SALARIO_BASE, FATOR))
+
+
+def valor_do_balde(b):
+    """Centro geométrico do balde."""
+    return SALARIO_BASE * FATOR ** (b + 0.5)
+
+
+# ----------------------------------------------------------------------
+# CONTRIBUIÇÕES
+# ----------------------------------------------------------------------
+# Uma vaga ou perfil soma 1 em um único balde (a sua "contribuição"); salvar
+# tira a contribuição antiga e soma a nova.
+
+def _contribuicao(origem, titulo, estado, modelo_trabalho, tipo_contrato, valor):
+    titulo = titulo_normalizado(titulo)
+    if not titulo or not valor or valor < SALARIO_BASE:
+        return None
+    return (titulo, origem, estado or '', modelo_trabalho or '', tipo_contrato or '', balde(valor))
+
+
+def _salario_da_vaga(salario_min, salario_max):
+    """Meio da faixa oferecida (ou o único valor informado)."""
+    valores = [v for v in (salario_min, salario_max) if v]
+    return sum(valores) / len(valores) if valores else None
+
+
+def contribuicao_vaga(titulo, municipio_id, modelo_trabalho, tipo_contrato, salario_min, salario_max):
+    return _contribuicao(
+        'vaga', titulo, uf_do_municipio(municipio_id), modelo_trabalho, tipo_contrato,
+        _salario_da_vaga(salario_min, salario_max),
+    )
+
+
+def contribuicao_candidato(titulo_profissional, estado, modelo_trabalho, pretensao_salarial):
+    return _contribuicao('candidato', titulo_profissional, estado, modelo_trabalho, '', pretensao_salarial)
+
+
+CAMPOS_VAGA = ('titulo', 'municipio_id', 'modelo_trabalho', 'tipo_contrato', 'salario_min', 'salario_max')
+CAMPOS_CANDIDATO = ('titulo_profissional', 'estado', 'modelo_trabalho', 'pretensao_salarial')
+
+
+def contribuicao_da_instancia(obj):
+    if isinstance(obj, Vaga):
+        return contribuicao_vaga(*(getattr(obj, campo) for campo in CAMPOS_VAGA))
+    return contribuicao_candidato(*(getattr(obj, campo) for campo in CAMPOS_CANDIDATO))
+
+
+def contribuicao_gravada(modelo, pk):
+    """Contribuição da linha como está no banco (antes de um save)."""
+    if modelo is Vaga:
+        valores = Vaga.objects.filter(pk=pk).values_list(*CAMPOS_VAGA).first()
+        return contribuicao_vaga(*valores) if valores else None
+    valores = PerfilCandidato.objects.filter(pk=pk).values_list(*CAMPOS_CANDIDATO).first()
+    return contribuicao_candidato(*valores) if valores else None
+
+
+def ajustar(deltas):
+    """Aplica um Counter {contribuição: delta} ao histograma (uma query por 200 baldes)."""
+    deltas = [(chave, delta) for chave, delta in deltas.items() if chave and delta]
+    if not deltas:
+        return
+    with transaction.atomic():
+        DistribuicaoSalario.objects.bulk_create(
+            [DistribuicaoSalario(**dict(zip(CAMPOS_CHAVE, chave))) for chave, _ in deltas],
+            ignore_conflicts=True,
+        )
+        for lote in _pedacos(deltas):
+            condicoes = [(Q(**dict(zip(CAMPOS_CHAVE, chave))), delta) for chave, delta in lote]
+            DistribuicaoSalario.objects.filter(reduce(or_, (q for q, _ in condicoes))).update(
+                total=F('total') + Case(*(When(q, then=Value(d)) for q, d in condicoes), default=Value(0))
+            )
+
+
+def trocar(anterior, nova):
+    """Move a contribuição de uma vaga ou perfil salvo (None = não contribuía / não contribui)."""
+    if anterior != nova:
+        ajustar({anterior: -1, nova: 1})
+
+
+def registrar_lote(objetos):
+    """Soma as contribuições de vagas ou perfis recém-criados em lote."""
+    ajustar(Counter(contribuicao_da_instancia(obj) for obj in objetos))
+
+
+# ----------------------------------------------------------------------
+# CONSULTA
+# ----------------------------------------------------------------------
+
+def _quantis(baldes):
+    """p25, mediana e p75 de um Counter {balde: total}."""
+    total = sum(baldes.values())
+    resultado = []
+    acumulado = 0
+    pendentes = [0.25, 0.5, 0.75]
+    for b in sorted(baldes):
+        acumulado += baldes[b]
+        while pendentes and acumulado >= pendentes[0] * total:
+            resultado.append(round(valor_do_balde(b), -1))
+            pendentes.pop(0)
+    return resultado
+
+
+def _estatisticas(linhas, filtros):
+    """Recorte mais específico (dos `filtros`, nessa ordem de descarte) com amostra suficiente."""
+    for usados in range(len(filtros), -1, -1):
+        recorte = dict(filtros[:usados])
+        baldes = Counter()
+        for estado, modelo, tipo, b, total in linhas:
+            atual = {'estado': estado, 'modelo_trabalho': modelo, 'tipo_contrato': tipo}
+            if all(atual[campo] == valor for campo, valor in recorte.items()):
+                baldes[b] += total
+        amostra = sum(baldes.values())
+        if amostra >= AMOSTRA_MINIMA:
+            p25, mediana, p75 = _quantis(baldes)
+            return {
+                'p25': p25, 'mediana': mediana, 'p75': p75,
+                'amostra': amostra, 'recorte': recorte,
+            }
+    return None
+
+
+def estatisticas(titulo, estado='', modelo_trabalho='', tipo_contrato=''):
+    """
+    Quartis dos salários oferecidos (vagas) e das pretensões (candidatos)
+    para o título, no recorte mais específico com ao menos AMOSTRA_MINIMA
+    registros. Uma query sobre os baldes do título, qualquer que seja o
+    tamanho das tabelas. Retorna {'vaga': ..., 'candidato': ...} (None
+    quando não há amostra).
+    """
+    titulo = titulo_normalizado(titulo)
+    if not titulo:
+        return {'vaga': None, 'candidato': None}
+
+    linhas = {'vaga': [], 'candidato': []}
+    for origem, *linha in (
+        DistribuicaoSalario.objects.filter(titulo=titulo, total__gt=0)
+        .values_list('origem', 'estado', 'modelo_trabalho', 'tipo_contrato', 'balde', 'total')
+    ):
+        linhas[origem].append(linha)
+
+    # Ordem de descarte: o que menos pesa no salário sai primeiro
+    filtros = [(campo, valor) for campo, valor in (
+        ('estado', estado), ('modelo_trabalho', modelo_trabalho), ('tipo_contrato', tipo_contrato),
+    ) if valor]
+    return {
+        'vaga': _estatisticas(linhas['vaga'], filtros),
+        # Pretensão não tem tipo de contrato
+        'candidato': _estatisticas(linhas['candidato'], [f for f in filtros if f[0] != 'tipo_contrato']),
+    }
+
+
+# ----------------------------------------------------------------------
+# RECONSTRUÇÃO
+# ----------------------------------------------------------------------
+
+def _contribuicoes(modelo, campos, contribuicao, tamanho_lote):
+    ultimo = 0
+    while True:
+        lote = list(
+            modelo.objects.filter(pk__gt=ultimo).order_by('pk')
+            .values_list('pk', *campos)[:tamanho_lote]
+        )
+        if not lote:
+            return
+        ultimo = lote[-1][0]
+        for _, *valores in lote:
+            yield contribuicao(*valores)
+
+
+def reconstruir(tamanho_lote=TAMANHO_LOTE):
+    """Refaz o histograma lendo vagas e perfis em lotes. Retorna o número de baldes."""
+    contagem = Counter()
+    contagem.update(_contribuicoes(Vaga, CAMPOS_VAGA, contribuicao_vaga, tamanho_lote))
+    contagem.update(_contribuicoes(PerfilCandidato, CAMPOS_CANDIDATO, contribuicao_candidato, tamanho_lote))
+    del contagem[None]
+
+    with transaction.atomic():
+        DistribuicaoSalario.objects.all().delete()
+        DistribuicaoSalario.objects.bulk_create(
+            [DistribuicaoSalario(total=total, **dict(zip(CAMPOS_CHAVE, chave))) for chave, total in contagem.items()],
+            batch_size=1000,
+        )
+    return len(contagem)
@@ -0,0 +1,339 @@
+# core/services/vagas_similares_service.py
+
+import os
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from ..models import Vaga, VagaSimilar, VagaSimilarPendente
+from . import similaridade_service
+from .busca_salva_service import termos
+from .similaridade_service import np, termo_composto, slots_idf, calcular_idf, vetor, SLOTS_IDF
+
+# Guardados por vaga: sobram alguns para cobrir vizinhos encerrados até a
+# próxima atualização sem deixar o painel (EXIBIDOS) incompleto.
+VIZINHOS = 10
+EXIBIDOS = 6
+
+DIMENSOES = 256
+
+PESO_TITULO = 3
+PESO_REQUISITOS = 1
+PESO_DEPARTAMENTO = 2
+PESO_MODELO = 1
+
+# Parcela do score que vem da sobreposição das faixas salariais
+PESO_SALARIO = 0.15
+
+# Linhas da matriz de scores calculadas de uma vez (256 x vagas ativas float32)
+TAMANHO_BLOCO = 256
+TAMANHO_LOTE = 2000
+
+
+def disponivel():
+    return similaridade_service.disponivel()
+
+
+def _pedacos(lista, tamanho=500):
+    for i in range(0, len(lista), tamanho):
+        yield lista[i:i + tamanho]
+
+
+# ----------------------------------------------------------------------
+# FILA
+# ----------------------------------------------------------------------
+
+def marcar_pendentes(vaga_ids):
+    """Agenda o recálculo das listas afetadas por vagas criadas, alteradas ou excluídas."""
+    for ids in _pedacos(list(vaga_ids)):
+        # Remarcar atualiza criado_em, para não se perder uma alteração feita
+        # durante um processamento que já tinha lido a marca anterior
+        VagaSimilarPendente.objects.bulk_create(
+            [VagaSimilarPendente(vaga_id=vaga_id) for vaga_id in ids],
+            update_conflicts=True, unique_fields=['vaga_id'], update_fields=['criado_em'],
+        )
+
+
+# ----------------------------------------------------------------------
+# VETORES
+# ----------------------------------------------------------------------
+
+def termos_da_vaga(titulo, requisitos, departamento, modelo_trabalho):
+    pesos = Counter()
+    for t in termos(titulo):
+        pesos[t] += PESO_TITULO
+    for t in termos(requisitos):
+        pesos[t] += PESO_REQUISITOS
+    if departamento:
+        pesos['d:' + termo_composto(departamento)] += PESO_DEPARTAMENTO
+    if modelo_trabalho:
+        pesos['m:' + modelo_trabalho] += PESO_MODELO
+    return pesos
+
+
+def _faixa(salario_min, salario_max):
+    """Faixa salarial (mín, máx) em float; NaN quando a vaga não informa salário."""
+    minimo = salario_min if salario_min is not None else salario_max
+    maximo = salario_max if salario_max is not None else salario_min
+    if minimo is None:
+        return (np.nan, np.nan)
+    return (float(min(minimo, maximo)), float(max(minimo, maximo)))
+
+
+def _documentos(vagas):
+    """(id, pesos, faixa salarial) das vagas do queryset."""
+    for vaga_id, titulo, requisitos, departamento, modelo, salario_min, salario_max in vagas.values_list(
+        'id', 'titulo', 'requisitos_obrigatorios', 'departamento',
+        'modelo_trabalho', 'salario_min', 'salario_max',
+    ):
+        yield vaga_id, termos_da_vaga(titulo, requisitos, departamento, modelo), _faixa(salario_min, salario_max)
+
+
+def _carregar(tamanho_lote=TAMANHO_LOTE):
+    """Ids, vetores (TF-IDF), faixas salariais e IDF de todas as vagas ativas."""
+    ids, pesos, faixas = [], [], []
+    ultimo = 0
+    while True:
+        lote = list(_documentos(Vaga.objects.filter(ativa=True, id__gt=ultimo).order_by('id')[:tamanho_lote]))
+        if not lote:
+            break
+        ultimo = lote[-1][0]
+        for vaga_id, p, faixa in lote:
+            ids.append(vaga_id)
+            pesos.append(p)
+            faixas.append(faixa)
+
+    df = np.zeros(SLOTS_IDF, dtype=np.int64)
+    for p in pesos:
+        df[slots_idf(p)] += 1
+    idf = calcular_idf(df, len(pesos))
+
+    vetores = np.zeros((len(ids), DIMENSOES), dtype=np.float32)
+    for i, p in enumerate(pesos):
+        vetores[i] = vetor(p, idf, DIMENSOES)
+    return (
+        np.array(ids, dtype=np.int64),
+        vetores,
+        np.array(faixas, dtype=np.float32).reshape(-1, 2),
+        idf,
+    )
+
+
+# ----------------------------------------------------------------------
+# MATRIZ GRAVADA
+# ----------------------------------------------------------------------
+# A reconstrução grava ids, vetores, faixas e o IDF usado; a atualização
+# incremental parte deles e só vetoriza as vagas pendentes, com o mesmo
+# IDF (que fica fixo até a próxima reconstrução).
+
+def _arquivo():
+    return Path(getattr(settings, 'VAGAS_SIMILARES_DIR', settings.BASE_DIR / 'indices' / 'vagas')) / 'matriz.npz'
+
+
+def _gravar_matriz(ids, vetores, faixas, idf):
+    arquivo = _arquivo()
+    arquivo.parent.mkdir(parents=True, exist_ok=True)
+    temporario = arquivo.with_suffix('.tmp.npz')
+    np.savez(temporario, ids=ids, vetores=vetores, faixas=faixas, idf=idf)
+    os.replace(temporario, arquivo)
+
+
+def _ler_matriz():
+    try:
+        with np.load(_arquivo()) as matriz:
+            return matriz['ids'], matriz['vetores'], matriz['faixas'], matriz['idf']
+    except FileNotFoundError:
+        return None
+
+
+def _atualizar_matriz(pendentes):
+    """
+    Matriz gravada com as linhas das vagas pendentes trocadas pelas atuais
+    (vagas encerradas ou excluídas saem). Sem matriz gravada, carrega tudo.
+    """
+    matriz = _ler_matriz()
+    if matriz is None:
+        return _carregar()
+    ids, vetores, faixas, idf = matriz
+
+    novas = []
+    for lote in _pedacos(pendentes):
+        novas.extend(_documentos(Vaga.objects.filter(ativa=True, id__in=lote)))
+    manter = ~np.isin(ids, pendentes)
+    return (
+        np.concatenate([ids[manter], np.array([v for v, _, _ in novas], dtype=np.int64)]),
+        np.concatenate([vetores[manter], np.array(
+            [vetor(p, idf, DIMENSOES) for _, p, _ in novas], dtype=np.float32,
+        ).reshape(-1, DIMENSOES)]),
+        np.concatenate([faixas[manter], np.array([f for _, _, f in novas], dtype=np.float32).reshape(-1, 2)]),
+        idf,
+    )
+
+
+# ----------------------------------------------------------------------
+# VIZINHOS
+# ----------------------------------------------------------------------
+
+def _scores(linhas, vetores, faixas):
+    """
+    Similaridade das vagas `linhas` com todas as vagas: cosseno dos textos
+    mais a sobreposição das faixas salariais (interseção / união).
+    """
+    texto = vetores[linhas] @ vetores.T
+
+    minimo, maximo = faixas[linhas, :1], faixas[linhas, 1:]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        intersecao = np.minimum(maximo, faixas[:, 1]) - np.maximum(minimo, faixas[:, 0])
+        uniao = np.maximum(maximo, faixas[:, 1]) - np.minimum(minimo, faixas[:, 0])
+        # Faixas de valor único só se sobrepõem quando iguais; sem salário (NaN) soma zero
+        salario = np.where(uniao > 0, np.clip(intersecao, 0, None) / uniao, intersecao >= 0)
+
+    scores = (1 - PESO_SALARIO) * texto + np.float32(PESO_SALARIO) * salario.astype(np.float32)
+    scores[np.arange(len(linhas)), linhas] = -np.inf
+    return scores
+
+
+def _melhores(scores, k=VIZINHOS):
+    """Colunas e scores dos k maiores de cada linha, em ordem decrescente."""
+    k = min(k, scores.shape[1] - 1)
+    if k <= 0:
+        vazio = np.zeros((scores.shape[0], 0))
+        return vazio.astype(np.int64), vazio
+    colunas = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    valores = np.take_along_axis(scores, colunas, axis=1)
+    ordem = np.argsort(-valores, axis=1)
+    return np.take_along_axis(colunas, ordem, axis=1), np.take_along_axis(valores, ordem, axis=1)
+
+
+def _listas(ids, linhas, colunas, valores):
+    return [
+        VagaSimilar(vaga_id=int(ids[linha]), similar_id=int(ids[coluna]), score=float(score))
+        for linha, cols, vals in zip(linhas, colunas, valores)
+        for coluna, score in zip(cols, vals)
+        if score > 0
+    ]
+
+
+# Matriz do processo de trabalho, carregada (mapeada) uma vez por pasta
+_matriz = {}
+
+
+def _vizinhos_do_bloco(pasta, inicio, fim):
+    """Tarefa do pool: vizinhos das linhas [inicio, fim) da matriz gravada em `pasta`."""
+    if _matriz.get('pasta') != pasta:
+        _matriz.update(
+            pasta=pasta,
+            vetores=np.load(os.path.join(pasta, 'vetores.npy'), mmap_mode='r'),
+            faixas=np.load(os.path.join(pasta, 'faixas.npy'), mmap_mode='r'),
+        )
+    linhas = np.arange(inicio, fim)
+    colunas, valores = _melhores(_scores(linhas, _matriz['vetores'], _matriz['faixas']))
+    return linhas, colunas, valores
+
+
+# ----------------------------------------------------------------------
+# RECONSTRUÇÃO E ATUALIZAÇÃO INCREMENTAL
+# ----------------------------------------------------------------------
+
+def reconstruir(processos=None):
+    """
+    Recalcula a lista de vizinhos de todas as vagas ativas. Os blocos de
+    linhas são distribuídos num pool de `processos` (padrão: um por CPU),
+    que lê a matriz de vetores mapeada de um arquivo temporário.
+    Retorna o número de vagas processadas.
+    """
+    if not disponivel():
+        raise RuntimeError('NumPy não está instalado.')
+
+    inicio = timezone.now()
+    ids, vetores, faixas, idf = _carregar()
+    _gravar_matriz(ids, vetores, faixas, idf)
+    blocos = [(i, min(i + TAMANHO_BLOCO, len(ids))) for i in range(0, len(ids), TAMANHO_BLOCO)]
+
+    with tempfile.TemporaryDirectory() as pasta:
+        np.save(os.path.join(pasta, 'vetores.npy'), vetores)
+        np.save(os.path.join(pasta, 'faixas.npy'), faixas)
+        del vetores, faixas
+
+        if processos == 1 or len(blocos) <= 1:
+            resultados = [_vizinhos_do_bloco(pasta, *bloco) for bloco in blocos]
+            _matriz.clear()  # libera o mapeamento antes de apagar a pasta
+        else:
+            # Os processos filhos não devem herdar conexões abertas com o banco
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=processos, initializer=django.setup) as pool:
+                inicios, fins = zip(*blocos)
+                resultados = list(pool.map(_vizinhos_do_bloco, repeat(pasta), inicios, fins))
+
+    with transaction.atomic():
+        VagaSimilar.objects.all().delete()
+        for resultado in resultados:
+            VagaSimilar.objects.bulk_create(_listas(ids, *resultado), batch_size=1000)
+        VagaSimilarPendente.objects.filter(criado_em__lte=inicio).delete()
+    return len(ids)
+
+
+def processar_pendentes():
+    """
+    Refaz só as listas afetadas pelas vagas marcadas como pendentes: a das
+    próprias vagas, as que as citavam e aquelas em que elas passam a entrar
+    (score acima do pior vizinho atual). Só as vagas pendentes são lidas do
+    banco e vetorizadas; as demais vêm da matriz gravada. Retorna o número
+    de listas refeitas.
+    """
+    if not disponivel():
+        raise RuntimeError('NumPy não está instalado.')
+
+    inicio = timezone.now()
+    pendentes = list(VagaSimilarPendente.objects.values_list('vaga_id', flat=True))
+    if not pendentes:
+        return 0
+
+    ids, vetores, faixas, idf = _atualizar_matriz(pendentes)
+    posicao = {vaga_id: i for i, vaga_id in enumerate(ids.tolist())}
+    alteradas = [posicao[v] for v in pendentes if v in posicao]
+
+    afetadas = set(alteradas)
+    for lote in _pedacos(pendentes):
+        afetadas.update(
+            posicao[v] for v in
+            VagaSimilar.objects.filter(similar_id__in=lote).values_list('vaga_id', flat=True)
+            if v in posicao
+        )
+
+    # Listas incompletas aceitam qualquer score positivo
+    limiares = np.zeros(len(ids), dtype=np.float32)
+    for vaga_id, minimo in (
+        VagaSimilar.objects.values('vaga_id')
+        .annotate(minimo=Min('score'), total=Count('id'))
+        .filter(total__gte=VIZINHOS)
+        .values_list('vaga_id', 'minimo')
+    ):
+        if vaga_id in posicao:
+            limiares[posicao[vaga_id]] = minimo
+    for linhas in _pedacos(alteradas, TAMANHO_BLOCO):
+        scores = _scores(np.array(linhas), vetores, faixas)
+        afetadas.update(np.flatnonzero((scores > limiares).any(axis=0)).tolist())
+
+    afetadas = sorted(afetadas)
+    # Gravada antes de apagar as marcas: se algo falhar depois, a próxima
+    # execução reaplica as mesmas vagas sobre ela
+    _gravar_matriz(ids, vetores, faixas, idf)
+    with transaction.atomic():
+        for lote in _pedacos(pendentes + [int(ids[i]) for i in afetadas]):
+            VagaSimilar.objects.filter(vaga_id__in=lote).delete()
+        for linhas in _pedacos(afetadas, TAMANHO_BLOCO):
+            linhas = np.array(linhas)
+            colunas, valores = _melhores(_scores(linhas, vetores, faixas))
+            VagaSimilar.objects.bulk_create(_listas(ids, linhas, colunas, valores), batch_size=1000)
+        for lote in _pedacos(pendentes):
+            VagaSimilarPendente.objects.filter(vaga_id__in=lote, criado_em__lte=inicio).delete()
+    return len(afetadas)
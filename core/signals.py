@@ -1,9 +1,172 @@
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver, Signal
 from django.contrib.auth.models import User
-from .models import Profile
+from django.utils import timezone
+from .backends import invalidar_usuario
+from .models import Profile, Vaga, Candidatura, PerfilCandidato, Competencia, Idioma
+from .services import (
+    cache_paginas_service, notificacao_service, similaridade_service, vagas_similares_service,
+    duplicatas_service, localizacao_service, salario_service, historico_status_service
+)
+
+# Enviado após inserções em lote (bulk_create não dispara post_save).
+# Argumentos: vagas (lista de Vaga já com pk).
+vagas_criadas_em_lote = Signal()
+# Idem para currículos importados. Argumentos: perfis (lista de PerfilCandidato).
+perfis_criados_em_lote = Signal()
 
 @receiver(post_save, sender=User)
 def criar_profile(sender, instance, created, **kwargs):
     if created:
         Profile.objects.create(user=instance)
+
+
+# Usuário logado (com profile) guardado no cache das sessões
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidar_usuario_cache(sender, instance, **kwargs):
+    invalidar_usuario(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidar_usuario_do_profile(sender, instance, **kwargs):
+    invalidar_usuario(instance.user_id)
+
+
+# Localização em texto livre -> município (filtro por raio e match por distância)
+@receiver(pre_save, sender=Vaga)
+def resolver_municipio_vaga(sender, instance, **kwargs):
+    instance.municipio_id = localizacao_service.resolver(instance.localizacao)
+
+
+@receiver(pre_save, sender=PerfilCandidato)
+def resolver_municipio_candidato(sender, instance, **kwargs):
+    instance.municipio_id = localizacao_service.resolver(instance.cidade, instance.estado)
+
+
+# Salário oferecido / pretensão no histograma por título, UF, modelo e contrato.
+# O pre_save lê a contribuição gravada; o post_save troca pela nova.
+@receiver(pre_save, sender=Vaga)
+@receiver(pre_save, sender=PerfilCandidato)
+def ler_salario_anterior(sender, instance, update_fields=None, **kwargs):
+    campos = salario_service.CAMPOS_VAGA if sender is Vaga else salario_service.CAMPOS_CANDIDATO
+    if update_fields is not None and not {c.removesuffix('_id') for c in campos} & set(update_fields):
+        return
+    instance._salario_anterior = (
+        None if instance._state.adding else salario_service.contribuicao_gravada(sender, instance.pk)
+    )
+
+
+@receiver(post_save, sender=Vaga)
+@receiver(post_save, sender=PerfilCandidato)
+def atualizar_distribuicao_salario(sender, instance, **kwargs):
+    if '_salario_anterior' in instance.__dict__:
+        anterior = instance.__dict__.pop('_salario_anterior')
+        salario_service.trocar(anterior, salario_service.contribuicao_da_instancia(instance))
+
+
+@receiver(post_delete, sender=Vaga)
+@receiver(post_delete, sender=PerfilCandidato)
+def remover_distribuicao_salario(sender, instance, **kwargs):
+    salario_service.trocar(salario_service.contribuicao_da_instancia(instance), None)
+
+
+@receiver(vagas_criadas_em_lote)
+def registrar_salarios_lote(sender, vagas, **kwargs):
+    salario_service.registrar_lote(vagas)
+
+
+@receiver(perfis_criados_em_lote)
+def registrar_salarios_perfis_lote(sender, perfis, **kwargs):
+    salario_service.registrar_lote(perfis)
+
+
+# Histórico de status e funil de contratação: candidatura criada entra na
+# etapa inicial; mudança de status sai da etapa anterior (com o tempo
+# passado nela) e entra na nova. Mudanças em lote usam
+# historico_status_service.alterar_status, que não passa por aqui.
+@receiver(pre_save, sender=Candidatura)
+def detectar_mudanca_status(sender, instance, update_fields=None, **kwargs):
+    if instance._state.adding or (update_fields is not None and 'status' not in update_fields):
+        return
+    anterior = Candidatura.objects.filter(pk=instance.pk).values_list('status', 'status_desde').first()
+    if anterior and anterior[0] != instance.status:
+        instance.status_desde = timezone.now()
+        instance._status_anterior = anterior
+
+
+@receiver(post_save, sender=Candidatura)
+def registrar_status(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        historico_status_service.registrar_criacao([instance])
+    elif '_status_anterior' in instance.__dict__:
+        status, desde = instance.__dict__.pop('_status_anterior')
+        if update_fields is not None and 'status_desde' not in update_fields:
+            Candidatura.objects.filter(pk=instance.pk).update(status_desde=instance.status_desde)
+        historico_status_service.registrar_transicoes([(instance, status, desde)])
+
+
+# Qualquer mudança em vagas descarta as páginas públicas cacheadas da listagem
+@receiver(post_save, sender=Vaga)
+@receiver(post_delete, sender=Vaga)
+@receiver(vagas_criadas_em_lote)
+def invalidar_paginas_vagas(sender, **kwargs):
+    cache_paginas_service.invalidar('vagas')
+
+
+# Vaga publicada: entra na fila de notificações do banco de talentos
+# (processada fora da requisição por manage.py processar_notificacoes)
+@receiver(post_save, sender=Vaga)
+def enfileirar_notificacao_vaga(sender, instance, created, **kwargs):
+    if created:
+        notificacao_service.enfileirar([instance])
+
+
+@receiver(vagas_criadas_em_lote)
+def enfileirar_notificacoes_lote(sender, vagas, **kwargs):
+    notificacao_service.enfileirar(vagas)
+
+
+# Vaga criada, alterada ou excluída: suas listas de vagas similares (e as
+# de quem a cita) são refeitas por manage.py vagas_similares
+@receiver(post_save, sender=Vaga)
+@receiver(post_delete, sender=Vaga)
+def marcar_vagas_similares(sender, instance, **kwargs):
+    vagas_similares_service.marcar_pendentes([instance.pk])
+
+
+@receiver(vagas_criadas_em_lote)
+def marcar_vagas_similares_lote(sender, vagas, **kwargs):
+    vagas_similares_service.marcar_pendentes(v.pk for v in vagas)
+
+
+# Assinatura MinHash da vaga no índice de duplicatas
+@receiver(post_save, sender=Vaga)
+def indexar_duplicatas_vaga(sender, instance, **kwargs):
+    duplicatas_service.indexar(instance)
+
+
+@receiver(vagas_criadas_em_lote)
+def indexar_duplicatas_lote(sender, vagas, **kwargs):
+    duplicatas_service.indexar_lote(vagas)
+
+
+# Currículo alterado: recalcula o vetor do candidato no índice de similares
+@receiver(post_save, sender=PerfilCandidato)
+@receiver(post_delete, sender=PerfilCandidato)
+@receiver(post_save, sender=Competencia)
+@receiver(post_delete, sender=Competencia)
+@receiver(post_save, sender=Idioma)
+@receiver(post_delete, sender=Idioma)
+def atualizar_vetor_candidato(sender, instance, **kwargs):
+    if not similaridade_service.disponivel():
+        return
+    user_id = instance.user_id if sender is PerfilCandidato else instance.candidato_id
+    transaction.on_commit(lambda: similaridade_service.atualizar_candidato(user_id))
+
+
+@receiver(perfis_criados_em_lote)
+def atualizar_vetores_lote(sender, perfis, **kwargs):
+    similaridade_service.atualizar_candidatos(p.user_id for p in perfis)
@@ -1,3 +1,1065 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import middleware, urls as core_urls
+from .services import (
+    arquivo_service, busca_salva_service, duplicatas_service, funil_service,
+    historico_status_service, importacao_curriculos_service, importacao_vagas_service,
+    limite_service, match_service, notificacao_service, perfil_elite_service,
+    profiling_service, salario_service, similaridade_service, vagas_similares_service
+)
+from .models import (
+    PerfilCandidato, ExperienciaProfissional, FormacaoAcademica,
+    Competencia, Idioma, Vaga, Candidatura, BuscaSalva, DistribuicaoSalario, FunilDiario,
+    BaldeLimite, RegrasPontuacao, VagaArquivada, CandidaturaArquivada, HistoricoStatus,
+    VagaSimilar, VagaSimilarPendente, DisparoVaga, NotificacaoVaga
+)
+
+
+# ======================================================================
+# ORÇAMENTO DE QUERIES POR ROTA
+# ======================================================================
+
+# Duas escalas de dados: o número de queries de cada rota deve ser o mesmo
+# nas duas. Se crescer com a escala, a view tem N+1.
+ESCALAS = (2, 8)
+
+PAPEIS = ('anonimo', 'candidato', 'empresa')
+
+ORCAMENTO_PADRAO = 6
+
+# Rotas que legitimamente precisam de mais queries que o padrão
+ORCAMENTOS = {
+    'company_view_candidate': 8,
+}
+
+# Como montar os kwargs de cada rota com parâmetros a partir dos fixtures
+ARGUMENTOS = {
+    'vaga_detail': lambda f: {'vaga_id': f.vaga.id},
+    'vaga_apply': lambda f: {'vaga_id': f.vaga_aberta.id},
+    'experience_edit': lambda f: {'experiencia_id': f.experiencia.id},
+    'experience_delete': lambda f: {'experiencia_id': f.experiencia.id},
+    'education_edit': lambda f: {'formacao_id': f.formacao.id},
+    'education_delete': lambda f: {'formacao_id': f.formacao.id},
+    'vaga_edit': lambda f: {'vaga_id': f.vaga.id},
+    'vaga_applicants': lambda f: {'vaga_id': f.vaga.id},
+    'vaga_applicants_bulk_status': lambda f: {'vaga_id': f.vaga.id},
+    'vaga_scoring_rules': lambda f: {'vaga_id': f.vaga.id},
+    'application_status_update': lambda f: {'candidatura_id': f.candidatura.id},
+    'company_view_candidate': lambda f: {'user_id': f.candidato.id},
+    'saved_search_delete': lambda f: {'busca_id': f.busca.id},
+}
+
+
+def _criar_usuario(email, tipo, nome):
+    user = User.objects.create_user(username=email, email=email, first_name=nome)
+    user.profile.tipo = tipo
+    user.profile.nome_completo = nome
+    user.profile.save()
+    return user
+
+
+def _criar_vaga(empresa, codigo):
+    return Vaga.objects.create(
+        empresa=empresa, titulo=f'Desenvolvedor {codigo}', departamento='TI',
+        codigo_vaga=codigo, modelo_trabalho='remoto', localizacao='São Paulo - SP',
+        tipo_contrato='clt', carga_horaria='40h', resumo='Resumo',
+        responsabilidades='Responsabilidades', requisitos_obrigatorios='Python',
+        salario_min=5000, salario_max=8000,
+    )
+
+
+def _criar_perfil(user):
+    return PerfilCandidato.objects.create(
+        user=user, titulo_profissional='Desenvolvedor Python',
+        resumo_profissional='Resumo', whatsapp='(11) 90000-0000',
+        cidade='São Paulo', estado='SP', modelo_trabalho='remoto',
+        disponibilidade='imediata', pretensao_salarial=7000,
+    )
+
+
+def semear(escala):
+    """Cria um cenário em que todas as coleções crescem com `escala`."""
+    empresa = _criar_usuario(f'empresa{escala}@teste.com', 'empresa', 'Empresa')
+    outra_empresa = _criar_usuario(f'outra{escala}@teste.com', 'empresa', 'Outra')
+    candidato = _criar_usuario(f'candidato{escala}@teste.com', 'candidato', 'Candidato')
+    _criar_perfil(candidato)
+
+    vagas = [_criar_vaga(empresa, f'E{escala}-{i}') for i in range(escala)]
+    vagas += [_criar_vaga(outra_empresa, f'O{escala}-{i}') for i in range(escala)]
+    vaga_aberta = _criar_vaga(outra_empresa, f'ABERTA-{escala}')
+
+    for i in range(escala):
+        ExperienciaProfissional.objects.create(
+            candidato=candidato, cargo=f'Cargo {i}', empresa='ACME',
+            data_inicio=date(2020, 1, 1), data_fim=date(2021, 1, 1), descricao='...'
+        )
+        FormacaoAcademica.objects.create(
+            candidato=candidato, grau='bacharelado', curso=f'Curso {i}',
+            instituicao='USP', status='concluido'
+        )
+        Competencia.objects.create(candidato=candidato, nome=f'Skill {i}')
+        Idioma.objects.create(candidato=candidato, idioma=f'Idioma {i}', nivel='fluente')
+        BuscaSalva.objects.create(candidato=candidato, nome=f'Alerta {i}', modelo_trabalho='remoto')
+
+    # O candidato principal se candidata a todas as vagas; outros candidatos
+    # enchem a triagem da primeira vaga da empresa.
+    candidaturas = [Candidatura.objects.create(vaga=v, candidato=candidato) for v in vagas]
+    for i in range(escala):
+        outro = _criar_usuario(f'c{escala}-{i}@teste.com', 'candidato', f'Outro {i}')
+        _criar_perfil(outro)
+        perfil_elite_service.registrar_resultado(outro.profile, {eixo: 40 + i for eixo in perfil_elite_service.EIXOS})
+        Candidatura.objects.create(vaga=vagas[0], candidato=outro)
+
+    perfil_elite_service.registrar_resultado(candidato.profile, {eixo: 60 for eixo in perfil_elite_service.EIXOS})
+
+    # Perfis e vagas são todos parecidos: os painéis de similares aparecem cheios
+    if similaridade_service.disponivel():
+        similaridade_service.reconstruir()
+        vagas_similares_service.reconstruir(processos=1)
+
+    return SimpleNamespace(
+        anonimo=None,
+        empresa=empresa,
+        candidato=candidato,
+        vaga=vagas[0],
+        vaga_aberta=vaga_aberta,
+        candidatura=candidaturas[0],
+        experiencia=candidato.experiencias.first(),
+        formacao=candidato.formacoes.first(),
+        busca=candidato.buscas_salvas.first(),
+    )
+
+
+def _rotas_nomeadas():
+    return [p.name for p in core_urls.urlpatterns if getattr(p, 'name', None)]
+
+
+class OrcamentoQueriesTests(TestCase):
+
+    def setUp(self):
+        # Índices de similares isolados dos índices reais do projeto
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        configuracao = self.settings(SIMILARIDADE_DIR=pasta.name, VAGAS_SIMILARES_DIR=pasta.name)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+    def _medir(self, escala):
+        contagens = {}
+        sid = transaction.savepoint()
+        try:
+            fixtures = semear(escala)
+            for nome in _rotas_nomeadas():
+                kwargs = ARGUMENTOS[nome](fixtures) if nome in ARGUMENTOS else {}
+                url = reverse(nome, kwargs=kwargs)
+
+                for papel in PAPEIS:
+                    client = Client()
+                    usuario = getattr(fixtures, papel)
+                    if usuario is not None:
+                        client.force_login(usuario)
+                    for alias in ('default', 'paginas'):
+                        caches[alias].clear()
+
+                    # Cada requisição roda num savepoint próprio para que
+                    # GETs com efeito colateral (ex.: exclusões) não afetem as demais
+                    req_sid = transaction.savepoint()
+                    with CaptureQueriesContext(connection) as ctx:
+                        client.get(url)
+                    transaction.savepoint_rollback(req_sid)
+
+                    contagens[(nome, papel)] = len(ctx)
+        finally:
+            transaction.savepoint_rollback(sid)
+        return contagens
+
+    def test_rotas_com_parametros_tem_argumentos(self):
+        for pattern in core_urls.urlpatterns:
+            nome = getattr(pattern, 'name', None)
+            if nome and pattern.pattern.converters:
+                self.assertIn(nome, ARGUMENTOS, f'Rota {nome} precisa de uma entrada em ARGUMENTOS')
+
+    def test_queries_constantes_e_dentro_do_orcamento(self):
+        menor, maior = (self._medir(escala) for escala in ESCALAS)
+
+        linhas = [
+            f'{"rota":<28} {"papel":<10} {"n=%d" % ESCALAS[0]:>6} {"n=%d" % ESCALAS[1]:>6} {"orç.":>5}  situação',
+        ]
+        for chave in sorted(menor):
+            nome, papel = chave
+            orcamento = ORCAMENTOS.get(nome, ORCAMENTO_PADRAO)
+            situacao = []
+            if maior[chave] != menor[chave]:
+                situacao.append('ESCALA COM OS DADOS')
+            if maior[chave] > orcamento:
+                situacao.append('ACIMA DO ORÇAMENTO')
+            linhas.append(
+                f'{nome:<28} {papel:<10} {menor[chave]:>6} {maior[chave]:>6} {orcamento:>5}  '
+                f'{", ".join(situacao) or "ok"}'
+            )
+        # Tabela completa só sob pedido: TRABALHEJA_RELATORIO_QUERIES=1 manage.py test
+        if os.environ.get('TRABALHEJA_RELATORIO_QUERIES') == '1':
+            print('\n\nRelatório de queries por rota\n' + '\n'.join(linhas))
+
+        for chave in sorted(menor):
+            nome, papel = chave
+            with self.subTest(rota=nome, papel=papel):
+                self.assertEqual(
+                    menor[chave], maior[chave],
+                    f'{nome} ({papel}) escala com os dados: {menor[chave]} -> {maior[chave]} queries'
+                )
+                self.assertLessEqual(maior[chave], ORCAMENTOS.get(nome, ORCAMENTO_PADRAO))
+
+
+# ======================================================================
+# ALERTAS DE BUSCAS SALVAS (PERCOLAÇÃO)
+# ======================================================================
+
+class PercolacaoTests(TestCase):
+
+    def setUp(self):
+        self.candidato = _criar_usuario('alertas@teste.com', 'candidato', 'Candidato')
+        self.vaga = _criar_vaga(_criar_usuario('rh@teste.com', 'empresa', 'Empresa'), 'PERC-1')
+
+    def _busca(self, **campos):
+        return busca_salva_service.indexar(BuscaSalva(candidato=self.candidato, nome='Alerta', **campos))
+
+    def test_palavras_chave_exigem_todos_os_termos(self):
+        casa = self._busca(palavras_chave='Python desenvolvedor')
+        self._busca(palavras_chave='Python Java')
+        self.assertEqual(busca_salva_service.percolar(self.vaga), [casa])
+
+    def test_termos_ignoram_acentos_caixa_e_palavras_vazias(self):
+        casa = self._busca(palavras_chave='PAULO de Pythón')
+        self.assertEqual(casa.total_termos, 2)
+        self.assertEqual(busca_salva_service.percolar(self.vaga), [casa])
+
+    def test_criterios_estruturados(self):
+        sem_criterios = self._busca()
+        remoto = self._busca(modelo_trabalho='remoto', tipo_contrato='clt', salario_minimo=8000)
+        self._busca(modelo_trabalho='presencial')
+        self._busca(tipo_contrato='pj')
+        self._busca(salario_minimo=8001)
+        self.assertCountEqual(busca_salva_service.percolar(self.vaga), [sem_criterios, remoto])
+
+    def test_vaga_sem_salario_so_casa_buscas_sem_minimo(self):
+        self.vaga.salario_min = self.vaga.salario_max = None
+        sem_minimo = self._busca(palavras_chave='python')
+        self._busca(palavras_chave='python', salario_minimo=1000)
+        self.assertEqual(busca_salva_service.percolar(self.vaga), [sem_minimo])
+
+    def test_busca_reindexada_troca_os_termos(self):
+        busca = self._busca(palavras_chave='Java')
+        self.assertEqual(busca_salva_service.percolar(self.vaga), [])
+        busca.palavras_chave = 'Python'
+        busca_salva_service.indexar(busca)
+        self.assertEqual(busca_salva_service.percolar(self.vaga), [busca])
+
+
+# ======================================================================
+# VAGAS DUPLICADAS (MINHASH / LSH)
+# ======================================================================
+
+TEXTO_VAGA = (
+    'Buscamos pessoa desenvolvedora backend para atuar no time de pagamentos, '
+    'mantendo APIs em Python e Django, filas de mensagens, testes automatizados, '
+    'revisão de código e acompanhamento de métricas em produção junto ao time de '
+    'produto, com autonomia para propor melhorias de arquitetura e observabilidade.'
+)
+
+
+class DuplicatasTests(TestCase):
+
+    def setUp(self):
+        self.empresa = _criar_usuario('dup@teste.com', 'empresa', 'Empresa')
+
+    def _vaga(self, codigo, resumo, **campos):
+        vaga = _criar_vaga(self.empresa, codigo)
+        vaga.resumo = resumo
+        for campo, valor in campos.items():
+            setattr(vaga, campo, valor)
+        vaga.save()  # post_save indexa a assinatura
+        return vaga
+
+    def test_assinatura_estima_jaccard(self):
+        original = duplicatas_service.assinatura(TEXTO_VAGA)
+        self.assertEqual(len(original), duplicatas_service.PERMUTACOES * 4)
+        self.assertEqual(duplicatas_service.similaridade(original, duplicatas_service.assinatura(TEXTO_VAGA)), 1.0)
+
+        quase = duplicatas_service.assinatura(TEXTO_VAGA.replace('pagamentos', 'cobrança'))
+        self.assertGreaterEqual(duplicatas_service.similaridade(original, quase), 0.8)
+
+        outra = duplicatas_service.assinatura('Vaga de enfermagem para plantão noturno em hospital.')
+        self.assertLess(duplicatas_service.similaridade(original, outra), 0.2)
+        self.assertIsNone(duplicatas_service.assinatura('  '))
+
+    def test_numpy_e_python_puro_dao_a_mesma_assinatura(self):
+        if not similaridade_service.disponivel():
+            self.skipTest('NumPy não está instalado.')
+        com_numpy = duplicatas_service.assinatura(TEXTO_VAGA)
+        with mock.patch.object(duplicatas_service, 'np', None):
+            self.assertEqual(duplicatas_service.assinatura(TEXTO_VAGA), com_numpy)
+
+    def test_assinaturas_iguais_caem_nas_mesmas_bandas(self):
+        chaves = duplicatas_service.chaves(duplicatas_service.assinatura(TEXTO_VAGA))
+        self.assertEqual(len(set(chaves)), duplicatas_service.BANDAS)
+        self.assertEqual(chaves, duplicatas_service.chaves(duplicatas_service.assinatura(TEXTO_VAGA)))
+
+    def test_duplicatas_encontra_so_vagas_ativas_quase_iguais(self):
+        copia = self._vaga('DUP-1', TEXTO_VAGA)
+        self._vaga('DUP-2', TEXTO_VAGA, ativa=False)
+        self._vaga('DUP-3', 'Vaga de enfermagem para plantão noturno em hospital de grande porte.')
+
+        nova = Vaga(**{campo: getattr(copia, campo) for campo in duplicatas_service.CAMPOS_TEXTO})
+        nova.resumo = TEXTO_VAGA.replace('pagamentos', 'cobrança')
+        encontradas = duplicatas_service.duplicatas(nova)
+        self.assertEqual([vaga for vaga, _ in encontradas], [copia])
+        self.assertGreaterEqual(encontradas[0][1], duplicatas_service.LIMIAR)
+
+    def test_vaga_salva_nao_e_duplicata_de_si_mesma(self):
+        vaga = self._vaga('DUP-4', TEXTO_VAGA)
+        self.assertEqual(duplicatas_service.duplicatas(Vaga.objects.get(pk=vaga.pk)), [])
+
+
+# ======================================================================
+# DISTRIBUIÇÃO DE SALÁRIOS
+# ======================================================================
+
+class DistribuicaoSalarioTests(TestCase):
+
+    def setUp(self):
+        self.empresa = _criar_usuario('salarios@teste.com', 'empresa', 'Empresa')
+
+    def _vaga(self, codigo, salario_min, salario_max=None):
+        vaga = _criar_vaga(self.empresa, codigo)
+        vaga.titulo = 'Desenvolvedor Python'
+        vaga.salario_min, vaga.salario_max = salario_min, salario_max
+        vaga.save()
+        return vaga
+
+    def _histograma(self):
+        return {
+            (d.titulo, d.origem, d.estado, d.modelo_trabalho, d.tipo_contrato, d.balde): d.total
+            for d in DistribuicaoSalario.objects.filter(total__gt=0)
+        }
+
+    def test_balde_contem_o_valor_com_erro_de_ate_dois_por_cento(self):
+        for valor in (100, 1412, 5000, 12345.67, 80000):
+            b = salario_service.balde(valor)
+            self.assertLessEqual(salario_service.SALARIO_BASE * salario_service.FATOR ** b, valor)
+            self.assertLess(valor, salario_service.SALARIO_BASE * salario_service.FATOR ** (b + 1))
+            self.assertLessEqual(abs(salario_service.valor_do_balde(b) / valor - 1), 0.02)
+
+    def test_contribuicao(self):
+        self.assertEqual(salario_service.titulo_normalizado('Python Dev. Sênior'), 'dev python senior')
+        self.assertIsNone(salario_service.contribuicao_candidato('Dev', 'SP', 'remoto', 50))
+        self.assertIsNone(salario_service.contribuicao_candidato('', 'SP', 'remoto', 5000))
+        # Vaga contribui com o meio da faixa
+        self.assertEqual(
+            salario_service.contribuicao_vaga('Dev', None, 'remoto', 'clt', 4000, 6000)[-1],
+            salario_service.balde(5000),
+        )
+
+    def test_salvar_e_excluir_movem_a_contribuicao(self):
+        vaga = self._vaga('SAL-1', 5000, 5000)
+        antes = salario_service.balde(5000)
+        self.assertEqual([c[-1] for c in self._histograma()], [antes])
+
+        vaga.salario_min = vaga.salario_max = 9000
+        vaga.save()
+        self.assertEqual(list(self._histograma().items())[0][0][-1], salario_service.balde(9000))
+        self.assertEqual(sum(self._histograma().values()), 1)
+
+        vaga.delete()
+        self.assertEqual(self._histograma(), {})
+
+    def test_quartis_e_recorte_alargado(self):
+        for i, valor in enumerate((3000, 4000, 5000, 6000, 7000, 8000, 9000)):
+            self._vaga(f'Q-{i}', valor, valor)
+        resultado = salario_service.estatisticas('Python Desenvolvedor', modelo_trabalho='remoto')['vaga']
+        self.assertEqual(resultado['amostra'], 7)
+        self.assertEqual(resultado['recorte'], {'modelo_trabalho': 'remoto'})
+        for chave, esperado in (('p25', 4000), ('mediana', 6000), ('p75', 8000)):
+            self.assertLessEqual(abs(resultado[chave] / esperado - 1), 0.03)
+
+        # Sem amostra no modelo pedido, cai para o título inteiro
+        alargado = salario_service.estatisticas('Desenvolvedor Python', modelo_trabalho='presencial')['vaga']
+        self.assertEqual(alargado['recorte'], {})
+        self.assertIsNone(salario_service.estatisticas('Desenvolvedor Python')['candidato'])
+
+    def test_reconstruir_reproduz_o_histograma_incremental(self):
+        for i, valor in enumerate((2500, 5000, 5100, 12000)):
+            self._vaga(f'R-{i}', valor, valor * 1.2)
+        _criar_perfil(_criar_usuario('sal-c@teste.com', 'candidato', 'Candidato'))
+        incremental = self._histograma()
+        salario_service.reconstruir()
+        self.assertEqual(self._histograma(), incremental)
+
+
+# ======================================================================
+# FUNIL DE CONTRATAÇÃO
+# ======================================================================
+
+class FunilTests(TestCase):
+
+    def setUp(self):
+        self.empresa = _criar_usuario('funil@teste.com', 'empresa', 'Empresa')
+        self.vaga = _criar_vaga(self.empresa, 'FUN-1')
+        candidatos = [_criar_usuario(f'funil{i}@teste.com', 'candidato', f'C{i}') for i in range(4)]
+        # Todas entraram na etapa inicial há dois dias
+        self.inicio = timezone.now() - timedelta(days=2)
+        with mock.patch('django.utils.timezone.now', return_value=self.inicio):
+            self.candidaturas = [
+                Candidatura.objects.create(vaga=self.vaga, candidato=c, status_desde=self.inicio)
+                for c in candidatos
+            ]
+
+    def _funil(self, vaga=None):
+        hoje = timezone.localdate()
+        return funil_service.funil(self.empresa, hoje - timedelta(days=6), hoje, vaga)
+
+    def _agregados(self):
+        return set(FunilDiario.objects.values_list(
+            'vaga_id', 'dia', 'status', 'entradas', 'saidas', 'segundos_na_etapa',
+        ))
+
+    def test_candidaturas_e_mudancas_de_status(self):
+        primeira, segunda, *_ = self.candidaturas
+        primeira.status = 'aprovada'
+        primeira.save()
+        # Mudança em lote: mesmo efeito no funil, sem passar pelo save
+        historico_status_service.alterar_status(Candidatura.objects.filter(pk=segunda.pk), 'rejeitada')
+
+        for vaga in (self.vaga, None):  # linhas da vaga e total da empresa
+            resultado = self._funil(vaga)
+            etapas = {e['status']: e for e in resultado['etapas']}
+            self.assertEqual(resultado['recebidas'], 4)
+            self.assertEqual(dict(resultado['serie'])[timezone.localdate(self.inicio)], 4)
+            self.assertEqual(etapas['enviada']['dias_medios'], 2.0)
+            self.assertEqual((etapas['aprovada']['entradas'], etapas['aprovada']['taxa']), (1, 25))
+            self.assertEqual(etapas['rejeitada']['entradas'], 1)
+            self.assertEqual(resultado['aprovacao'], 50)
+
+    def test_reconstruir_reproduz_os_agregados(self):
+        # O histórico guarda as etapas intermediárias
+        self.candidaturas[0].status = 'em_analise'
+        self.candidaturas[0].save()
+        self.candidaturas[0].status = 'aprovada'
+        self.candidaturas[0].save()
+        historico_status_service.alterar_status(
+            Candidatura.objects.filter(pk=self.candidaturas[1].pk), 'rejeitada',
+        )
+        incremental = self._agregados()
+
+        funil_service.reconstruir()
+        self.assertEqual(self._agregados(), incremental)
+
+    def test_reconstruir_conta_candidaturas_sem_historico(self):
+        # bulk_create não passa pelos sinais: nem histórico nem funil
+        candidato = _criar_usuario('funil-lote@teste.com', 'candidato', 'Lote')
+        Candidatura.objects.bulk_create([Candidatura(vaga=self.vaga, candidato=candidato)])
+        self.assertEqual(self._funil()['recebidas'], 4)
+
+        funil_service.reconstruir()
+        self.assertEqual(self._funil()['recebidas'], 5)
+
+
+# ======================================================================
+# HISTÓRICO DE STATUS
+# ======================================================================
+
+class HistoricoStatusTests(TestCase):
+
+    def setUp(self):
+        self.vaga = _criar_vaga(_criar_usuario('hist@teste.com', 'empresa', 'Empresa'), 'HIST-1')
+        self.candidaturas = [
+            Candidatura.objects.create(
+                vaga=self.vaga, candidato=_criar_usuario(f'hist{i}@teste.com', 'candidato', f'C{i}'),
+            )
+            for i in range(3)
+        ]
+
+    def _eventos(self, candidatura):
+        return list(HistoricoStatus.objects.filter(candidatura_id=candidatura.pk)
+                    .order_by('criado_em', 'id').values_list('status_anterior', 'status'))
+
+    def test_criacao_e_save_gravam_eventos(self):
+        candidatura = self.candidaturas[0]
+        candidatura.status = 'em_analise'
+        candidatura.save()
+        candidatura.mensagem = 'Sem mudança de status'
+        candidatura.save()
+        self.assertEqual(self._eventos(candidatura), [('', 'enviada'), ('enviada', 'em_analise')])
+
+        historico_status_service.linhas_do_tempo([candidatura])
+        self.assertEqual([e.status for e in candidatura.historico], ['enviada', 'em_analise'])
+
+    def test_alterar_status_em_lote(self):
+        primeira, segunda, terceira = self.candidaturas
+        historico_status_service.alterar_status(Candidatura.objects.filter(pk=terceira.pk), 'aprovada')
+
+        antes = timezone.now()
+        mudaram = historico_status_service.alterar_status(Candidatura.objects.all(), 'aprovada')
+        self.assertEqual(mudaram, 2)  # a terceira já estava aprovada
+        for candidatura in (primeira, segunda):
+            candidatura.refresh_from_db()
+            self.assertEqual(candidatura.status, 'aprovada')
+            self.assertGreaterEqual(candidatura.status_desde, antes)
+            self.assertEqual(self._eventos(candidatura), [('', 'enviada'), ('enviada', 'aprovada')])
+        self.assertEqual(self._eventos(terceira), [('', 'enviada'), ('enviada', 'aprovada')])
+
+        hoje = timezone.localdate()
+        eventos = historico_status_service.eventos_da_vaga(self.vaga.pk, hoje, hoje)
+        self.assertEqual(len(eventos), 3)
+        self.assertEqual({e.candidatura for e in eventos}, set(self.candidaturas))
+
+    def test_historico_nao_pode_ser_alterado(self):
+        evento = HistoricoStatus.objects.filter(candidatura_id=self.candidaturas[0].pk).get()
+        evento.status = 'aprovada'
+        with self.assertRaises(ValueError):
+            evento.save()
+
+
+# ======================================================================
+# LIMITE DE TAXA (BALDE DE FICHAS)
+# ======================================================================
+
+LIMITES_TESTE = {'login': {'ip': (5, 100), 'conta': (2, 100)}}
+
+
+@override_settings(LIMITES_REQUISICOES=LIMITES_TESTE, LIMITES_ATIVOS=True)
+class LimiteTests(TestCase):
+
+    def _consumir(self, agora, capacidade=5, periodo=100):
+        return limite_service.consumir('login', 'ip', '10.0.0.1', capacidade, periodo, agora=agora)
+
+    def test_capacidade_e_espera(self):
+        self.assertEqual([self._consumir(1000) for _ in range(5)], [0] * 5)
+        # Uma ficha a cada 20 s: a próxima só daqui a 20 s
+        self.assertEqual(self._consumir(1000), 20)
+        self.assertEqual(self._consumir(1005), 15)
+
+    def test_bloqueio_nao_gasta_saldo(self):
+        for _ in range(5):
+            self._consumir(1000)
+        for _ in range(3):
+            self._consumir(1010)
+        # Meia ficha reposta em 10 s, intacta apesar dos bloqueios
+        self.assertEqual(self._consumir(1020), 0)
+
+    def test_bloqueio_so_le_o_saldo(self):
+        # A rajada de 429s não disputa a escrita do banco
+        for _ in range(5):
+            self._consumir(1000)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self._consumir(1001), 19)
+        self.assertEqual([q['sql'].split()[0] for q in queries.captured_queries], ['SELECT'])
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self._consumir(1020), 0)
+        self.assertEqual([q['sql'].split()[0] for q in queries.captured_queries], ['SELECT', 'UPDATE'])
+
+    def test_reposicao_limitada_a_capacidade(self):
+        for _ in range(5):
+            self._consumir(1000)
+        self.assertEqual([self._consumir(1040) for _ in range(3)], [0, 0, 20])
+        # Parado muito além do período: volta cheio, não acima da capacidade
+        self.assertEqual([self._consumir(5000) for _ in range(6)], [0] * 5 + [20])
+
+    def test_bloqueio_da_conta_devolve_a_ficha_do_ip(self):
+        with mock.patch('time.time', return_value=1000.0):
+            self.assertEqual(limite_service.verificar('login', '10.0.0.1', 'a@teste.com'), 0)
+            self.assertEqual(limite_service.verificar('login', '10.0.0.1', 'a@teste.com'), 0)
+            self.assertEqual(limite_service.verificar('login', '10.0.0.1', 'a@teste.com'), 50)
+        fichas = BaldeLimite.objects.get(chave__startswith='login:ip:').fichas
+        self.assertEqual(fichas, 3)
+
+    @override_settings(LIMITES_ATIVOS=False)
+    def test_desligado(self):
+        for _ in range(10):
+            self.assertEqual(limite_service.verificar('login', '10.0.0.1', 'a@teste.com'), 0)
+        self.assertFalse(BaldeLimite.objects.exists())
+
+    def test_limpar_remove_so_os_baldes_parados(self):
+        limite_service.consumir('login', 'ip', 'parado', 5, 100, agora=1000)
+        limite_service.consumir('login', 'ip', 'recente', 5, 100, agora=1950)
+        self.assertEqual(limite_service.limpar(agora=2000), 1)
+        self.assertEqual(BaldeLimite.objects.count(), 1)
+
+
+# ======================================================================
+# REGRAS DE MATCH COMPILADAS
+# ======================================================================
+
+class PontuadorTests(TestCase):
+
+    def setUp(self):
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        configuracao = self.settings(SIMILARIDADE_DIR=pasta.name)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        match_service._compilados.clear()
+
+        self.vaga = _criar_vaga(_criar_usuario('regras@teste.com', 'empresa', 'Empresa'), 'REG-1')
+        self.candidato = _criar_usuario('regras1@teste.com', 'candidato', 'Candidato')
+        _criar_perfil(self.candidato)
+        Competencia.objects.create(candidato=self.candidato, nome='Python')
+        self.candidatura = Candidatura.objects.create(vaga=self.vaga, candidato=self.candidato, score=0)
+
+    def _vaga(self):
+        # Instância nova, como numa requisição seguinte
+        return Vaga.objects.get(pk=self.vaga.pk)
+
+    def test_sem_regras_usa_o_padrao(self):
+        self.assertIs(match_service.pontuador(self.vaga), match_service._PADRAO)
+        # Modelo (20) + remoto (15) + salário (20)
+        self.assertEqual(match_service.calcular_match_usuario(self.vaga, self.candidato.id), 55)
+
+    def test_compilado_uma_vez_por_versao(self):
+        match_service.salvar_regras(self.vaga, {'salario': 0})
+        primeiro = match_service.pontuador(self._vaga())
+        self.assertIs(match_service.pontuador(self._vaga()), primeiro)
+
+        regras = match_service.salvar_regras(self.vaga, {'competencias': ['python'], 'pontos_competencia': 10})
+        self.assertEqual(regras.versao, 2)
+        segundo = match_service.pontuador(self._vaga())
+        self.assertIsNot(segundo, primeiro)
+        self.assertEqual(segundo.precisa, {'competencias'})
+        # salvar_regras deixa as regras na instância: nada a ler nem a compilar
+        with self.assertNumQueries(0):
+            self.assertIs(match_service.pontuador(self.vaga), segundo)
+
+    def test_lote_e_individual_concordam(self):
+        match_service.salvar_regras(self.vaga, {'salario': 0, 'competencias': ['Python'], 'pontos_competencia': 10})
+        perfis = list(match_service.anotar_criterios(PerfilCandidato.objects.all()))
+        self.assertEqual(match_service.pontuar_lote(self.vaga, perfis), [45])
+        self.assertEqual(match_service.calcular_match_usuario(self.vaga, self.candidato.id), 45)
+
+    def test_regras_invalidas(self):
+        for regras in ({'desconhecida': 1}, {'salario': -1}, {'distancia': [[30]]},
+                       {'idiomas': {'ingles': 'fluentíssimo'}}, {'eixos': {'nenhum': 10}}):
+            with self.subTest(regras=regras), self.assertRaises(ValidationError):
+                match_service.validar(regras)
+
+    def test_pendentes_repontuam_uma_vez(self):
+        match_service.salvar_regras(self.vaga, {'salario': 0})
+        self.assertEqual(match_service.processar_pendentes(), 1)
+        self.candidatura.refresh_from_db()
+        self.assertEqual(self.candidatura.score, 35)
+        regras = RegrasPontuacao.objects.get(vaga=self.vaga)
+        self.assertEqual(regras.versao_aplicada, regras.versao)
+        # Nada mudou desde a última rodada
+        self.assertEqual(match_service.processar_pendentes(), 0)
+
+
+# ======================================================================
+# PROFILING
+# ======================================================================
+
+class ProfilingTests(TestCase):
+
+    def setUp(self):
+        middleware._instrumentar_cache()
+        for alias in ('default', 'paginas'):
+            caches[alias].clear()
+            self.addCleanup(caches[alias].clear)
+
+    def _contar(self, chamada):
+        coleta = middleware._Coleta()
+        token = middleware._coleta_atual.set(coleta)
+        try:
+            chamada()
+        finally:
+            middleware._coleta_atual.reset(token)
+        return coleta.cache_hits, coleta.cache_misses
+
+    def test_cada_chave_conta_uma_vez(self):
+        # LocMem e FileBased herdam o get_many que chama get
+        for alias in ('default', 'paginas'):
+            with self.subTest(alias=alias):
+                cache_alias = caches[alias]
+                cache_alias.set('a', 1)
+                self.assertEqual(self._contar(lambda: cache_alias.get_many(['a', 'b', 'c'])), (1, 2))
+                self.assertEqual(self._contar(lambda: cache_alias.get('b')), (0, 1))
+
+    @override_settings(WHITENOISE_USE_FINDERS=True, WHITENOISE_AUTOREFRESH=True)
+    def test_arquivos_estaticos_nao_passam_pelo_profiling(self):
+        profiling_service.limpar()
+        self.addCleanup(profiling_service.limpar)
+        resposta = Client().get('/static/css/style.css')
+        self.assertEqual(resposta.status_code, 200)
+        self.assertNotIn('nao_resolvida', profiling_service.exportar_prometheus())
+
+
+# ======================================================================
+# EXPIRAÇÃO E ARQUIVAMENTO
+# ======================================================================
+
+class ArquivoTests(TestCase):
+
+    def setUp(self):
+        self.empresa = _criar_usuario('arquivo@teste.com', 'empresa', 'Empresa')
+        self.candidato = _criar_usuario('arquivo1@teste.com', 'candidato', 'Candidato')
+        self.antiga = timezone.now() - timedelta(days=arquivo_service.dias_retencao() + 1)
+
+    def _vaga(self, codigo, encerrada=True):
+        vaga = _criar_vaga(self.empresa, codigo)
+        Vaga.objects.filter(pk=vaga.pk).update(
+            criada_em=self.antiga, ativa=not encerrada, encerrada_em=self.antiga if encerrada else None,
+        )
+        return Vaga.objects.get(pk=vaga.pk)
+
+    def _candidatura(self, vaga, **campos):
+        candidatura = Candidatura.objects.create(vaga=vaga, candidato=self.candidato, **campos)
+        Candidatura.objects.filter(pk=candidatura.pk).update(criada_em=self.antiga)
+        return Candidatura.objects.get(pk=candidatura.pk)
+
+    def test_expirar_encerra_so_as_vencidas(self):
+        vencida = self._vaga('ARQ-1', encerrada=False)
+        recente = _criar_vaga(self.empresa, 'ARQ-2')
+        self.assertEqual(arquivo_service.expirar_vagas(), 1)
+        vencida.refresh_from_db()
+        recente.refresh_from_db()
+        self.assertFalse(vencida.ativa)
+        self.assertIsNotNone(vencida.encerrada_em)
+        self.assertTrue(recente.ativa)
+
+    def test_candidaturas_arquivadas_guardam_os_dados(self):
+        vaga = self._vaga('ARQ-3')
+        candidatura = self._candidatura(vaga, mensagem='Olá', status='aprovada', score=77)
+
+        self.assertEqual(arquivo_service.arquivar_candidaturas(), 1)
+        self.assertFalse(Candidatura.objects.exists())
+        arquivada = CandidaturaArquivada.objects.get(pk=candidatura.pk)
+        self.assertEqual(
+            (arquivada.vaga_id, arquivada.candidato_id, arquivada.mensagem, arquivada.status,
+             arquivada.score, arquivada.criada_em),
+            (vaga.pk, self.candidato.pk, 'Olá', 'aprovada', 77, candidatura.criada_em),
+        )
+        historico = arquivo_service.candidaturas_arquivadas(self.candidato)
+        self.assertEqual([c.vaga_titulo for c in historico], [vaga.titulo])
+
+    def test_vagas_arquivadas_guardam_os_dados(self):
+        vaga = self._vaga('ARQ-4')
+        self.assertEqual(arquivo_service.arquivar_vagas(), 1)
+        self.assertFalse(Vaga.objects.filter(pk=vaga.pk).exists())
+        arquivada = VagaArquivada.objects.get(pk=vaga.pk)
+        for campo in arquivo_service.CAMPOS_VAGA:
+            self.assertEqual(getattr(arquivada, campo), getattr(vaga, campo), campo)
+        self.assertEqual(arquivada.empresa_id, self.empresa.pk)
+        self.assertEqual(arquivada.dados['resumo'], vaga.resumo)
+
+    def test_vaga_com_candidatura_nunca_sai(self):
+        # Candidatura recente: fica na tabela quente e segura a vaga
+        com_candidatura = self._vaga('ARQ-5')
+        Candidatura.objects.create(vaga=com_candidatura, candidato=self.candidato)
+        self._vaga('ARQ-6')
+        self.assertEqual(arquivo_service.arquivar_vagas(), 1)
+        self.assertTrue(Vaga.objects.filter(pk=com_candidatura.pk).exists())
+        self.assertFalse(VagaArquivada.objects.filter(pk=com_candidatura.pk).exists())
+
+    def test_candidatura_criada_depois_da_selecao(self):
+        vagas = [self._vaga('ARQ-7'), self._vaga('ARQ-8')]
+        # O lote já foi escolhido quando a candidatura chega
+        Candidatura.objects.create(vaga=vagas[0], candidato=self.candidato)
+        with transaction.atomic():
+            self.assertEqual(arquivo_service._mover_vagas([v.pk for v in vagas]), 1)
+        self.assertTrue(Vaga.objects.filter(pk=vagas[0].pk).exists())
+        self.assertEqual(Candidatura.objects.count(), 1)
+        self.assertEqual(list(VagaArquivada.objects.values_list('id', flat=True)), [vagas[1].pk])
+
+
+# ======================================================================
+# IMPORTAÇÃO DE VAGAS
+# ======================================================================
+
+class ImportacaoVagasTests(TestCase):
+
+    def setUp(self):
+        self.empresa = _criar_usuario('importa@teste.com', 'empresa', 'Empresa')
+
+    def _registro(self, codigo, **campos):
+        return {
+            'titulo': f'Desenvolvedor {codigo}', 'departamento': 'TI', 'codigo_vaga': codigo,
+            'modelo_trabalho': 'remoto', 'localizacao': 'São Paulo - SP', 'tipo_contrato': 'clt',
+            'carga_horaria': '40h', 'resumo': 'Resumo', 'responsabilidades': 'Responsabilidades',
+            'requisitos_obrigatorios': 'Python', **campos,
+        }
+
+    def _importar(self, registros, tamanho_lote=importacao_vagas_service.TAMANHO_LOTE):
+        erros = []
+        texto = io.StringIO(''.join(
+            (json.dumps(r) if not isinstance(r, str) else r) + '\n' for r in registros
+        ))
+        resultado = importacao_vagas_service.importar_vagas(
+            texto, 'jsonl', self.empresa, tamanho_lote, ao_erro=lambda *erro: erros.append(erro),
+        )
+        return resultado, dict(erros)
+
+    def test_codigo_unico_no_lote_entre_lotes_e_no_banco(self):
+        _criar_vaga(self.empresa, 'JA-EXISTE')
+        resultado, erros = self._importar([
+            self._registro('IMP-1'),
+            self._registro('IMP-1'),      # repetido no mesmo lote
+            self._registro('IMP-2'),
+            self._registro('IMP-1'),      # repetido em outro lote
+            self._registro('JA-EXISTE'),
+        ], tamanho_lote=2)
+        self.assertEqual(resultado, {'total': 5, 'criadas': 2, 'erros': 3})
+        self.assertEqual(sorted(erros), [2, 4, 5])
+        self.assertEqual(erros[2], {'codigo_vaga': ['Já existe uma vaga com este código.']})
+        self.assertEqual(Vaga.objects.filter(codigo_vaga='IMP-1').count(), 1)
+
+    def test_salario_maximo_menor_que_o_minimo(self):
+        resultado, erros = self._importar([
+            self._registro('SAL-1', salario_min=5000, salario_max=4000),
+            self._registro('SAL-2', salario_min=4000, salario_max=5000),
+        ])
+        self.assertEqual(resultado['criadas'], 1)
+        self.assertEqual(list(erros[1]), ['salario_max'])
+
+    def test_relatorio_por_registro(self):
+        sem_titulo = self._registro('ERR-1')
+        del sem_titulo['titulo']
+        resultado, erros = self._importar([
+            self._registro('OK-1'), sem_titulo, '["não é objeto"]',
+            self._registro('OK-2', modelo_trabalho='lua'),
+        ])
+        self.assertEqual(resultado, {'total': 4, 'criadas': 1, 'erros': 3})
+        self.assertEqual(list(erros[2]), ['titulo'])
+        self.assertEqual(erros[3], {'__all__': ['Registro deve ser um objeto.']})
+        self.assertEqual(list(erros[4]), ['modelo_trabalho'])
+        vaga = Vaga.objects.get()
+        self.assertEqual((vaga.codigo_vaga, vaga.empresa, vaga.ativa), ('OK-1', self.empresa, True))
+
+    def test_csv_malformado_vira_erro_do_formulario(self):
+        # Campo acima do limite do módulo csv: csv.Error, não ValueError
+        conteudo = 'titulo,resumo\nDev,"' + 'x' * (csv.field_size_limit() + 1) + '"\n'
+        self.client.force_login(self.empresa)
+        resposta = self.client.post(reverse('vaga_import'), {
+            'arquivo': SimpleUploadedFile('vagas.csv', conteudo.encode()),
+        })
+        self.assertEqual(resposta.status_code, 200)
+        self.assertIn('Não foi possível ler o arquivo', resposta.context['form'].errors['arquivo'][0])
+        self.assertFalse(Vaga.objects.exists())
+
+
+# ======================================================================
+# IMPORTAÇÃO DE CURRÍCULOS
+# ======================================================================
+
+def _curriculo(email, **campos):
+    return {
+        'basics': {
+            'name': 'Ana Souza', 'email': email, 'label': 'Desenvolvedora', 'phone': '(11) 90000-0000',
+            'summary': 'Resumo', 'location': {'city': 'Campinas', 'region': 'SP'},
+        },
+        'skills': [{'name': 'Python'}],
+        **campos,
+    }
+
+
+class ImportacaoCurriculosTests(TestCase):
+
+    def setUp(self):
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        configuracao = self.settings(SIMILARIDADE_DIR=pasta.name)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+    def _importar(self, registros):
+        erros = []
+        texto = io.StringIO(''.join(json.dumps(r) + '\n' for r in registros))
+        resultado = importacao_curriculos_service.importar_curriculos(
+            texto, 'jsonl', ao_erro=lambda *erro: erros.append(erro),
+        )
+        return resultado, dict(erros)
+
+    def test_registros_malformados_vao_para_o_relatorio(self):
+        nome_numerico = _curriculo('c3@teste.com')
+        nome_numerico['basics']['name'] = 42
+        perfis_invalidos = _curriculo('c4@teste.com')
+        perfis_invalidos['basics']['profiles'] = ['https://github.com/ana']
+        resultado, erros = self._importar([
+            _curriculo('c1@teste.com'),
+            _curriculo('c2@teste.com', skills=['Python']),
+            nome_numerico,
+            perfis_invalidos,
+            ['não é objeto'],
+            _curriculo('c5@teste.com', work={'name': 'Empresa'}),
+            _curriculo('c6@teste.com', meta={'disponivel_para_alocacao': 'sim'}),
+        ])
+        self.assertEqual(resultado, {'total': 7, 'criados': 1, 'erros': 6})
+        self.assertEqual(erros, {
+            2: {'skills[0]': ['Deve ser um objeto.']},
+            3: {'name': ['Deve ser um texto.']},
+            4: {'basics.profiles[0]': ['Deve ser um objeto.']},
+            5: {'__all__': ['Registro deve ser um objeto.']},
+            6: {'work': ['Deve ser uma lista.']},
+            7: {'meta.disponivel_para_alocacao': ['Use true ou false.']},
+        })
+        perfil = PerfilCandidato.objects.get()
+        self.assertEqual((perfil.user.email, perfil.cidade, perfil.estado), ('c1@teste.com', 'Campinas', 'SP'))
+        self.assertEqual(list(Competencia.objects.values_list('nome', flat=True)), ['Python'])
+
+
+# ======================================================================
+# VAGAS SIMILARES (ATUALIZAÇÃO INCREMENTAL)
+# ======================================================================
+
+TITULOS_SIMILARES = (
+    ('Desenvolvedor Python', 'Python Django APIs'),
+    ('Desenvolvedor Python Sênior', 'Python Django filas'),
+    ('Desenvolvedor Java', 'Java Spring APIs'),
+    ('Enfermeiro Plantonista', 'Coren ativo plantão hospitalar'),
+    ('Técnico de Enfermagem', 'Coren ativo plantão'),
+)
+
+
+class VagasSimilaresTests(TestCase):
+
+    def setUp(self):
+        if not vagas_similares_service.disponivel():
+            self.skipTest('NumPy não está instalado.')
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        configuracao = self.settings(SIMILARIDADE_DIR=pasta.name, VAGAS_SIMILARES_DIR=pasta.name)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+        self.empresa = _criar_usuario('similares@teste.com', 'empresa', 'Empresa')
+        self.vagas = [self._vaga(f'SIM-{i}', *campos) for i, campos in enumerate(TITULOS_SIMILARES)]
+        vagas_similares_service.reconstruir(processos=1)
+
+    def _vaga(self, codigo, titulo, requisitos):
+        vaga = _criar_vaga(self.empresa, codigo)
+        vaga.titulo, vaga.requisitos_obrigatorios = titulo, requisitos
+        vaga.save()
+        return vaga
+
+    def _vizinhos(self, vaga):
+        return list(
+            VagaSimilar.objects.filter(vaga=vaga).order_by('-score').values_list('similar_id', flat=True)
+        )
+
+    def test_reconstruir(self):
+        python, python_senior, _, enfermeiro, tecnico = self.vagas
+        self.assertEqual(self._vizinhos(python)[0], python_senior.pk)
+        self.assertEqual(self._vizinhos(enfermeiro)[0], tecnico.pk)
+        self.assertFalse(VagaSimilarPendente.objects.exists())
+
+    def test_pendentes_atualizam_so_as_listas_afetadas(self):
+        python, python_senior, java, enfermeiro, tecnico = self.vagas
+        nova = self._vaga('SIM-NOVA', 'Enfermeiro Plantonista Noturno', TITULOS_SIMILARES[3][1])
+        java.ativa = False
+        java.save()
+
+        # Só as pendentes são lidas do banco; o resto vem da matriz gravada
+        with mock.patch.object(vagas_similares_service, '_carregar', side_effect=AssertionError):
+            vagas_similares_service.processar_pendentes()
+
+        self.assertEqual(self._vizinhos(nova)[0], enfermeiro.pk)
+        self.assertIn(nova.pk, self._vizinhos(enfermeiro)[:2])
+        self.assertFalse(VagaSimilar.objects.filter(vaga=java).exists())
+        self.assertFalse(VagaSimilar.objects.filter(similar=java).exists())
+        self.assertFalse(VagaSimilarPendente.objects.exists())
+
+        ids = vagas_similares_service._ler_matriz()[0].tolist()
+        self.assertCountEqual(ids, [python.pk, python_senior.pk, enfermeiro.pk, tecnico.pk, nova.pk])
+
+    def test_alteracao_troca_os_vizinhos(self):
+        python, python_senior, java, enfermeiro, tecnico = self.vagas
+        java.titulo, java.requisitos_obrigatorios = TITULOS_SIMILARES[3]
+        java.save()
+        vagas_similares_service.processar_pendentes()
+        self.assertEqual(self._vizinhos(java)[0], enfermeiro.pk)
+        self.assertEqual(self._vizinhos(enfermeiro)[0], java.pk)
+        # Sem pendentes, nada a refazer
+        self.assertEqual(vagas_similares_service.processar_pendentes(), 0)
+
+
+# ======================================================================
+# DISPAROS PARA O BANCO DE TALENTOS
+# ======================================================================
+
+class DisparosTests(TestCase):
+
+    def setUp(self):
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        configuracao = self.settings(SIMILARIDADE_DIR=pasta.name)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+        self.vaga = _criar_vaga(_criar_usuario('disparo@teste.com', 'empresa', 'Empresa'), 'DSP-1')
+        self.disparo = DisparoVaga.objects.get(vaga=self.vaga)
+        self.candidatos = []
+        for i in range(5):
+            candidato = _criar_usuario(f'talento{i}@teste.com', 'candidato', f'T{i}')
+            candidato.profile.disponivel_para_alocacao = True
+            candidato.profile.save()
+            _criar_perfil(candidato)
+            self.candidatos.append(candidato)
+
+    def _notificados(self):
+        return sorted(
+            NotificacaoVaga.objects.filter(vaga=self.vaga).values_list('candidato_id', flat=True)
+        )
+
+    def test_reserva_exclusiva_ate_vencer(self):
+        agora = timezone.now()
+        reservado = notificacao_service._reservar_disparo(agora)
+        self.assertEqual(reservado, self.disparo)
+        # Outro worker não pega o mesmo disparo enquanto a reserva vale
+        self.assertIsNone(notificacao_service._reservar_disparo(agora + timedelta(minutes=1)))
+        # Worker caiu: vencida a reserva, o disparo volta a ser reservável
+        depois = agora + notificacao_service.RESERVA + timedelta(seconds=1)
+        self.assertEqual(notificacao_service._reservar_disparo(depois), self.disparo)
+
+    def test_retoma_do_ultimo_lote_gravado(self):
+        disparo = notificacao_service._reservar_disparo(timezone.now())
+        original = notificacao_service._notificar_compativeis
+        lotes = []
+
+        def cai_no_segundo_lote(*args):
+            lotes.append(args)
+            if len(lotes) == 2:
+                raise RuntimeError('worker caiu')
+            return original(*args)
+
+        with mock.patch.object(notificacao_service, '_notificar_compativeis', cai_no_segundo_lote):
+            with self.assertRaises(RuntimeError):
+                notificacao_service.distribuir_vaga(self.vaga, disparo, tamanho_lote=2)
+
+        # O primeiro lote ficou gravado, com o cursor; o segundo foi desfeito
+        disparo.refresh_from_db()
+        self.assertEqual(disparo.ultimo_candidato_id, self.candidatos[1].pk)
+        self.assertIsNone(disparo.processado_em)
+        self.assertEqual(self._notificados(), [c.pk for c in self.candidatos[:2]])
+
+        # Reserva do worker que caiu venceu
+        DisparoVaga.objects.filter(pk=disparo.pk).update(reservado_ate=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(notificacao_service.processar_disparos(), 3)
+        self.assertEqual(self._notificados(), [c.pk for c in self.candidatos])
+        disparo.refresh_from_db()
+        self.assertIsNotNone(disparo.processado_em)
+        self.assertIsNone(disparo.reservado_ate)
+        self.assertEqual(notificacao_service.processar_disparos(), 0)
@@ -1,6 +1,7 @@
 from django.urls import path
 from django.contrib.auth.views import LoginView, LogoutView
 from . import views
+from .decorators import limitar_taxa, conta_do_campo
 from django.conf import settings
 from django.conf.urls.static import static
 
@@ -22,7 +23,9 @@ urlpatterns = [
 
     path(
         'login/',
-        LoginView.as_view(template_name='auth/login.html'),
+        limitar_taxa('login', conta=conta_do_campo('username'))(
+            LoginView.as_view(template_name='auth/login.html')
+        ),
         name='login'
     ),
 
@@ -66,6 +69,12 @@ urlpatterns = [
         name='vaga_apply'
     ),
 
+    path(
+        'vagas/salarios/',
+        views.salarios_mercado,
+        name='salary_stats'
+    ),
+
     # ==================================================================
     # CANDIDATO
     # ==================================================================
@@ -144,6 +153,12 @@ urlpatterns = [
         name='vaga_create'
     ),
 
+    path(
+        'empresa/vagas/importar/',
+        views.importar_vagas,
+        name='vaga_import'
+    ),
+
     path(
         'empresa/vagas/<int:vaga_id>/editar/',
         views.editar_vaga,
@@ -155,7 +170,31 @@ urlpatterns = [
         views.candidaturas_vaga,
         name='vaga_applicants'
     ),
+
+    path(
+        'empresa/vagas/<int:vaga_id>/pontuacao/',
+        views.regras_pontuacao_vaga,
+        name='vaga_scoring_rules'
+    ),
     
+    path(
+        'empresa/vagas/<int:vaga_id>/candidaturas/status/',
+        views.atualizar_status_em_lote,
+        name='vaga_applicants_bulk_status'
+    ),
+
+    path(
+        'empresa/funil/',
+        views.funil_candidaturas,
+        name='company_funnel'
+    ),
+
+    path(
+        'empresa/candidaturas/ao-vivo/',
+        views.feed_candidaturas,
+        name='company_applications_feed'
+    ),
+
     path(
         'empresa/candidaturas/<int:candidatura_id>/status/',
         views.atualizar_status_candidatura,
@@ -168,6 +207,12 @@ urlpatterns = [
         name='company_view_candidate'
     ),
 
+    path(
+        'empresa/talentos/',
+        views.banco_talentos,
+        name='company_talent_pool'
+    ),
+
     path(
         'trabalhe-ja-talentos/', 
         views.trabalhe_ja_talentos, 
@@ -175,6 +220,29 @@ urlpatterns = [
     ),
     
     path('teste-perfil/', views.teste_perfil_elite, name='teste_perfil_elite'),
+    path('teste-perfil/resultado/', views.resultado_diagnostico, name='resultado_diagnostico'),
+
+    # ==================================================================
+    # ALERTAS DE VAGAS
+    # ==================================================================
+
+    path(
+        'candidato/alertas/',
+        views.buscas_salvas,
+        name='candidate_saved_searches'
+    ),
+
+    path(
+        'candidato/alertas/<int:busca_id>/excluir/',
+        views.excluir_busca_salva,
+        name='saved_search_delete'
+    ),
+
+    # ==================================================================
+    # OBSERVABILIDADE
+    # ==================================================================
+
+    path('metrics/', views.metricas, name='metrics'),
 
 ]
 if settings.DEBUG:
@@ -1,33 +1,61 @@
+import csv
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login
 from django.contrib import messages
-from .decorators import apenas_empresa
+from .decorators import apenas_empresa, cache_anonimo, limitar_taxa, conta_do_campo, conta_logada
 from django.contrib.auth.models import User
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Count
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from asgiref.sync import sync_to_async
+from django.views.decorators.http import require_POST
 
 from .forms import (
     CadastroForm,
     VagaForm,
+    ImportacaoVagasForm,
     PerfilCandidatoForm,
     ExperienciaProfissionalForm,
-    FormacaoAcademicaForm
+    FormacaoAcademicaForm,
+    BuscaSalvaForm,
+    TestePerfilForm,
+    FiltroTalentosForm,
+    FiltroLocalizacaoForm,
+    FiltroFunilForm,
+    RegrasPontuacaoForm
 )
 from .models import (
+    Profile,
     Vaga,
     Candidatura,
     PerfilCandidato,
     ExperienciaProfissional,
-    FormacaoAcademica
+    FormacaoAcademica,
+    BuscaSalva,
+    RegrasPontuacao
+)
+from .services import (
+    profiling_service, importacao_vagas_service, arquivo_service, busca_salva_service,
+    perfil_elite_service, similaridade_service, vagas_similares_service, duplicatas_service,
+    localizacao_service, salario_service, funil_service, historico_status_service, feed_service,
+    match_service
 )
 
 # ======================================================================
 # LANDING / AUTENTICAÇÃO
 # ======================================================================
 
+@cache_anonimo('landing')
 def landing(request):
     return render(request, 'public/landing.html')
 
 
+@limitar_taxa('register', conta=conta_do_campo('email'))
 def cadastro(request):
     if request.method == 'POST':
         form = CadastroForm(request.POST)
@@ -53,8 +81,19 @@ def dashboard(request):
 # VAGAS – LISTAGEM / DETALHE
 # ======================================================================
 
+@cache_anonimo('vagas')
 def vagas(request):
-    vagas = Vaga.objects.all().order_by('-criada_em')
+    vagas = Vaga.objects.filter(ativa=True).select_related('empresa').order_by('-criada_em')
+
+    # Filtro "perto de": cidade em texto livre + raio em km
+    filtro = FiltroLocalizacaoForm(request.GET or None)
+    if filtro.is_valid() and filtro.cleaned_data['cidade']:
+        municipio_id = localizacao_service.resolver(filtro.cleaned_data['cidade'])
+        if municipio_id is None:
+            filtro.add_error('cidade', 'Cidade não encontrada.')
+        else:
+            raio = filtro.cleaned_data['raio'] or 50
+            vagas = localizacao_service.vagas_no_raio(vagas, municipio_id, raio)
 
     tipo_usuario = None
     if request.user.is_authenticated:
@@ -62,6 +101,7 @@ def vagas(request):
 
     return render(request, 'vagas/list.html', {
         'vagas': vagas,
+        'filtro': filtro,
         'tipo_usuario': tipo_usuario
     })
 
@@ -69,7 +109,30 @@ def vagas(request):
 @login_required
 def detalhe_vaga(request, vaga_id):
     vaga = get_object_or_404(Vaga, id=vaga_id)
-    return render(request, 'vagas/detail.html', {'vaga': vaga})
+    # Vizinhos pré-calculados por manage.py vagas_similares: uma única query
+    similares = [
+        s.similar for s in
+        vaga.similares.filter(similar__ativa=True).select_related('similar')
+        .order_by('-score')[:vagas_similares_service.EXIBIDOS]
+    ]
+    return render(request, 'vagas/detail.html', {'vaga': vaga, 'similares': similares})
+
+
+@login_required
+def salarios_mercado(request):
+    # Fragmento atualizado pelos formulários de vaga e de perfil enquanto se digita
+    uf = request.GET.get('estado', '').upper()
+    if not uf and request.GET.get('localizacao'):
+        uf = localizacao_service.uf_do_municipio(localizacao_service.resolver(request.GET['localizacao']))
+
+    return render(request, 'vagas/salarios.html', {
+        'estatisticas': salario_service.estatisticas(
+            request.GET.get('titulo', ''),
+            estado=uf,
+            modelo_trabalho=request.GET.get('modelo_trabalho', ''),
+            tipo_contrato=request.GET.get('tipo_contrato', ''),
+        ),
+    })
 
 
 # ======================================================================
@@ -79,7 +142,9 @@ def detalhe_vaga(request, vaga_id):
 @apenas_empresa
 @login_required
 def empresa(request):
-    vagas = Vaga.objects.filter(empresa=request.user)
+    vagas = Vaga.objects.filter(empresa=request.user).annotate(
+        total_candidaturas=Count('candidaturas')
+    )
     return render(request, 'empresa/profile.html', {'vagas': vagas})
 
 
@@ -91,6 +156,12 @@ def criar_vaga(request):
         if form.is_valid():
             vaga = form.save(commit=False)
             vaga.empresa = request.user
+
+            # Repostagem da mesma vaga: pede confirmação antes de publicar
+            duplicatas = duplicatas_service.duplicatas(vaga)
+            if duplicatas and not request.POST.get('confirmar_duplicata'):
+                return render(request, 'vagas/create.html', {'form': form, 'duplicatas': duplicatas})
+
             vaga.save()
             messages.success(request, 'Vaga criada com sucesso.')
             return redirect('company_dashboard')
@@ -100,6 +171,46 @@ def criar_vaga(request):
     return render(request, 'vagas/create.html', {'form': form})
 
 
+@apenas_empresa
+@login_required
+def importar_vagas(request):
+    resultado = None
+    erros = []
+
+    if request.method == 'POST':
+        form = ImportacaoVagasForm(request.POST, request.FILES)
+        if form.is_valid():
+            arquivo = form.cleaned_data['arquivo']
+
+            # Guarda só os primeiros erros para exibir; o total vem no resultado
+            def ao_erro(numero, detalhes):
+                if len(erros) < 200:
+                    erros.append((numero, detalhes))
+
+            try:
+                resultado = importacao_vagas_service.importar_vagas(
+                    importacao_vagas_service.abrir_upload(arquivo),
+                    importacao_vagas_service.detectar_formato(arquivo.name),
+                    request.user,
+                    ao_erro=ao_erro,
+                )
+            except (ValueError, UnicodeDecodeError, csv.Error) as exc:
+                form.add_error('arquivo', f'Não foi possível ler o arquivo: {exc}')
+            else:
+                messages.success(
+                    request,
+                    f"{resultado['criadas']} de {resultado['total']} vagas importadas."
+                )
+    else:
+        form = ImportacaoVagasForm()
+
+    return render(request, 'vagas/import.html', {
+        'form': form,
+        'resultado': resultado,
+        'erros': erros
+    })
+
+
 @apenas_empresa
 @login_required
 def editar_vaga(request, vaga_id):
@@ -108,7 +219,15 @@ def editar_vaga(request, vaga_id):
     if request.method == 'POST':
         form = VagaForm(request.POST, instance=vaga)
         if form.is_valid():
-            form.save()
+            vaga = form.save(commit=False)
+
+            duplicatas = duplicatas_service.duplicatas(vaga)
+            if duplicatas and not request.POST.get('confirmar_duplicata'):
+                return render(request, 'vagas/edit.html', {
+                    'form': form, 'vaga': vaga, 'duplicatas': duplicatas,
+                })
+
+            vaga.save()
             messages.success(request, 'Vaga atualizada com sucesso.')
             return redirect('company_dashboard')
     else:
@@ -124,14 +243,91 @@ def editar_vaga(request, vaga_id):
 @login_required
 def candidaturas_vaga(request, vaga_id):
     vaga = get_object_or_404(Vaga, id=vaga_id, empresa=request.user)
-    candidaturas = vaga.candidaturas.select_related('candidato')
+    # Score calculado com as regras de pontuação da vaga (match_service)
+    candidaturas = vaga.candidaturas.select_related('candidato').order_by('-score', 'criada_em')
 
     return render(request, 'vagas/applicants.html', {
         'vaga': vaga,
-        'candidaturas': candidaturas
+        'candidaturas': candidaturas,
+        'status_choices': Candidatura.STATUS_CHOICES
+    })
+
+
+@apenas_empresa
+@login_required
+def regras_pontuacao_vaga(request, vaga_id):
+    vaga = get_object_or_404(Vaga, id=vaga_id, empresa=request.user)
+    atual = RegrasPontuacao.objects.filter(vaga=vaga).first()
+    regras = match_service.validar(atual.regras if atual else {})
+
+    if request.method == 'POST':
+        form = RegrasPontuacaoForm(request.POST, regras=regras)
+        if form.is_valid():
+            match_service.salvar_regras(vaga, form.regras)
+            messages.success(request, 'Regras salvas. As candidaturas serão repontuadas em instantes.')
+            return redirect('vaga_applicants', vaga_id=vaga.id)
+    else:
+        form = RegrasPontuacaoForm(regras=regras)
+
+    return render(request, 'vagas/pontuacao.html', {
+        'vaga': vaga,
+        'form': form,
+        'regras': atual,
+    })
+
+
+@apenas_empresa
+@login_required
+def funil_candidaturas(request):
+    form = FiltroFunilForm(request.GET or None, empresa=request.user)
+    dados = form.cleaned_data if form.is_valid() else {}
+    vaga = dados.get('vaga')
+    inicio, fim = funil_service.periodo(dados.get('inicio'), dados.get('fim'))
+
+    return render(request, 'empresa/funil.html', {
+        'form': form,
+        'vaga': vaga,
+        'inicio': inicio,
+        'fim': fim,
+        # Lido dos agregados diários, nunca das candidaturas
+        'funil': funil_service.funil(request.user, inicio, fim, vaga=vaga),
+        'eventos': historico_status_service.eventos_da_vaga(vaga.id, inicio, fim) if vaga else [],
     })
 
 
+async def feed_candidaturas(request):
+    """
+    Stream SSE das candidaturas novas e mudanças de status das vagas da
+    empresa (ou só de ?vaga=). View assíncrona: sob ASGI cada conexão ociosa
+    é só uma tarefa no event loop; sob WSGI responde o pendente e encerra.
+    """
+    user = await request.auser()
+    tipo = await sync_to_async(lambda: getattr(getattr(user, 'profile', None), 'tipo', None))()
+    if not user.is_authenticated or tipo != 'empresa':
+        return HttpResponseForbidden()
+
+    vaga_id = request.GET.get('vaga', '')
+    vaga_id = int(vaga_id) if vaga_id.isdigit() else None
+    if vaga_id is not None and not await Vaga.objects.filter(id=vaga_id, empresa=user).aexists():
+        raise Http404
+
+    desde = request.headers.get('Last-Event-ID', '')
+    desde = int(desde) if desde.isdigit() else None
+
+    if isinstance(request, ASGIRequest):
+        response = StreamingHttpResponse(
+            feed_service.transmitir(user.pk, vaga_id, desde), content_type='text/event-stream'
+        )
+    else:
+        response = HttpResponse(
+            await sync_to_async(feed_service.pendentes)(user.pk, vaga_id, desde),
+            content_type='text/event-stream'
+        )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: não segurar o stream em buffer
+    return response
+
+
 @apenas_empresa
 @login_required
 def atualizar_status_candidatura(request, candidatura_id):
@@ -145,18 +341,46 @@ def atualizar_status_candidatura(request, candidatura_id):
         novo_status = request.POST.get('status')
 
         if novo_status in dict(Candidatura.STATUS_CHOICES):
-            candidatura.status = novo_status
-            candidatura.save()
+            historico_status_service.alterar_status(
+                Candidatura.objects.filter(pk=candidatura.pk), novo_status
+            )
             messages.success(request, 'Status atualizado com sucesso.')
 
-    return redirect('vaga_applicants', vaga_id=candidatura.vaga.id)
+    return redirect('vaga_applicants', vaga_id=candidatura.vaga_id)
+
+
+@apenas_empresa
+@login_required
+@require_POST
+def atualizar_status_em_lote(request, vaga_id):
+    vaga = get_object_or_404(Vaga, id=vaga_id, empresa=request.user)
+    novo_status = request.POST.get('status')
+    ids = request.POST.getlist('candidaturas')
+
+    if novo_status in dict(Candidatura.STATUS_CHOICES) and ids:
+        # Um UPDATE e um INSERT em lote, em vez de um save por candidatura
+        total = historico_status_service.alterar_status(
+            vaga.candidaturas.filter(id__in=[i for i in ids if i.isdigit()]), novo_status
+        )
+        messages.success(request, f'{total} candidatura(s) atualizada(s).')
+
+    return redirect('vaga_applicants', vaga_id=vaga.id)
 
 @apenas_empresa
 @login_required
 def visualizar_perfil_candidato(request, user_id):
     candidato = get_object_or_404(User, id=user_id)
 
-    perfil = get_object_or_404(PerfilCandidato, user=candidato)
+    perfil = get_object_or_404(PerfilCandidato.objects.select_related('user'), user=candidato)
+
+    # Vizinhos no índice de similaridade, na ordem do mais parecido
+    vizinhos = similaridade_service.similares(candidato.id)
+    perfis_similares = PerfilCandidato.objects.select_related('user') \
+        .in_bulk([user_id for user_id, _ in vizinhos], field_name='user_id') if vizinhos else {}
+    similares = [
+        {'perfil': perfis_similares[user_id], 'similaridade': round(score * 100)}
+        for user_id, score in vizinhos if user_id in perfis_similares
+    ]
 
     return render(request, 'empresa/candidato_profile.html', {
         'perfil': perfil,
@@ -165,6 +389,7 @@ def visualizar_perfil_candidato(request, user_id):
         'formacoes': candidato.formacoes.all(),
         'competencias': candidato.competencias.all(),
         'idiomas': candidato.idiomas.all(),
+        'similares': similares,
     })
 
 
@@ -174,6 +399,7 @@ def visualizar_perfil_candidato(request, user_id):
 # ======================================================================
 
 @login_required
+@limitar_taxa('vaga_apply', conta=conta_logada)
 def candidatar_vaga(request, vaga_id):
     if request.user.profile.tipo != 'candidato':
         messages.error(request, 'Apenas candidatos podem se candidatar.')
@@ -181,16 +407,23 @@ def candidatar_vaga(request, vaga_id):
 
     vaga = get_object_or_404(Vaga, id=vaga_id)
 
+    if not vaga.ativa:
+        messages.warning(request, 'Esta vaga está encerrada.')
+        return redirect('vaga_list')
+
     if Candidatura.objects.filter(vaga=vaga, candidato=request.user).exists():
         messages.warning(request, 'Você já se candidatou a esta vaga.')
         return redirect('vaga_list')
 
     if request.method == 'POST':
-        Candidatura.objects.create(
-            vaga=vaga,
-            candidato=request.user,
-            mensagem=request.POST.get('mensagem', '')
-        )
+        # Candidatura, primeiro evento do histórico e funil juntos (core.signals)
+        with transaction.atomic():
+            Candidatura.objects.create(
+                vaga=vaga,
+                candidato=request.user,
+                mensagem=request.POST.get('mensagem', ''),
+                score=match_service.calcular_match_usuario(vaga, request.user.id)
+            )
         messages.success(request, 'Candidatura enviada com sucesso.')
         return redirect('vaga_list')
 
@@ -198,12 +431,18 @@ def candidatar_vaga(request, vaga_id):
 
 @login_required
 def minhas_candidaturas(request):
-    candidaturas = Candidatura.objects.filter(
-        candidato=request.user
-    ).select_related('vaga')
+    candidaturas = historico_status_service.linhas_do_tempo(list(
+        Candidatura.objects.filter(candidato=request.user).select_related('vaga')
+    ))
+
+    # O histórico arquivado só é lido quando pedido, mantendo o caminho comum leve
+    historico = None
+    if request.GET.get('historico'):
+        historico = arquivo_service.candidaturas_arquivadas(request.user)
 
     return render(request, 'candidato/applications.html', {
-        'candidaturas': candidaturas
+        'candidaturas': candidaturas,
+        'historico': historico
     })
 
 
@@ -386,42 +625,118 @@ def trabalhe_ja_talentos(request):
 
 @login_required
 def teste_perfil_elite(request):
+    if request.user.profile.tipo != 'candidato':
+        return redirect('dashboard')
+
     if request.method == 'POST':
-        # 1. Captura os resultados do formulário
-        execucao = int(request.POST.get('execucao', 0))
-        analise = int(request.POST.get('analise', 0))
-        influencia = int(request.POST.get('influencia', 0))
-        estrategia = int(request.POST.get('estrategia', 0))
-        resiliencia = int(request.POST.get('resiliencia', 0))
-
-        # 2. Salva no perfil do candidato (Certifique-se de ter esses campos no seu Model Profile)
-        perfil = request.user.profile
-        perfil.is_elite = True
-        # Vamos guardar como um JSON para facilitar
-        perfil.resultado_teste_perfil = {
-            'execucao': execucao,
-            'analise': analise,
-            'influencia': influencia,
-            'estrategia:': estrategia,
-            'resiliencia': resiliencia
-        }
-        perfil.save()
-
-        messages.success(request, "Analise de DNA concluída! Bem-vindo ao Grupo Elite.")
-        return redirect('dashboard') # Redireciona para onde ele verá o resultado
+        form = TestePerfilForm(request.POST)
+        if form.is_valid():
+            perfil_elite_service.registrar_resultado(request.user.profile, form.cleaned_data)
+            messages.success(request, "Analise de DNA concluída! Bem-vindo ao Grupo Elite.")
+            return redirect('resultado_diagnostico')
+        messages.error(request, "Não foi possível ler o resultado do teste. Refaça o teste.")
 
     return render(request, 'candidato/teste_perfil.html')
 
 @login_required
 def resultado_diagnostico(request):
     perfil = request.user.profile
-    
+    notas = perfil.resultado_teste_perfil
+
     # Se o candidato ainda não fez o teste, mandamos ele de volta
-    if not perfil.resultado_teste_perfil:
+    if not notas:
         return redirect('teste_perfil_elite')
-        
+
+    percentis = perfil_elite_service.percentis(notas)
     context = {
-        'scores': perfil.resultado_teste_perfil,
+        # Chaves usadas pelo gráfico radar do template
+        'scores': {
+            'e': notas['execucao'], 'a': notas['analise'], 'i': notas['influencia'],
+            'v': notas['estrategia'], 'r': notas['resiliencia'],
+        },
+        'eixos': [
+            (Profile._meta.get_field(eixo).verbose_name, notas[eixo], percentis[eixo])
+            for eixo in perfil_elite_service.EIXOS
+        ],
         'nome': request.user.first_name
     }
-    return render(request, 'vagas/resultado_diagnostico.html', context)
\ No newline at end of file
+    return render(request, 'candidato/resultado_diagnostico.html', context)
+
+
+@apenas_empresa
+@login_required
+def banco_talentos(request):
+    form = FiltroTalentosForm(request.GET or None)
+    minimos = form.cleaned_data if form.is_valid() else {}
+    minimos = {eixo: minimos.get(eixo) for eixo in perfil_elite_service.EIXOS}
+
+    talentos = (
+        perfil_elite_service.filtrar_talentos(minimos)
+        .select_related('user__perfilcandidato')
+        .order_by('-teste_perfil_em')
+    )
+    pagina = Paginator(talentos, 20).get_page(request.GET.get('pagina'))
+
+    filtros = request.GET.copy()
+    filtros.pop('pagina', None)
+    return render(request, 'empresa/talentos.html', {
+        'form': form,
+        'pagina': pagina,
+        'filtros': filtros.urlencode(),
+    })
+
+
+# ======================================================================
+# ALERTAS DE VAGAS (BUSCAS SALVAS)
+# ======================================================================
+
+@login_required
+def buscas_salvas(request):
+    if request.user.profile.tipo != 'candidato':
+        return redirect('dashboard')
+
+    buscas = BuscaSalva.objects.filter(candidato=request.user).order_by('-criada_em')
+
+    if request.method == 'POST':
+        form = BuscaSalvaForm(request.POST)
+        if len(buscas) >= busca_salva_service.MAX_BUSCAS_POR_CANDIDATO:
+            messages.warning(request, 'Você atingiu o limite de alertas. Exclua um para criar outro.')
+        elif form.is_valid():
+            busca = form.save(commit=False)
+            busca.candidato = request.user
+            busca_salva_service.indexar(busca)
+            messages.success(request, 'Alerta criado. Avisaremos quando surgir uma vaga assim.')
+            return redirect('candidate_saved_searches')
+    else:
+        form = BuscaSalvaForm()
+
+    return render(request, 'candidato/saved_searches.html', {
+        'form': form,
+        'buscas': buscas,
+    })
+
+
+@login_required
+@require_POST
+def excluir_busca_salva(request, busca_id):
+    busca = get_object_or_404(BuscaSalva, id=busca_id, candidato=request.user)
+    busca.delete()
+    messages.success(request, 'Alerta removido.')
+    return redirect('candidate_saved_searches')
+
+
+# ======================================================================
+# OBSERVABILIDADE
+# ======================================================================
+
+def metricas(request):
+    # Liberado para o scraper (IPs configurados) ou para usuários staff
+    ip = request.META.get('REMOTE_ADDR')
+    ips_liberados = getattr(settings, 'PROFILING_METRICS_ALLOWED_IPS', ['127.0.0.1'])
+    if ip not in ips_liberados and not request.user.is_staff:
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        profiling_service.exportar_prometheus(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )